@@ -0,0 +1,88 @@
+"""
+ATKTools command line
+
+One entry point for the scripts in this repository. Each subcommand names the
+module that implements it, and that module (with its dependencies: fitz, pandas,
+openai, torch, ...) is only imported when the subcommand is run. `atktools --help`
+and every other subcommand therefore start without loading any of them.
+
+Every module exposes main(argv) and does no work on import, so the scripts can
+still be run directly (python pdf_to_text.py ...) with the same arguments.
+
+Usage:
+    python atktools.py <command> [arguments]
+    python atktools.py <command> --help
+    python atktools.py --help
+
+Measure the cold-start time of each subcommand with benchmark_startup.py.
+"""
+
+import os
+import sys
+import importlib
+
+# command -> (module, description)
+COMMANDS = {
+    "docx2md": ("convertDocxToMD", "Convert DOCX files to Markdown"),
+    "md2docx": ("md_to_docx", "Convert Markdown files to DOCX"),
+    "pdf2text": ("pdf_to_text", "Extract text and images from a PDF"),
+    "searchable-pdf": ("pdf_converter", "Add an OCR text layer to a scanned PDF"),
+    "questionnaire": ("process_questionnaire", "Extract questionnaire answers from a PDF with GPT-4V"),
+    "pipeline": ("qa_pipeline", "Run the OCR -> LLM -> export questionnaire pipeline"),
+    "extract-text": ("extract_text", "OCR a PDF to extracted_text.json"),
+    "extract-qa": ("extract_qa", "Extract Q&A pairs from a PDF"),
+    "process-qa": ("process_qa", "Structure extracted GCC questionnaire text"),
+    "fts": ("fts_index", "Full-text index and search of extracted texts"),
+    "tokens": ("token_count", "Count tokens of files"),
+    "json-pretty": ("jsonstrin_to_json", "Turn stringified JSON into indented JSON"),
+    "btc-get-data": ("data.btc_get_data", "Fetch the missing days into the BTC-USD price store"),
+    "btc-cache": ("data.btc_price_cache", "Build the columnar cache of the BTC price store"),
+    "btc-history": ("btc_price_history", "Rolling BTC drawdown and range statistics"),
+    "btc-cycles": ("btc_cycles_comparison", "Compare BTC halving cycles"),
+    "btc-similar": ("btc_similarity", "Find past BTC price paths similar to the current one"),
+    "btc-backtest": ("btc_backtest", "Backtest threshold and DCA rules over the halving cycles"),
+    "bench-matmul": ("benchmark_harness", "Matrix multiplication benchmark across NumPy, PyTorch and TensorFlow"),
+    "bench-threads": ("benchmark_threads", "CPU thread-scaling sweep of the matrix multiplication benchmark"),
+    "gpu-torch": ("gpu_benchmark_torch", "Matrix multiplication benchmark with PyTorch"),
+    "gpu-tf": ("gpu_benchmark_tensorflow", "Matrix multiplication benchmark with TensorFlow"),
+}
+
+
+def usage():
+    width = max(len(name) for name in COMMANDS)
+    lines = ["usage: atktools <command> [arguments]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {description}" for name, (_, description) in COMMANDS.items()]
+    lines += ["", "Run 'atktools <command> --help' for the arguments of a command."]
+    return "\n".join(lines)
+
+
+def load(command):
+    """Import and return the module implementing a command"""
+    module_name, _ = COMMANDS[command]
+    return importlib.import_module(module_name)
+
+
+def main(argv=None):
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"atktools: unknown command '{command}'\n\n{usage()}", file=sys.stderr)
+        return 2
+
+    # The scripts (and the data package) are imported from this directory
+    here = os.path.dirname(os.path.abspath(__file__))
+    if here not in sys.path:
+        sys.path.insert(0, here)
+
+    # argparse in the subcommand then reports "atktools <command>" as its program name
+    sys.argv = [f"atktools {command}"] + rest
+    result = load(command).main(rest)
+    return result if isinstance(result, int) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
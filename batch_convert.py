@@ -0,0 +1,142 @@
+"""
+Incremental Batch Conversion
+
+Shared batch mode for the document converters (convertDocxToMD.py, md_to_docx.py).
+Converts every matching file of a directory tree into a mirrored output tree across
+a process pool.
+
+Features:
+- Manifest (.convert_manifest.json in the output directory) recording each source's
+  size, mtime and SHA-256 and the output it produced
+- Unchanged sources are skipped on rerun: size + mtime are checked first, and the
+  hash only when those differ (a touched but identical file is not reconverted)
+- Outputs are written to a temporary file and renamed into place, so an interrupted
+  run never leaves a half-written document behind
+- Failures are collected and summarised at the end instead of stopping the batch
+
+Usage (through the converters):
+    python convertDocxToMD.py --batch docs/ markdown/ --workers 8
+    python md_to_docx.py --batch markdown/ docs/ --workers 8
+"""
+
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from file_utils import atomic_path, file_sha256
+
+
+MANIFEST_NAME = ".convert_manifest.json"
+
+
+def load_manifest(path):
+    """Return the manifest dict, or an empty one if it does not exist or is unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path, manifest):
+    """Write the manifest atomically"""
+    with atomic_path(path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def convert_file_atomic(convert, source, output):
+    """Run convert(source, tmp) and rename tmp to output only if it succeeds"""
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    # Keep the real extension last; some writers care about it
+    with atomic_path(output, keep_extension=True) as tmp_path:
+        convert(source, tmp_path)
+
+
+def _convert_job(convert, source, output, known_sha256):
+    """Worker: hash the source and convert it unless its content is unchanged.
+
+    Returns (sha256, converted, error message or None).
+    """
+    try:
+        sha256 = file_sha256(source)
+        if sha256 == known_sha256 and os.path.exists(output):
+            return sha256, False, None
+        convert_file_atomic(convert, source, output)
+        return sha256, True, None
+    except Exception as e:
+        return None, False, f"{type(e).__name__}: {str(e)}"
+
+
+def convert_tree(src_dir, out_dir, convert, src_ext, out_ext, workers=None, force=False):
+    """Convert every *src_ext file under src_dir to *out_ext under out_dir.
+
+    Args:
+        src_dir (str): Source directory tree
+        out_dir (str): Output directory; relative paths are mirrored
+        convert (callable): Module-level function convert(source_path, output_path)
+        src_ext (str): Source extension, e.g. ".docx"
+        out_ext (str): Output extension, e.g. ".md"
+        workers (int): Processes to use (default: all cores)
+        force (bool): Reconvert everything, ignoring the manifest
+
+    Returns:
+        dict: Counts of converted, skipped and failed files, and the failures
+    """
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {} if force else load_manifest(manifest_path)
+    updated = {}
+    jobs = []
+    skipped = 0
+
+    for dirpath, _, names in os.walk(src_dir):
+        for name in sorted(names):
+            if not name.lower().endswith(src_ext) or name.startswith("~$"):
+                continue
+            source = os.path.join(dirpath, name)
+            rel = os.path.relpath(source, src_dir).replace(os.sep, "/")
+            output = os.path.join(out_dir, os.path.splitext(rel)[0] + out_ext)
+            st = os.stat(source)
+            entry = manifest.get(rel)
+
+            if entry and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime and os.path.exists(output):
+                updated[rel] = entry
+                skipped += 1
+                continue
+            jobs.append((rel, source, output, st, entry["sha256"] if entry else None))
+
+    converted = 0
+    failures = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_convert_job, convert, source, output, known_sha256): (rel, output, st)
+                for rel, source, output, st, known_sha256 in jobs
+            }
+            for future in as_completed(futures):
+                rel, output, st = futures[future]
+                sha256, did_convert, error = future.result()
+                if error:
+                    failures.append((rel, error))
+                    print(f"Failed: {rel}: {error}")
+                    continue
+
+                updated[rel] = {
+                    "size": st.st_size,
+                    "mtime": st.st_mtime,
+                    "sha256": sha256,
+                    "output": os.path.relpath(output, out_dir).replace(os.sep, "/"),
+                }
+                if did_convert:
+                    converted += 1
+                    print(f"Converted: {rel}")
+                else:
+                    skipped += 1
+    finally:
+        save_manifest(manifest_path, updated)
+
+    print(f"\nBatch complete: {converted} converted, {skipped} unchanged, {len(failures)} failed")
+    for rel, error in failures:
+        print(f"- {rel}: {error}")
+
+    return {"converted": converted, "skipped": skipped, "failed": len(failures), "failures": failures}
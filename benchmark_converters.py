@@ -0,0 +1,457 @@
+"""
+Document Converter Benchmark and Round-Trip Fidelity Suite
+
+Generates synthetic DOCX, Markdown and PDF corpora of increasing size (headings,
+paragraphs, tables and embedded images) and runs the converters on them:
+
+- docx_to_md:   convertDocxToMD.convert_docx_to_markdown
+- md_to_docx:   md_to_docx.markdown_to_word
+- pdf_to_text:  pdf_to_text.extract_content_from_pdf
+- docx_md_docx: DOCX -> Markdown -> DOCX round trip
+- md_docx_md:   Markdown -> DOCX -> Markdown round trip
+
+Each conversion runs in a fresh process, so the reported peak RSS belongs to that
+conversion alone. Wall time is measured on a plain run; peak Python heap comes from
+a second run under tracemalloc (which slows Python code down too much to time it).
+
+Fidelity is checked against the generated input: the share of its words found in
+the output (text_recall) and the number of headings, paragraphs, tables and images
+before and after conversion. The scaling exponent of each converter is the slope of
+log(time) against log(size); 1.0 is linear.
+
+Results can be written as JSON and compared with an earlier run: slower cases,
+steeper scaling and lost fidelity are reported and the exit status is 1.
+
+Usage:
+    python benchmark_converters.py [--sizes 500 2000 8000] [--cases docx_to_md pdf_to_text]
+                                   [--json results.json] [--baseline previous.json]
+
+--sizes scales every corpus: DOCX paragraphs and Markdown lines are the size itself,
+PDF pages are size / 20. Cases whose converter dependencies are not installed
+(python-docx, markdown-it-py, PyMuPDF) are skipped.
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import zipfile
+import argparse
+import platform
+import tempfile
+import importlib.util
+import multiprocessing
+import tracemalloc
+import xml.etree.ElementTree as ET
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from benchmark_docx_to_md import WORDS, make_docx, make_png
+from convertDocxToMD import W_NS, W_P, W_T, W_TBL, W_PPR, W_PSTYLE, W_VAL, read_paragraph_styles
+
+PIC_PIC = "{http://schemas.openxmlformats.org/drawingml/2006/picture}pic"
+WORD_RE = re.compile(r"[a-z0-9]+")
+LINK_TARGET_RE = re.compile(r"\]\([^)]*\)")
+TABLE_DELIMITER_RE = re.compile(r"\s*\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)+\|?\s*")
+
+Case = namedtuple("Case", "unit requires prepare convert fidelity")
+
+
+# --- Corpus generation ---
+
+def make_pdf(path, pages, image_every=5, seed=0):
+    """Write a PDF with a heading, 20 text lines and a 4x3 ruled table on every page
+    and a distinct 64x64 image on every image_every-th page.
+
+    Returns the text that was written, for fidelity checks.
+    """
+    import fitz
+
+    rng = random.Random(seed)
+    document = fitz.open()
+    written = []
+    for n in range(pages):
+        page = document.new_page()
+        heading = f"Section {n + 1}"
+        page.insert_text((72, 72), heading, fontsize=18)
+        written.append(heading)
+
+        y = 100
+        for _ in range(20):
+            line = " ".join(rng.choice(WORDS) for _ in range(8))
+            page.insert_text((72, y), line, fontsize=10)
+            written.append(line)
+            y += 16
+
+        for row in range(4):
+            for col in range(3):
+                cell = fitz.Rect(72 + col * 150, y + row * 18, 72 + (col + 1) * 150, y + (row + 1) * 18)
+                page.draw_rect(cell, width=0.5)
+                word = rng.choice(WORDS)
+                page.insert_text((cell.x0 + 4, cell.y1 - 5), word, fontsize=10)
+                written.append(word)
+        y += 4 * 18 + 12
+
+        if image_every and n % image_every == 0:
+            page.insert_image(fitz.Rect(72, y, 172, y + 100), stream=make_png(seed=seed + n))
+
+    document.save(path, garbage=4, deflate=True)
+    document.close()
+    return "\n".join(written)
+
+
+def prepare_docx(size, workdir):
+    path = os.path.join(workdir, f"corpus_{size}.docx")
+    make_docx(path, size, table_every=50, image_every=25)
+    return path
+
+
+def prepare_markdown(size, workdir):
+    from benchmark_md_to_docx import make_markdown
+
+    os.makedirs(os.path.join(workdir, "images"), exist_ok=True)
+    with open(os.path.join(workdir, "images", "figure.png"), "wb") as f:
+        f.write(make_png(256, 128))
+    path = os.path.join(workdir, f"corpus_{size}.md")
+    make_markdown(path, size, image_every=3)
+    return path
+
+
+def prepare_pdf(size, workdir):
+    path = os.path.join(workdir, f"corpus_{size}.pdf")
+    text = make_pdf(path, max(1, size // 20))
+    with open(path + ".reference.txt", "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+# --- Conversions (run in the measurement process) ---
+
+def convert_docx_to_md(source, workdir):
+    from convertDocxToMD import convert_docx_to_markdown
+
+    output = os.path.join(workdir, "docx_to_md.md")
+    convert_docx_to_markdown(source, output)
+    return output
+
+
+def convert_md_to_docx(source, workdir):
+    from md_to_docx import markdown_to_word
+
+    # Keep the Markdown next to its images so relative links resolve
+    output = os.path.join(workdir, "md_to_docx.docx")
+    markdown_to_word(source, output)
+    return output
+
+
+def convert_pdf_to_text(source, workdir):
+    from pdf_to_text import extract_content_from_pdf
+
+    extract_content_from_pdf(source)
+    return os.path.splitext(source)[0] + ".txt"
+
+
+def convert_docx_md_docx(source, workdir):
+    from convertDocxToMD import convert_docx_to_markdown
+    from md_to_docx import markdown_to_word
+
+    middle = os.path.join(workdir, "docx_md_docx.md")
+    output = os.path.join(workdir, "docx_md_docx.docx")
+    convert_docx_to_markdown(source, middle)
+    markdown_to_word(middle, output)
+    return output
+
+
+def convert_md_docx_md(source, workdir):
+    from convertDocxToMD import convert_docx_to_markdown
+    from md_to_docx import markdown_to_word
+
+    middle = os.path.join(workdir, "md_docx_md.docx")
+    output = os.path.join(workdir, "md_docx_md.md")
+    markdown_to_word(source, middle)
+    convert_docx_to_markdown(middle, output)
+    return output
+
+
+# --- Fidelity ---
+
+def word_counts(text):
+    return Counter(WORD_RE.findall(text.lower()))
+
+
+def text_recall(reference, output):
+    """Share of the reference words (with multiplicity) that appear in the output"""
+    total = sum(reference.values())
+    if not total:
+        return 1.0
+    return round(sum(min(n, output[w]) for w, n in reference.items()) / total, 4)
+
+
+def docx_profile(path):
+    """(word counts, structure counts) of a DOCX, read from its XML.
+
+    Headings and paragraphs are counted at body level; table cell text still counts as words.
+    """
+    counts = {"headings": 0, "paragraphs": 0, "tables": 0, "images": 0}
+    words = Counter()
+    with zipfile.ZipFile(path) as docx:
+        style_names, default_style = read_paragraph_styles(docx)
+        root = ET.fromstring(docx.read("word/document.xml"))
+
+    for p in root.iter(W_P):
+        words.update(word_counts("".join(t.text or "" for t in p.iter(W_T))))
+    for p in root.find(f"{{{W_NS}}}body").findall(W_P):
+        text = "".join(t.text or "" for t in p.iter(W_T))
+        style = default_style
+        p_pr = p.find(W_PPR)
+        if p_pr is not None and p_pr.find(W_PSTYLE) is not None:
+            style = style_names.get(p_pr.find(W_PSTYLE).get(W_VAL), default_style)
+        if (style or "").startswith("Heading"):
+            counts["headings"] += 1
+        elif text.strip():
+            counts["paragraphs"] += 1
+    counts["tables"] = sum(1 for _ in root.iter(W_TBL))
+    counts["images"] = sum(1 for _ in root.iter(PIC_PIC))
+    return words, counts
+
+
+def markdown_profile(path):
+    """(word counts, structure counts) of a Markdown file; link targets are not words"""
+    counts = {"headings": 0, "tables": 0, "images": 0}
+    words = Counter()
+    in_fence = False
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("```"):
+                in_fence = not in_fence
+            elif not in_fence:
+                if re.match(r"#{1,6} ", line):
+                    counts["headings"] += 1
+                elif "|" in line and TABLE_DELIMITER_RE.fullmatch(line.rstrip("\n")):
+                    counts["tables"] += 1
+                    continue
+                counts["images"] += line.count("![")
+            words.update(word_counts(LINK_TARGET_RE.sub("]", line)))
+    return words, counts
+
+
+def compare_profiles(before, after):
+    (words_before, counts_before), (words_after, counts_after) = before, after
+    return {
+        "text_recall": text_recall(words_before, words_after),
+        "structure": {key: [counts_before[key], counts_after.get(key)] for key in counts_before},
+    }
+
+
+def fidelity_docx_to_md(source, output):
+    return compare_profiles(docx_profile(source), markdown_profile(output))
+
+
+def fidelity_md_to_docx(source, output):
+    return compare_profiles(markdown_profile(source), docx_profile(output))
+
+
+def fidelity_docx_round_trip(source, output):
+    return compare_profiles(docx_profile(source), docx_profile(output))
+
+
+def fidelity_md_round_trip(source, output):
+    return compare_profiles(markdown_profile(source), markdown_profile(output))
+
+
+def fidelity_pdf_to_text(source, output):
+    with open(source + ".reference.txt", "r", encoding="utf-8") as f:
+        reference = word_counts(f.read())
+    with open(output, "r", encoding="utf-8") as f:
+        extracted = word_counts(f.read())
+
+    import fitz
+    with fitz.open(source) as document:
+        images = len({img[0] for page in document for img in page.get_images(full=True)})
+    img_dir = os.path.splitext(source)[0] + "_images"
+    saved = len(os.listdir(img_dir)) if os.path.isdir(img_dir) else 0
+    return {"text_recall": text_recall(reference, extracted), "structure": {"images": [images, saved]}}
+
+
+CASES = {
+    "docx_to_md": Case("paragraphs", ["convertDocxToMD"], prepare_docx, convert_docx_to_md, fidelity_docx_to_md),
+    "md_to_docx": Case("lines", ["docx", "markdown_it"], prepare_markdown, convert_md_to_docx, fidelity_md_to_docx),
+    "pdf_to_text": Case("pages", ["fitz"], prepare_pdf, convert_pdf_to_text, fidelity_pdf_to_text),
+    "docx_md_docx": Case("paragraphs", ["docx", "markdown_it"], prepare_docx, convert_docx_md_docx,
+                         fidelity_docx_round_trip),
+    "md_docx_md": Case("lines", ["docx", "markdown_it"], prepare_markdown, convert_md_docx_md,
+                       fidelity_md_round_trip),
+}
+
+
+# --- Measurement ---
+
+def max_rss_mb():
+    """Peak resident set size of this process in MB (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(rss / (2 ** 20 if sys.platform == "darwin" else 1024), 1)
+
+
+def _measure(name, source, workdir, trace):
+    """Run one conversion in this (fresh) process: timed first, then under tracemalloc"""
+    case = CASES[name]
+    start = time.perf_counter()
+    output = case.convert(source, workdir)
+    result = {"seconds": round(time.perf_counter() - start, 4), "output": output}
+
+    if trace:
+        tracemalloc.start()
+        case.convert(source, workdir)
+        result["peak_traced_mb"] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 1)
+        tracemalloc.stop()
+    result["max_rss_mb"] = max_rss_mb()
+    return result
+
+
+def run_case(name, size, workdir, trace=True):
+    case = CASES[name]
+    os.makedirs(workdir, exist_ok=True)
+    source = case.prepare(size, workdir)
+
+    # A new process per conversion keeps peak RSS from leaking between cases
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        measured = pool.submit(_measure, name, source, workdir, trace).result()
+
+    units = max(1, size // 20) if case.unit == "pages" else size
+    return {
+        "case": name,
+        "size": size,
+        "unit": case.unit,
+        "units": units,
+        "input_bytes": os.path.getsize(source),
+        "seconds": measured["seconds"],
+        "us_per_unit": round(measured["seconds"] / units * 1e6, 1),
+        "peak_traced_mb": measured.get("peak_traced_mb"),
+        "max_rss_mb": measured["max_rss_mb"],
+        "fidelity": case.fidelity(source, measured["output"]),
+    }
+
+
+def scaling_exponent(points):
+    """Least-squares slope of log(seconds) against log(units); None with fewer than 2 sizes"""
+    points = [(math.log(u), math.log(s)) for u, s in points if u > 0 and s > 0]
+    if len({x for x, _ in points}) < 2:
+        return None
+    mean_x = sum(x for x, _ in points) / len(points)
+    mean_y = sum(y for _, y in points) / len(points)
+    num = sum((x - mean_x) * (y - mean_y) for x, y in points)
+    den = sum((x - mean_x) ** 2 for x, _ in points)
+    return round(num / den, 3)
+
+
+def compare_with_baseline(report, baseline, tolerance=0.25, min_seconds=0.05, exponent_slack=0.15):
+    """Return a list of regressions of report against an earlier report"""
+    regressions = []
+    previous = {(r["case"], r["size"]): r for r in baseline.get("results", [])}
+
+    for result in report["results"]:
+        key = (result["case"], result["size"])
+        old = previous.get(key)
+        if old is None:
+            continue
+        label = f"{result['case']} @ {result['size']}"
+        if (result["seconds"] > old["seconds"] * (1 + tolerance)
+                and result["seconds"] - old["seconds"] > min_seconds):
+            regressions.append(f"{label}: {old['seconds']:.3f}s -> {result['seconds']:.3f}s")
+        if result["fidelity"]["text_recall"] < old["fidelity"]["text_recall"] - 0.005:
+            regressions.append(f"{label}: text recall {old['fidelity']['text_recall']} -> "
+                               f"{result['fidelity']['text_recall']}")
+        for key_name, (before, after) in result["fidelity"]["structure"].items():
+            old_pair = old["fidelity"]["structure"].get(key_name)
+            if old_pair and old_pair[0] == old_pair[1] and before != after:
+                regressions.append(f"{label}: {key_name} no longer preserved ({before} -> {after})")
+
+    for name, exponent in report["scaling"].items():
+        old = baseline.get("scaling", {}).get(name)
+        if exponent is not None and old is not None and exponent > old + exponent_slack:
+            regressions.append(f"{name}: scaling exponent {old} -> {exponent}")
+    return regressions
+
+
+def print_results(report):
+    print(f"{'case':>13} {'size':>7} {'units':>11} {'seconds':>9} {'us/unit':>9} "
+          f"{'heap MB':>8} {'rss MB':>7} {'recall':>7}  structure (before/after)")
+    for r in report["results"]:
+        structure = " ".join(f"{k}={a}/{'-' if b is None else b}" for k, (a, b) in r["fidelity"]["structure"].items())
+        heap = f"{r['peak_traced_mb']:8.1f}" if r["peak_traced_mb"] is not None else f"{'-':>8}"
+        rss = f"{r['max_rss_mb']:7.1f}" if r["max_rss_mb"] is not None else f"{'-':>7}"
+        print(f"{r['case']:>13} {r['size']:7d} {r['units']:6d} {r['unit'][:4]:>4} {r['seconds']:9.3f} "
+              f"{r['us_per_unit']:9.1f} {heap} {rss} {r['fidelity']['text_recall']:7.3f}  {structure}")
+    print("\nScaling exponents (1.0 = linear):")
+    for name, exponent in report["scaling"].items():
+        print(f"  {name:>13}: {exponent if exponent is not None else '-'}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the document converters and check round-trip fidelity.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 8000],
+                        help="Corpus sizes (DOCX paragraphs / Markdown lines; PDF pages are size/20)")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), help="Cases to run (default: all available)")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="Skip the traced run for peak heap")
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Earlier --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline (default: 0.25 = 25%%)")
+    parser.add_argument("--keep", help="Keep the generated corpora and outputs in this directory")
+    args = parser.parse_args(argv)
+
+    names = []
+    for name in args.cases or list(CASES):
+        missing = [m for m in CASES[name].requires if importlib.util.find_spec(m) is None]
+        if missing:
+            print(f"Skipping {name}: {', '.join(missing)} not installed")
+        else:
+            names.append(name)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": args.sizes,
+        "results": [],
+        "scaling": {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.keep or tmp
+        for name in names:
+            for size in args.sizes:
+                result = run_case(name, size, os.path.join(root, f"{name}_{size}"), not args.no_tracemalloc)
+                report["results"].append(result)
+            report["scaling"][name] = scaling_exponent(
+                [(r["units"], r["seconds"]) for r in report["results"] if r["case"] == name])
+
+    print_results(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare_with_baseline(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions:
+                print(f"- {line}")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
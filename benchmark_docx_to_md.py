@@ -0,0 +1,204 @@
+"""
+DOCX to Markdown scaling benchmark
+
+Generates DOCX files of increasing size (headings, paragraphs and tables) and times
+convertDocxToMD.convert_docx_to_markdown on each. Time per paragraph should stay flat
+as documents grow. If python-docx is installed, the previous python-docx based
+converter is timed as well for comparison (skipped above --legacy-max paragraphs
+because it is quadratic).
+
+The generator writes the DOCX XML directly, so only the standard library is needed.
+
+Usage:
+    python benchmark_docx_to_md.py [--sizes 1000 2000 5000 10000] [--legacy-max 5000]
+"""
+
+import os
+import time
+import random
+import zlib
+import struct
+import zipfile
+import argparse
+import tempfile
+from xml.sax.saxutils import escape
+
+from convertDocxToMD import convert_docx_to_markdown
+
+WORDS = ("questionnaire opportunity establish transform capability centre talent cost "
+         "operations analytics delivery scale partner region finance digital").split()
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Default Extension="png" ContentType="image/png"/>
+<Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+<Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+</Types>"""
+
+PACKAGE_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>"""
+
+DOCUMENT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+<Relationship Id="rIdImage" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" Target="media/image1.png"/>
+</Relationships>"""
+
+DOCUMENT_NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" '
+    'xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" '
+    'xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" '
+    'xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture"'
+)
+
+STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>
+<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/></w:style>
+<w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/><w:basedOn w:val="Normal"/></w:style>
+<w:style w:type="paragraph" w:styleId="Heading3"><w:name w:val="heading 3"/><w:basedOn w:val="Normal"/></w:style>
+</w:styles>"""
+
+
+def _paragraph(text, style=None):
+    p_pr = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ''
+    return f'<w:p>{p_pr}<w:r><w:t xml:space="preserve">{escape(text)}</w:t></w:r></w:p>'
+
+
+def make_png(width=64, height=64, seed=0):
+    """A small RGB PNG built with zlib, so no imaging library is needed."""
+    rng = random.Random(seed)
+    color = bytes(rng.randrange(256) for _ in range(3))
+    raw = b"".join(b"\x00" + color * width for _ in range(height))
+
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b""))
+
+
+def _picture(number):
+    """A paragraph with an inline picture of media/image1.png (1 inch square)."""
+    size = 914400  # EMU per inch
+    return (f'<w:p><w:r><w:drawing><wp:inline><wp:extent cx="{size}" cy="{size}"/>'
+            f'<wp:docPr id="{number}" name="Picture {number}"/>'
+            '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+            '<pic:pic><pic:nvPicPr><pic:cNvPr id="0" name="image1.png"/><pic:cNvPicPr/></pic:nvPicPr>'
+            '<pic:blipFill><a:blip r:embed="rIdImage"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+            f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{size}" cy="{size}"/></a:xfrm>'
+            '<a:prstGeom prst="rect"/></pic:spPr></pic:pic></a:graphicData></a:graphic>'
+            '</wp:inline></w:drawing></w:r></w:p>')
+
+
+def _table(rows, cols, rng):
+    grid = ''.join('<w:gridCol w:w="2000"/>' for _ in range(cols))
+    body = ''.join(
+        '<w:tr>' + ''.join(f'<w:tc>{_paragraph(rng.choice(WORDS))}</w:tc>' for _ in range(cols)) + '</w:tr>'
+        for _ in range(rows)
+    )
+    return f'<w:tbl><w:tblGrid>{grid}</w:tblGrid>{body}</w:tbl>'
+
+
+def make_docx(path, paragraphs, table_every=50, image_every=0, seed=0):
+    """Write a DOCX with the given number of paragraphs.
+
+    Every 10th paragraph is a heading (levels 1-3), a 5x4 table follows every
+    table_every paragraphs and an embedded picture every image_every paragraphs
+    (0 for none).
+    """
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(paragraphs):
+        if i % 10 == 0:
+            blocks.append(_paragraph(f"Section {i // 10 + 1}", f"Heading{i // 10 % 3 + 1}"))
+        else:
+            blocks.append(_paragraph(" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30)))))
+        if table_every and i % table_every == table_every - 1:
+            blocks.append(_table(5, 4, rng))
+        if image_every and i % image_every == image_every - 1:
+            blocks.append(_picture(i + 1))
+
+    document = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                f'<w:document {DOCUMENT_NAMESPACES}><w:body>'
+                + ''.join(blocks) + '<w:sectPr/></w:body></w:document>')
+
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr('[Content_Types].xml', CONTENT_TYPES)
+        docx.writestr('_rels/.rels', PACKAGE_RELS)
+        docx.writestr('word/_rels/document.xml.rels', DOCUMENT_RELS)
+        docx.writestr('word/document.xml', document)
+        docx.writestr('word/styles.xml', STYLES)
+        docx.writestr('word/media/image1.png', make_png(seed=seed))
+
+
+def legacy_convert_docx_to_markdown(docx_file, md_file):
+    """The previous python-docx converter (indexes doc.paragraphs inside the loop)."""
+    from docx import Document
+    from docx.oxml.ns import qn
+
+    doc = Document(docx_file)
+    md_content = []
+    paragraph_count = iter(range(len(doc.paragraphs)))
+    table_count = iter(range(len(doc.tables)))
+
+    for child in doc.element.body:
+        if child.tag == qn('w:p'):
+            paragraph = doc.paragraphs[next(paragraph_count)]
+            style = paragraph.style.name
+            level = int(style[7:].strip()) if style.startswith('Heading') and style[7:].strip().isdigit() else None
+            md_content.append(f"{'#' * level} {paragraph.text}\n" if level else f"{paragraph.text}\n")
+        elif child.tag == qn('w:tbl'):
+            table = doc.tables[next(table_count)]
+            for i, row in enumerate(table.rows):
+                md_content.append(' | '.join(cell.text.strip().replace('\n', ' ') for cell in row.cells) + '\n')
+                if i == 0:
+                    md_content.append(' | '.join(['---'] * len(row.cells)) + '\n')
+
+    with open(md_file, 'w', encoding='utf-8') as f:
+        f.writelines(md_content)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DOCX to Markdown conversion scaling.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000],
+                        help="Paragraph counts to generate")
+    parser.add_argument("--legacy-max", type=int, default=5000,
+                        help="Largest size to run the python-docx converter on (default: 5000)")
+    args = parser.parse_args(argv)
+
+    try:
+        import docx  # noqa: F401
+        has_python_docx = True
+    except ImportError:
+        has_python_docx = False
+        print("python-docx not installed: timing the streaming converter only")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'paragraphs':>10} {'streaming s':>12} {'us/para':>8} {'legacy s':>10} {'us/para':>8}")
+        for size in args.sizes:
+            docx_path = os.path.join(tmp, f"doc_{size}.docx")
+            md_path = os.path.join(tmp, f"doc_{size}.md")
+            make_docx(docx_path, size)
+
+            start = time.perf_counter()
+            convert_docx_to_markdown(docx_path, md_path)
+            streaming = time.perf_counter() - start
+
+            legacy_cols = f"{'-':>10} {'-':>8}"
+            if has_python_docx and size <= args.legacy_max:
+                start = time.perf_counter()
+                legacy_convert_docx_to_markdown(docx_path, md_path + ".legacy")
+                legacy = time.perf_counter() - start
+                legacy_cols = f"{legacy:10.3f} {legacy / size * 1e6:8.1f}"
+
+            print(f"{size:10d} {streaming:12.3f} {streaming / size * 1e6:8.1f} {legacy_cols}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,483 @@
+"""
+Matrix Multiplication Benchmark Harness
+
+Runs the same workload, square matrix multiplications over a sweep of sizes and
+dtypes, on pluggable backends (NumPy, PyTorch and TensorFlow) with the same timing
+rules, so their numbers can be compared with each other and with earlier runs.
+
+- Every timed run materialises its result: one element of the product is copied
+  to the host, which waits for the multiplication to finish on any device (CUDA
+  and TensorFlow execute asynchronously)
+- Warmup runs continue until the timings are stable (the median of the last three
+  runs is within 5 % of the three before), for at most --max-warmup runs or 10 seconds
+- Then --repeat timed runs (the same count for every backend) are summarised:
+  median, mean, standard deviation, min, 5th/95th percentile, GFLOPS
+  (2 n^3 / median) and memory (peak device memory where the backend reports it,
+  the matrices' size and how much the resident set grew over the configuration;
+  process_peak_rss_mb is the process's high-water mark so far, not per configuration)
+- --json writes the results with the versions and machine they were measured on;
+  --baseline compares against an earlier --json file and exits with 1 if a
+  configuration got slower by more than --tolerance
+
+gpu_benchmark_torch.py and gpu_benchmark_tensorflow.py run this harness with a
+single backend.
+
+Usage:
+    python benchmark_harness.py [--backends numpy torch tensorflow] [--device auto|cpu|gpu]
+                                [--sizes 1024 2048] [--dtypes fp32 bf16 fp16] [--repeat 30]
+                                [--json results.json] [--baseline baseline.json] [--tolerance 0.1]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+
+DTYPES = ("fp32", "bf16", "fp16")
+GPU_SIZES = (1024, 2048, 4096, 8192)
+CPU_SIZES = (256, 512, 1024, 2048)
+REPEAT = 30
+MAX_WARMUP = 50
+WARMUP_SECONDS = 10
+STABLE = 0.05  # relative change of the median between warmup windows
+WINDOW = 3  # runs per warmup window
+
+
+def current_rss_mb():
+    """Current resident set size of this process in MB, None where unavailable (Linux only)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far in MB, None where unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+class NumpyBackend:
+    name = "numpy"
+
+    def __init__(self):
+        import numpy as np
+        self.np = np
+        # NumPy has no bf16, and its fp16 matmul does not use BLAS
+        self.dtypes = {"fp32": np.float32}
+        self.errors = (ValueError,)
+
+    def version(self):
+        return self.np.__version__
+
+    def device(self, name):
+        if name not in ("auto", "cpu"):
+            raise ValueError(f"NumPy only runs on the CPU, not {name!r}")
+        return "cpu"
+
+    def is_gpu(self, device):
+        return False
+
+    def describe(self, device):
+        return f"CPU ({os.cpu_count()} logical CPUs)"
+
+    def supports(self, device, dtype):
+        return dtype in self.dtypes
+
+    def set_threads(self, intra, inter):
+        # BLAS reads OMP_NUM_THREADS / OPENBLAS_NUM_THREADS / MKL_NUM_THREADS when NumPy is imported
+        pass
+
+    def threads(self):
+        return {"intra": int(os.environ.get("OMP_NUM_THREADS", 0)) or None, "inter": None}
+
+    def reset_memory(self, device):
+        pass
+
+    def peak_memory_mb(self, device):
+        return None
+
+    def prepare(self, size, dtype, device):
+        rng = self.np.random.default_rng(0)
+        a = rng.random((size, size), dtype=self.np.float32).astype(self.dtypes[dtype])
+        b = rng.random((size, size), dtype=self.np.float32).astype(self.dtypes[dtype])
+        c = self.np.empty_like(a)
+
+        def step():
+            self.np.matmul(a, b, out=c)
+            return float(c[0, 0])
+
+        return step, 3 * a.nbytes
+
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self):
+        import torch
+        self.torch = torch
+        self.dtypes = {"fp32": torch.float32, "bf16": torch.bfloat16, "fp16": torch.float16}
+        self.errors = (RuntimeError,)
+
+    def version(self):
+        return self.torch.__version__
+
+    def device(self, name):
+        torch = self.torch
+        if name in ("auto", "gpu"):
+            if torch.cuda.is_available():
+                return torch.device("cuda")
+            if getattr(torch.backends, "mps", None) is not None and torch.backends.mps.is_available():
+                return torch.device("mps")
+            if name == "gpu":
+                raise ValueError("PyTorch finds no CUDA or MPS device")
+            return torch.device("cpu")
+        return torch.device(name)
+
+    def is_gpu(self, device):
+        return device.type != "cpu"
+
+    def synchronize(self, device):
+        if device.type == "cuda":
+            self.torch.cuda.synchronize(device)
+        elif device.type == "mps":
+            self.torch.mps.synchronize()
+
+    def describe(self, device):
+        if device.type == "cuda":
+            try:
+                return self.torch.cuda.get_device_name(device)
+            except (RuntimeError, AssertionError) as e:
+                return f"CUDA device ({e})"
+        if device.type == "mps":
+            return "Apple MPS"
+        return f"CPU ({self.torch.get_num_threads()} threads)"
+
+    def supports(self, device, dtype):
+        torch = self.torch
+        if device.type == "cuda" and dtype == "bf16" and not torch.cuda.is_bf16_supported():
+            return False
+        try:
+            a = torch.ones(8, 8, device=device, dtype=self.dtypes[dtype])
+            torch.matmul(a, a)
+            self.synchronize(device)
+            return True
+        except (RuntimeError, TypeError):
+            return False
+
+    def set_threads(self, intra, inter):
+        """Thread pools for one op and for independent ops; set before the first parallel op"""
+        if intra:
+            self.torch.set_num_threads(intra)
+        if inter:
+            self.torch.set_num_interop_threads(inter)
+
+    def threads(self):
+        return {"intra": self.torch.get_num_threads(), "inter": self.torch.get_num_interop_threads()}
+
+    def reset_memory(self, device):
+        if device.type == "cuda":
+            self.torch.cuda.empty_cache()
+            self.torch.cuda.reset_peak_memory_stats(device)
+
+    def peak_memory_mb(self, device):
+        if device.type == "cuda":
+            return round(self.torch.cuda.max_memory_allocated(device) / 1e6, 1)
+        return None
+
+    def prepare(self, size, dtype, device):
+        torch = self.torch
+        generator = torch.Generator().manual_seed(0)
+        a = torch.rand(size, size, generator=generator).to(device=device, dtype=self.dtypes[dtype])
+        b = torch.rand(size, size, generator=generator).to(device=device, dtype=self.dtypes[dtype])
+        c = torch.empty_like(a)
+
+        def step():
+            torch.matmul(a, b, out=c)
+            # Copying an element to the host waits for the (asynchronous) multiplication
+            return c[0, 0].item()
+
+        return step, 3 * a.element_size() * a.nelement()
+
+
+class TensorFlowBackend:
+    name = "tensorflow"
+
+    def __init__(self):
+        import tensorflow as tf
+        self.tf = tf
+        self.dtypes = {"fp32": tf.float32, "bf16": tf.bfloat16, "fp16": tf.float16}
+        self.errors = (tf.errors.OpError,)
+
+    def version(self):
+        return self.tf.__version__
+
+    def device(self, name):
+        gpus = self.tf.config.list_physical_devices("GPU")
+        if name in ("auto", "gpu"):
+            if gpus:
+                return "/GPU:0"
+            if name == "gpu":
+                raise ValueError("TensorFlow finds no GPU")
+            return "/CPU:0"
+        if name == "cpu":
+            return "/CPU:0"
+        return name
+
+    def is_gpu(self, device):
+        return "GPU" in device.upper()
+
+    def describe(self, device):
+        if self.is_gpu(device):
+            try:
+                details = self.tf.config.experimental.get_device_details(
+                    self.tf.config.list_physical_devices("GPU")[int(device.rsplit(":", 1)[-1])])
+                return details.get("device_name", device)
+            except (IndexError, ValueError, RuntimeError):
+                return device
+        return f"CPU ({os.cpu_count()} logical CPUs)"
+
+    def supports(self, device, dtype):
+        tf = self.tf
+        try:
+            with tf.device(device):
+                a = tf.ones([8, 8], dtype=self.dtypes[dtype])
+                tf.matmul(a, a).numpy()
+            return True
+        except (tf.errors.OpError, TypeError, ValueError):
+            return False
+
+    def set_threads(self, intra, inter):
+        """Thread pools for one op and for independent ops; set before TensorFlow initialises"""
+        threading = self.tf.config.threading
+        if intra:
+            threading.set_intra_op_parallelism_threads(intra)
+        if inter:
+            threading.set_inter_op_parallelism_threads(inter)
+
+    def threads(self):
+        threading = self.tf.config.threading
+        # 0 means TensorFlow picks the count itself
+        return {"intra": threading.get_intra_op_parallelism_threads() or None,
+                "inter": threading.get_inter_op_parallelism_threads() or None}
+
+    def reset_memory(self, device):
+        if self.is_gpu(device):
+            try:
+                self.tf.config.experimental.reset_memory_stats(device.lstrip("/"))
+            except (ValueError, RuntimeError):
+                pass
+
+    def peak_memory_mb(self, device):
+        if self.is_gpu(device):
+            try:
+                return round(self.tf.config.experimental.get_memory_info(device.lstrip("/"))["peak"] / 1e6, 1)
+            except (ValueError, RuntimeError):
+                return None
+        return None
+
+    def prepare(self, size, dtype, device):
+        tf = self.tf
+        generator = tf.random.Generator.from_seed(0)
+        with tf.device(device):
+            a = tf.cast(generator.uniform([size, size]), self.dtypes[dtype])
+            b = tf.cast(generator.uniform([size, size]), self.dtypes[dtype])
+
+        def step():
+            with tf.device(device):
+                c = tf.matmul(a, b)
+            # Eager ops return before the device finishes; fetching an element waits for it
+            return float(c[0, 0].numpy())
+
+        return step, 3 * a.dtype.size * size * size
+
+
+BACKENDS = {
+    "numpy": NumpyBackend,
+    "torch": TorchBackend,
+    "tensorflow": TensorFlowBackend,
+}
+
+
+def load_backend(name):
+    """Instantiate a backend; None if its framework is not installed"""
+    try:
+        return BACKENDS[name]()
+    except ImportError:
+        return None
+
+
+def warm_up(step, max_runs=MAX_WARMUP, max_seconds=WARMUP_SECONDS, stable=STABLE, window=WINDOW):
+    """Run step until its timings are stable; return (runs, whether they became stable)"""
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_runs and time.perf_counter() - start < max_seconds:
+        run_start = time.perf_counter()
+        step()
+        times.append(time.perf_counter() - run_start)
+        if len(times) >= 2 * window:
+            recent = statistics.median(times[-window:])
+            before = statistics.median(times[-2 * window:-window])
+            if abs(recent - before) <= stable * before:
+                return len(times), True
+    return len(times), False
+
+
+def summarise(times, size):
+    """Statistics of the timings of size x size multiplications (milliseconds and GFLOPS)"""
+    median = statistics.median(times)
+    percentiles = statistics.quantiles(times, n=100, method='inclusive') if len(times) > 1 else [times[0]] * 99
+    return {
+        "median_ms": round(median * 1000, 3),
+        "mean_ms": round(statistics.fmean(times) * 1000, 3),
+        "stdev_ms": round(statistics.stdev(times) * 1000, 3) if len(times) > 1 else 0.0,
+        "min_ms": round(min(times) * 1000, 3),
+        "p5_ms": round(percentiles[4] * 1000, 3),
+        "p95_ms": round(percentiles[94] * 1000, 3),
+        "gflops": round(2 * size ** 3 / median / 1e9, 1),
+    }
+
+
+def run_benchmark(backend, device, size, dtype, repeat=REPEAT, max_warmup=MAX_WARMUP, max_warmup_seconds=WARMUP_SECONDS):
+    """Warm up and time one backend/device/dtype/size configuration"""
+    backend.reset_memory(device)
+    rss_before = current_rss_mb()
+    step, matrix_bytes = backend.prepare(size, dtype, device)
+    warmup_runs, stable = warm_up(step, max_warmup, max_warmup_seconds)
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        step()
+        times.append(time.perf_counter() - start)
+    rss_after = current_rss_mb()
+
+    result = {"backend": backend.name, "device": str(device), "dtype": dtype, "size": size, "repeat": repeat,
+              "warmup_runs": warmup_runs, "warmup_stable": stable}
+    result.update(summarise(times, size))
+    result["matrices_mb"] = round(matrix_bytes / 1e6, 1)
+    result["peak_device_mb"] = backend.peak_memory_mb(device)
+    # ru_maxrss never goes down, so only the growth is this configuration's own
+    result["rss_growth_mb"] = round(rss_after - rss_before, 1) if None not in (rss_before, rss_after) else None
+    result["process_peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def result_key(result):
+    return result["backend"], result["device"], result["dtype"], result["size"]
+
+
+def compare_with_baseline(report, baseline, tolerance=0.1):
+    """Return a list of configurations that got slower than in an earlier report.
+
+    A configuration regressed if its median is more than tolerance above the
+    baseline's and even its 5th percentile is above the baseline median, so a
+    noisy run alone does not count.
+    """
+    regressions = []
+    previous = {result_key(r): r for r in baseline.get("results", [])}
+    for result in report["results"]:
+        old = previous.get(result_key(result))
+        if old is None:
+            continue
+        if result["median_ms"] > old["median_ms"] * (1 + tolerance) and result["p5_ms"] > old["median_ms"]:
+            label = "{} {} {} {}".format(*result_key(result))
+            regressions.append(f"{label}: {old['median_ms']:.3f} ms -> {result['median_ms']:.3f} ms "
+                               f"({old['gflops']} -> {result['gflops']} GFLOPS)")
+    return regressions
+
+
+def machine_info():
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(), "cpu_count": os.cpu_count()}
+
+
+def print_result(r):
+    memory = r["peak_device_mb"] if r["peak_device_mb"] is not None else r["rss_growth_mb"]
+    warmup = f"{r['warmup_runs']}{'' if r['warmup_stable'] else '*'}"
+    print(f"{r['backend']:>10} {r['device']:>8} {r['dtype']:>5} {r['size']:>6} {warmup:>7} {r['median_ms']:10.2f} "
+          f"{r['p5_ms']:9.2f} {r['p95_ms']:9.2f} {r['gflops']:9.1f} {memory if memory is not None else '-':>10}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Matrix multiplication benchmark across NumPy, PyTorch and TensorFlow.")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS),
+                        help="Backends to run (default: all installed)")
+    parser.add_argument("--device", default="auto",
+                        help="auto, cpu, gpu or a backend device name such as cuda:1 or /GPU:1 (default: auto)")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        help=f"Matrix sizes (default: {' '.join(map(str, GPU_SIZES))} on GPU, "
+                             f"{' '.join(map(str, CPU_SIZES))} on CPU)")
+    parser.add_argument("--dtypes", nargs="+", choices=DTYPES, default=list(DTYPES),
+                        help="Data types (default: fp32 bf16 fp16, where supported)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help=f"Timed runs per configuration (default: {REPEAT})")
+    parser.add_argument("--max-warmup", type=int, default=MAX_WARMUP,
+                        help=f"Most warmup runs before timing (default: {MAX_WARMUP})")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--baseline", help="Earlier --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed slowdown against the baseline (default: 0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    report = {"machine": machine_info(), "versions": {}, "devices": {}, "results": []}
+    print(f"{'backend':>10} {'device':>8} {'dtype':>5} {'size':>6} {'warmup':>7} {'median ms':>10} "
+          f"{'p5 ms':>9} {'p95 ms':>9} {'GFLOPS':>9} {'memory MB':>10}")
+    for name in args.backends:
+        backend = load_backend(name)
+        if backend is None:
+            print(f"{name:>10}  not installed")
+            continue
+        try:
+            device = backend.device(args.device)
+        except ValueError as e:
+            print(f"{name:>10}  {e}")
+            continue
+        report["versions"][name] = backend.version()
+        report["devices"][f"{name} {device}"] = backend.describe(device)
+
+        sizes = args.sizes or (GPU_SIZES if backend.is_gpu(device) else CPU_SIZES)
+        for dtype in args.dtypes:
+            if not backend.supports(device, dtype):
+                print(f"{name:>10} {str(device):>8} {dtype:>5}  not supported")
+                continue
+            for size in sizes:
+                try:
+                    result = run_benchmark(backend, device, size, dtype, args.repeat, args.max_warmup)
+                except backend.errors + (MemoryError,) as e:  # e.g. out of device memory
+                    print(f"{name:>10} {str(device):>8} {dtype:>5} {size:>6}  failed: {str(e).splitlines()[0]}")
+                    continue
+                report["results"].append(result)
+                print_result(result)
+    if any(not r["warmup_stable"] for r in report["results"]):
+        print("(* warmup stopped before the timings were stable)")
+    for label, description in report["devices"].items():
+        print(f"{label}: {description}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Markdown to DOCX benchmark
+
+Generates Markdown shaped like process_questionnaire.py's combined_results.md (page
+headings, respondent sections, numbered Q&A lists, bold labels, image links, rules)
+plus tables and code blocks, and converts it with md_to_docx.markdown_to_word.
+Reports conversion time, .docx size and uncompressed word/document.xml size, and
+the same for the previous line-by-line converter for comparison.
+
+Usage:
+    python benchmark_md_to_docx.py [--lines 50000] [--json results.json]
+
+Requirements:
+- python-docx
+- markdown-it-py
+"""
+
+import os
+import re
+import json
+import time
+import random
+import zipfile
+import argparse
+import tempfile
+
+from md_to_docx import markdown_to_word
+
+WORDS = ("questionnaire opportunity establish transform capability centre talent cost "
+         "operations analytics delivery scale partner region finance digital").split()
+
+
+def make_markdown(path, lines, seed=0, image_every=0, image_path="images/figure.png"):
+    """Write a combined_results.md style file with about `lines` lines.
+
+    With image_every > 0, every image_every-th page also embeds image_path.
+    """
+    rng = random.Random(seed)
+
+    def sentence(n_min=6, n_max=20):
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(n_min, n_max))).capitalize() + "."
+
+    out = ["# Questionnaire Results", ""]
+    page = 0
+    while len(out) < lines:
+        page += 1
+        out += [f"## Page {page}", "", "### Respondent Name", f"**{sentence(2, 3)[:-1]}**", "",
+                "### Questionnaire Responses"]
+        for q in range(1, 6):
+            out += [f"{q}. Question: {sentence()}", f"   Answer: {sentence()} *{rng.choice(WORDS)}*", ""]
+        if page % 5 == 0:
+            out += ["| Field | Value |", "| --- | --- |"]
+            out += [f"| {rng.choice(WORDS)} | {sentence(2, 5)} |" for _ in range(4)]
+            out += [""]
+        if page % 7 == 0:
+            out += ["```", *(sentence() for _ in range(3)), "```", ""]
+        if image_every and page % image_every == 0:
+            out += [f"![Figure {page}]({image_path})", ""]
+        out += [f"[View Image](images/page_{page}.png)", "", "---", ""]
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(out[:lines]) + "\n")
+
+
+def legacy_markdown_to_word(file_path, output_path):
+    """The previous converter: one prefix check per line, explicit size and bold per run."""
+    from docx import Document
+    from docx.shared import Pt
+
+    def add_heading(document, text, level):
+        run = document.add_heading(level=level).add_run(text)
+        run.bold = True
+        run.font.size = Pt(24 if level == 1 else 20 if level == 2 else 16)
+
+    def add_paragraph(document, text):
+        document.add_paragraph().add_run(text).font.size = Pt(12)
+
+    document = Document()
+    with open(file_path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.startswith('## '):
+                add_heading(document, line[3:], level=1)
+            elif line.startswith('### '):
+                add_heading(document, line[4:], level=2)
+            elif line.startswith('- **'):
+                match = re.match(r'- \*\*(.*):\*\* (.*)', line)
+                if match:
+                    add_paragraph(document, f'{match.group(1)}: {match.group(2)}')
+            elif line.strip() == '':
+                document.add_paragraph()
+            else:
+                add_paragraph(document, line)
+    document.save(output_path)
+
+
+def measure(convert, md_path, docx_path):
+    start = time.perf_counter()
+    convert(md_path, docx_path)
+    seconds = time.perf_counter() - start
+    with zipfile.ZipFile(docx_path) as docx:
+        document_xml = docx.getinfo('word/document.xml').file_size
+    return {"seconds": round(seconds, 3), "docx_bytes": os.path.getsize(docx_path),
+            "document_xml_bytes": document_xml}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Markdown to DOCX conversion.")
+    parser.add_argument("--lines", type=int, default=50000, help="Markdown lines to generate (default: 50000)")
+    parser.add_argument("--no-legacy", action="store_true", help="Skip the previous converter")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {"lines": args.lines}
+    with tempfile.TemporaryDirectory() as tmp:
+        md_path = os.path.join(tmp, "combined_results.md")
+        make_markdown(md_path, args.lines)
+
+        results["token_stream"] = measure(markdown_to_word, md_path, os.path.join(tmp, "new.docx"))
+        if not args.no_legacy:
+            results["line_based"] = measure(legacy_markdown_to_word, md_path, os.path.join(tmp, "old.docx"))
+
+    for name in ("token_stream", "line_based"):
+        if name in results:
+            r = results[name]
+            print(f"{name:>12}: {r['seconds']:8.2f}s | docx {r['docx_bytes'] / 1024:8.0f} KB | "
+                  f"document.xml {r['document_xml_bytes'] / 1024:8.0f} KB")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Price Cache Benchmark
+
+Compares loading a price CSV with pd.read_csv(parse_dates=True), as the BTC scripts
+did on every start, against the memmapped columnar cache of data/btc_price_cache.py:
+the one-off cache build, opening the column memmaps (load_columns) and building a
+DataFrame on top of them (load_frame).
+
+Two datasets are measured: the real daily history (data/btc_price_history.csv) and a
+synthetic minute-level OHLCV history (a random walk, --minutes rows). Every load is
+repeated and the median is reported.
+
+Usage:
+    python benchmark_price_cache.py [--minutes 2000000] [--repeat 5] [--json results.json]
+"""
+
+import os
+import json
+import time
+import argparse
+import statistics
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from data.btc_get_data import STORE_PATH
+from data.btc_price_cache import build_cache, load_columns, load_frame
+
+
+def make_minute_csv(path, minutes, seed=0):
+    """Write a minute-level OHLCV CSV with the store's columns"""
+    rng = np.random.default_rng(seed)
+    close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.0008, minutes)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, minutes)) * close
+    frame = pd.DataFrame({
+        'Date': pd.date_range('2020-01-01', periods=minutes, freq='min'),
+        'Open': open_,
+        'High': np.maximum(open_, close) + spread,
+        'Low': np.minimum(open_, close) - spread,
+        'Close': close,
+        'Adj Close': close,
+        'Volume': rng.integers(1, 10**6, minutes),
+    })
+    frame.to_csv(path, index=False, date_format='%Y-%m-%d %H:%M:%S')
+
+
+def median_seconds(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def measure(csv_path, cache_dir, repeat):
+    result = {"rows": None, "csv_mb": round(os.path.getsize(csv_path) / 1e6, 1)}
+    result["read_csv"] = median_seconds(
+        lambda: pd.read_csv(csv_path, index_col='Date', parse_dates=True), repeat)
+
+    start = time.perf_counter()
+    meta = build_cache(csv_path, cache_dir)
+    result["build"] = time.perf_counter() - start
+    result["rows"] = meta["rows"]
+
+    result["load_columns"] = median_seconds(lambda: load_columns(csv_path, cache_dir), repeat)
+    result["load_frame"] = median_seconds(lambda: load_frame(csv_path, cache_dir), repeat)
+    # Loading plus one pass over a column, which reads its pages from the memmap
+    result["load_frame_mean"] = median_seconds(lambda: load_frame(csv_path, cache_dir)['Close'].mean(), repeat)
+    result["speedup"] = result["read_csv"] / result["load_frame"]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark read_csv against the memmapped price cache.")
+    parser.add_argument("--csv", default=STORE_PATH, help="Daily history CSV (default: the price store)")
+    parser.add_argument("--minutes", type=int, default=2000000, help="Rows of synthetic minute data (default: 2000000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (default: 5)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        results["daily"] = measure(args.csv, os.path.join(tmp, "daily"), args.repeat)
+        minute_csv = os.path.join(tmp, "btc_minutes.csv")
+        make_minute_csv(minute_csv, args.minutes)
+        results["minute"] = measure(minute_csv, os.path.join(tmp, "minute"), args.repeat)
+
+    print(f"{'dataset':>8} {'rows':>10} {'CSV MB':>8} {'read_csv':>10} {'build':>9} "
+          f"{'memmaps':>9} {'frame':>9} {'+mean':>9} {'speedup':>8}")
+    for name, r in results.items():
+        print(f"{name:>8} {r['rows']:10,d} {r['csv_mb']:8.1f} {r['read_csv'] * 1000:8.1f}ms {r['build'] * 1000:7.1f}ms "
+              f"{r['load_columns'] * 1000:7.2f}ms {r['load_frame'] * 1000:7.2f}ms {r['load_frame_mean'] * 1000:7.2f}ms "
+              f"{r['speedup']:7.0f}x")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Searchable PDF text layer benchmark
+
+Compares the original per-line insert_text approach with pdf_converter's batched
+TextWriter text layer on a synthetic scanned document. No Azure access is needed:
+the AnalyzeResult is simulated with the same shape prebuilt-read returns (page size
+and polygons in inches).
+
+Reports build time, output size and the time to search every page of the output.
+With --workers N the process-parallel mode is timed as well and its output is
+checked against the serial one: the text, links and page labels of every page and
+the outline.
+
+Usage:
+    python benchmark_searchable_pdf.py [--pages 500] [--lines 40] [--workers 4]
+
+Requirements:
+- PyMuPDF
+- pypdf, azure-ai-documentintelligence, python-dotenv (imported by pdf_converter)
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+from types import SimpleNamespace
+
+import fitz  # PyMuPDF
+
+from pdf_converter import create_searchable_pdf
+
+WORDS = ("questionnaire opportunity establish transform capability centre talent cost "
+         "operations analytics delivery scale partner region finance digital").split()
+
+
+def make_scanned_pdf(path, pages):
+    """Write a PDF of image-only pages, like a scan without a text layer.
+
+    Every page links to the next one, and the document has page labels and an
+    outline, so the parallel mode can be checked to keep them.
+    """
+    doc = fitz.open()
+    pix = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 850, 1100), False)
+    pix.clear_with(230)
+    png = pix.tobytes("png")
+    for _ in range(pages):
+        page = doc.new_page(width=612, height=792)  # US Letter in points
+        page.insert_image(page.rect, stream=png)
+    for page in doc:
+        page.insert_link({"kind": fitz.LINK_GOTO, "from": fitz.Rect(36, 36, 120, 52),
+                          "page": (page.number + 1) % pages})
+    doc.set_page_labels([{"startpage": 0, "prefix": "Q-", "style": "D", "firstpagenum": 1}])
+    doc.set_toc([[1, f"Section {number // 50 + 1}", number + 1] for number in range(0, pages, 50)])
+    doc.save(path, garbage=4, deflate=True)
+    doc.close()
+
+
+def make_result(pages, lines_per_page, seed=0):
+    """Simulate a prebuilt-read AnalyzeResult with polygons in inches."""
+    rng = random.Random(seed)
+    result_pages = []
+    for page_number in range(1, pages + 1):
+        lines = []
+        for i in range(lines_per_page):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 9)))
+            x0, y0 = 0.75, 0.75 + i * 0.24
+            x1, y1 = x0 + min(7.0, 0.075 * len(text)), y0 + 0.18
+            lines.append(SimpleNamespace(content=text, polygon=[x0, y0, x1, y0, x1, y1, x0, y1]))
+        result_pages.append(SimpleNamespace(page_number=page_number, width=8.5, height=11,
+                                            unit="inch", lines=lines))
+    return SimpleNamespace(pages=result_pages)
+
+
+def legacy_create_searchable_pdf(input_path, output_path, result):
+    """The previous implementation: one insert_text call per OCR line."""
+    doc = fitz.open(input_path)
+    for page_num in range(len(doc)):
+        page = doc[page_num]
+        for line in result.pages[page_num].lines:
+            points = line.polygon
+            page.insert_text(
+                (points[0] * page.rect.width, points[1] * page.rect.height),
+                line.content,
+                color=(0, 0, 0),
+                opacity=0
+            )
+    doc.save(output_path)
+    doc.close()
+
+
+def time_search(path, word):
+    """Search every page for a word; return (seconds, hits)."""
+    start = time.perf_counter()
+    hits = 0
+    with fitz.open(path) as doc:
+        for page in doc:
+            hits += len(page.search_for(word))
+    return time.perf_counter() - start, hits
+
+
+def same_document(path_a, path_b):
+    """True if both PDFs have the same pages (text, links, labels) and the same outline."""
+    with fitz.open(path_a) as a, fitz.open(path_b) as b:
+        if len(a) != len(b) or a.get_toc(simple=False) != b.get_toc(simple=False):
+            return False
+        return all(pa.get_text() == pb.get_text() and pa.get_links() == pb.get_links()
+                   and pa.get_label() == pb.get_label() for pa, pb in zip(a, b))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark searchable PDF text layer writing.")
+    parser.add_argument("--pages", type=int, default=500, help="Number of pages (default: 500)")
+    parser.add_argument("--lines", type=int, default=40, help="OCR lines per page (default: 40)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Also time the parallel mode with this many processes (default: off)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "scan.pdf")
+        make_scanned_pdf(input_path, args.pages)
+        result = make_result(args.pages, args.lines)
+        print(f"Input: {args.pages} pages, {args.lines} lines/page, {os.path.getsize(input_path) / 1024:.0f} KB")
+
+        runs = [("per-line insert_text", legacy_create_searchable_pdf, {}),
+                ("batched TextWriter", create_searchable_pdf, {})]
+        if args.workers > 1:
+            runs.append((f"parallel x{args.workers}", create_searchable_pdf, {"workers": args.workers}))
+
+        for name, writer, kwargs in runs:
+            output_path = os.path.join(tmp, f"{name.split()[0]}.pdf")
+            start = time.perf_counter()
+            writer(input_path, output_path, result, **kwargs)
+            build_time = time.perf_counter() - start
+            search_time, hits = time_search(output_path, "questionnaire")
+            print(f"{name:>22}: build {build_time:7.2f}s | size {os.path.getsize(output_path) / 1024:9.0f} KB | "
+                  f"search {search_time:6.2f}s ({hits} hits)")
+
+        if args.workers > 1:
+            matches = same_document(os.path.join(tmp, "batched.pdf"), os.path.join(tmp, "parallel.pdf"))
+            print(f"Parallel output matches serial: {matches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+CLI Cold-Start Benchmark
+
+Starts a fresh interpreter for every run of `atktools <command> --help`, which
+imports the command's module and parses its arguments but does no work, and reports
+the median and minimum wall time per subcommand. Bare interpreter start-up and
+`atktools --help` are measured as references, so the import cost of each command is
+the difference.
+
+Commands whose dependencies are not installed are reported as unavailable, with the
+error. With --importtime, the slowest top-level imports of each command (from
+python -X importtime) are listed as well.
+
+Usage:
+    python benchmark_startup.py [--repeat 7] [--commands docx2md tokens] [--importtime] [--json startup.json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+from atktools import COMMANDS
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ATKTOOLS = os.path.join(HERE, "atktools.py")
+
+
+def time_command(args, repeat):
+    """Run a command repeat times; return (wall times, return code, last stderr line)"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(args, cwd=HERE, capture_output=True, text=True)
+        times.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            return times, proc.returncode, lines[-1] if lines else ""
+    return times, 0, ""
+
+
+def slowest_imports(args, top=5):
+    """Top-level imports (cumulative microseconds, name) reported by -X importtime"""
+    proc = subprocess.run([sys.executable, "-X", "importtime"] + args[1:], cwd=HERE,
+                          capture_output=True, text=True)
+    imports = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        # Nested imports are indented under their parent
+        if not name.startswith("  ") and cumulative.strip().isdigit():
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start time of each atktools subcommand.")
+    parser.add_argument("--repeat", type=int, default=7, help="Runs per command (default: 7)")
+    parser.add_argument("--commands", nargs="+", choices=sorted(COMMANDS), help="Commands to measure (default: all)")
+    parser.add_argument("--importtime", action="store_true", help="List the slowest imports of each command")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    targets = [("python (no imports)", [sys.executable, "-c", "pass"]),
+               ("atktools --help", [sys.executable, ATKTOOLS, "--help"])]
+    targets += [(name, [sys.executable, ATKTOOLS, name, "--help"]) for name in args.commands or COMMANDS]
+
+    results = []
+    print(f"{'command':>20} {'median ms':>10} {'min ms':>8}  status")
+    for name, command in targets:
+        times, returncode, error = time_command(command, args.repeat)
+        result = {"command": name, "median_ms": round(statistics.median(times) * 1000, 1),
+                  "min_ms": round(min(times) * 1000, 1), "ok": returncode == 0}
+        if returncode:
+            result["error"] = error
+        results.append(result)
+
+        status = "ok" if returncode == 0 else f"unavailable: {error}"
+        if returncode == 0:
+            print(f"{name:>20} {result['median_ms']:10.1f} {result['min_ms']:8.1f}  {status}")
+        else:
+            print(f"{name:>20} {'-':>10} {'-':>8}  {status}")
+
+        if args.importtime and returncode == 0 and name in COMMANDS:
+            result["slowest_imports"] = slowest_imports(command)
+            for micros, module in result["slowest_imports"]:
+                print(f"{'':>20} {micros / 1000:10.1f} ms  import {module}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"python": sys.version.split()[0], "repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+CPU Thread Scaling Benchmark
+
+Sweeps the intra-op and inter-op thread counts of the benchmark_harness.py matmul
+workload on the CPU, for PyTorch, TensorFlow and NumPy, to size the CPU limits of
+containers that run these frameworks.
+
+- Every thread configuration runs in a fresh subprocess: frameworks fix their
+  thread pools on first use, and a new process starts from a clean resident set
+- Thread counts are applied through the framework API and the OMP / MKL /
+  OpenBLAS environment variables; with --pin the process is also bound to as many
+  CPUs as it has intra-op threads, like a container with that CPU limit
+- For every backend, size and inter-op count: GFLOPS, speedup and scaling
+  efficiency (speedup / threads) against the smallest thread count, how much the
+  resident set grew for each size, and the fewest threads that reach --target of the best GFLOPS
+- The CPU topology is recorded: logical CPUs, the affinity mask, NUMA nodes and
+  their CPUs, the cgroup CPU quota and OMP/KMP affinity settings
+
+Usage:
+    python benchmark_threads.py [--backends torch tensorflow] [--threads 1 2 4 8] [--inter 1 2]
+                                [--sizes 1024 2048 4096] [--repeat 10] [--pin] [--json threads.json]
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+import subprocess
+import importlib.util
+
+from benchmark_harness import BACKENDS, load_backend, run_benchmark
+
+SIZES = (1024, 2048, 4096)
+REPEAT = 10
+THREAD_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+AFFINITY_VARIABLES = ("OMP_PROC_BIND", "OMP_PLACES", "KMP_AFFINITY", "GOMP_CPU_AFFINITY")
+
+
+def allowed_cpus():
+    """CPUs this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_ranges(cpus):
+    """[0, 1, 2, 3, 8] -> '0-3,8'"""
+    ranges = []
+    for cpu in sorted(cpus):
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def _read(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def cgroup_cpu_limit():
+    """CPUs allowed by the cgroup quota (cgroup v2 or v1), None without a limit"""
+    v2 = _read("/sys/fs/cgroup/cpu.max")
+    if v2:
+        quota, period = (v2.split() + ["100000"])[:2]
+        return None if quota == "max" else round(int(quota) / int(period), 2)
+    quota, period = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us"), _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us")
+    if quota and period and int(quota) > 0:
+        return round(int(quota) / int(period), 2)
+    return None
+
+
+def cpu_topology():
+    """Logical CPUs, affinity, NUMA nodes, cgroup quota and affinity environment of this process"""
+    nodes = {}
+    for path in sorted(glob.glob("/sys/devices/system/node/node[0-9]*/cpulist")):
+        nodes[os.path.basename(os.path.dirname(path))] = _read(path)
+    memory_nodes = None
+    status = _read("/proc/self/status") or ""
+    for line in status.splitlines():
+        if line.startswith("Mems_allowed_list:"):
+            memory_nodes = line.split(":", 1)[1].strip()
+    return {
+        "logical_cpus": os.cpu_count(),
+        "affinity": cpu_ranges(allowed_cpus()),
+        "numa_nodes": nodes or None,
+        "memory_nodes": memory_nodes,
+        "cgroup_cpu_limit": cgroup_cpu_limit(),
+        "environment": {name: os.environ[name] for name in AFFINITY_VARIABLES + THREAD_VARIABLES
+                        if name in os.environ},
+    }
+
+
+def worker(config):
+    """Run in the subprocess: apply the thread settings, run every size, return the results"""
+    if config["pin"] and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, config["cpus"][:config["intra"]])
+    backend = load_backend(config["backend"])
+    if backend is None:
+        return {"error": f"{config['backend']} is not installed"}
+    backend.set_threads(config["intra"], config["inter"])
+    device = backend.device("cpu")
+
+    results = []
+    for size in sorted(set(config["sizes"])):
+        try:
+            result = run_benchmark(backend, device, size, "fp32", config["repeat"])
+        except backend.errors + (MemoryError,) as e:
+            results.append({"size": size, "error": str(e).splitlines()[0]})
+            continue
+        results.append(result)
+    return {"threads": backend.threads(), "topology": cpu_topology(), "results": results}
+
+
+def run_configuration(backend, intra, inter, sizes, repeat, pin, cpus):
+    """Run one thread configuration in a new interpreter and return its worker output"""
+    config = {"backend": backend, "intra": intra, "inter": inter, "sizes": sizes, "repeat": repeat,
+              "pin": pin, "cpus": cpus}
+    env = dict(os.environ)
+    env.update({name: str(intra) for name in THREAD_VARIABLES})
+    env["TF_CPP_MIN_LOG_LEVEL"] = env.get("TF_CPP_MIN_LOG_LEVEL", "2")
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", json.dumps(config)],
+                          capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit code {proc.returncode}"}
+    # The JSON is the last line; frameworks may print to stdout before it
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def add_scaling(rows):
+    """Add speedup and efficiency against the fewest threads of the same backend, size and inter-op count"""
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["backend"], row["size"], row["inter"]), []).append(row)
+    for group in groups.values():
+        base = min(group, key=lambda row: row["intra"])
+        for row in group:
+            row["speedup"] = round(base["median_ms"] / row["median_ms"], 2)
+            row["efficiency"] = round(row["speedup"] * base["intra"] / row["intra"], 2)
+
+
+def recommendations(rows, target):
+    """Fewest intra-op threads reaching target x the best GFLOPS, per backend and size"""
+    best = {}
+    for row in rows:
+        key = (row["backend"], row["size"])
+        best[key] = max(best.get(key, 0), row["gflops"])
+    advice = []
+    for (backend, size), gflops in sorted(best.items()):
+        enough = [row for row in rows if (row["backend"], row["size"]) == (backend, size) and row["gflops"] >= target * gflops]
+        row = min(enough, key=lambda row: (row["intra"], row["inter"]))
+        advice.append({"backend": backend, "size": size, "intra": row["intra"], "inter": row["inter"],
+                       "gflops": row["gflops"], "best_gflops": gflops})
+    return advice
+
+
+def default_threads(cpus):
+    """Powers of two up to the number of allowed CPUs, and that number"""
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    return counts + ([cpus] if counts[-1] != cpus else [])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep CPU thread counts of the matmul benchmark per framework.")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=["torch", "tensorflow"],
+                        help="Backends to sweep (default: torch tensorflow)")
+    parser.add_argument("--threads", type=int, nargs="+", help="Intra-op thread counts (default: 1 2 4 ... allowed CPUs)")
+    parser.add_argument("--inter", type=int, nargs="+", default=[1], help="Inter-op thread counts (default: 1)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES),
+                        help=f"Matrix sizes (default: {' '.join(map(str, SIZES))})")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help=f"Timed runs per size (default: {REPEAT})")
+    parser.add_argument("--pin", action="store_true", help="Bind each run to as many CPUs as intra-op threads")
+    parser.add_argument("--target", type=float, default=0.9,
+                        help="Share of the best GFLOPS for the thread recommendation (default: 0.9)")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(worker(json.loads(args.worker))))
+        return 0
+
+    cpus = allowed_cpus()
+    topology = cpu_topology()
+    print(f"{topology['logical_cpus']} logical CPUs, affinity {topology['affinity']}, "
+          f"NUMA nodes {topology['numa_nodes'] or '-'}, cgroup CPU limit {topology['cgroup_cpu_limit'] or 'none'}")
+
+    thread_counts = sorted(set(args.threads or default_threads(len(cpus))))
+    rows = []
+    print(f"{'backend':>10} {'intra':>5} {'inter':>5} {'size':>6} {'median ms':>10} {'GFLOPS':>9} {'RSS growth MB':>13}")
+    for backend in args.backends:
+        # Checked without importing: only the subprocesses import the frameworks
+        if importlib.util.find_spec(backend) is None:
+            print(f"{backend:>10}  not installed")
+            continue
+        for inter in args.inter:
+            for intra in thread_counts:
+                output = run_configuration(backend, intra, inter, args.sizes, args.repeat, args.pin, cpus)
+                if "error" in output:
+                    print(f"{backend:>10} {intra:>5} {inter:>5}  failed: {output['error']}")
+                    continue
+                for result in output["results"]:
+                    if "error" in result:
+                        print(f"{backend:>10} {intra:>5} {inter:>5} {result['size']:>6}  failed: {result['error']}")
+                        continue
+                    row = {"backend": backend, "intra": intra, "inter": inter, "actual_threads": output["threads"],
+                           "affinity": output["topology"]["affinity"]}
+                    row.update({key: result[key] for key in ("size", "median_ms", "p5_ms", "p95_ms", "gflops",
+                                                             "matrices_mb", "rss_growth_mb", "process_peak_rss_mb")})
+                    rows.append(row)
+                    print(f"{backend:>10} {intra:>5} {inter:>5} {row['size']:>6} {row['median_ms']:10.2f} "
+                          f"{row['gflops']:9.1f} {row['rss_growth_mb'] if row['rss_growth_mb'] is not None else '-':>13}")
+
+    add_scaling(rows)
+    if rows:
+        print(f"\n{'backend':>10} {'size':>6} {'inter':>5} " + " ".join(f"{f'{n} thr':>8}" for n in thread_counts)
+              + "   (scaling efficiency)")
+        for key in sorted({(row["backend"], row["size"], row["inter"]) for row in rows}):
+            cells = {row["intra"]: row["efficiency"] for row in rows if (row["backend"], row["size"], row["inter"]) == key}
+            print(f"{key[0]:>10} {key[1]:>6} {key[2]:>5} "
+                  + " ".join(f"{cells[n]:8.2f}" if n in cells else f"{'-':>8}" for n in thread_counts))
+
+    advice = recommendations(rows, args.target)
+    if advice:
+        print(f"\nFewest threads reaching {args.target:.0%} of the best GFLOPS:")
+        for a in advice:
+            print(f"  {a['backend']:>10} size {a['size']:>6}: {a['intra']} intra-op / {a['inter']} inter-op "
+                  f"({a['gflops']} of {a['best_gflops']} GFLOPS)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({"topology": topology, "pin": args.pin, "results": rows, "recommendations": advice}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+BTC Cycle Strategy Backtest
+
+Backtests simple rules on the halving cycles of btc_cycles_comparison.py, driven by
+the price as a percentage of the cycle's low-high range, over a whole parameter grid
+at once:
+
+- threshold: go all in when the percentage falls to buy_level or below, all out when
+  it reaches sell_level or above
+- dca: buy a fixed amount every `interval` days, only while the percentage is at most
+  max_pct
+
+Parameters x cycles x days are broadcast as one float32 NumPy array per chunk of
+parameters (no Python loop over days, cycles or parameter values), so a 10,000
+combination grid runs in seconds. Each combination gets the return, maximum drawdown
+and exposure or number of buys per cycle; equity curves are computed for the best
+combinations.
+
+The default range is the whole cycle window's low and high, as in
+btc_cycles_comparison.py, which looks ahead; --range-mode expanding uses the low and
+high so far instead, which a live strategy could have known.
+
+Usage:
+    python btc_backtest.py [--strategy threshold dca] [--buy-levels 0 50 0.5] [--sell-levels 50 100 0.5]
+                           [--intervals 1 60] [--max-pct 10 100 5] [--range-mode cycle|expanding]
+                           [--top 10] [--equity equity.csv]
+"""
+
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from btc_cycles_comparison import HALVING_DATES, WINDOW_DAYS, align_cycles, load_prices, normalise_cycles
+from data.btc_get_data import STORE_PATH
+
+CHUNK = 2048  # parameter combinations per broadcast block
+
+
+def cycle_data(prices, halving_dates=HALVING_DATES, before=WINDOW_DAYS, after=WINDOW_DAYS, range_mode='cycle'):
+    """Cycles x days arrays for the backtests; cycles without any price are left out.
+
+    Returns:
+        dict: halvings, offsets (days since halving), prices (forward-filled within
+        each cycle), valid (a price was recorded that day), pct (percentage of range)
+        and returns (daily price change, 0 without data)
+    """
+    offsets, matrix = align_cycles(prices, halving_dates, before, after)
+    keep = ~np.isnan(matrix).all(axis=0)
+    raw = matrix[:, keep].T
+    valid = ~np.isnan(raw)
+
+    if range_mode == 'cycle':
+        pct = normalise_cycles(matrix[:, keep]).T
+    elif range_mode == 'expanding':
+        # fmin/fmax skip NaN, so days without data do not reset the range
+        low = np.fmin.accumulate(raw, axis=1)
+        high = np.fmax.accumulate(raw, axis=1)
+        with np.errstate(invalid='ignore'):
+            pct = (raw - low) / np.where(high > low, high - low, np.nan) * 100
+    else:
+        raise ValueError(f"Unknown range mode {range_mode!r}")
+
+    # Forward-fill missing days within a cycle; days before its first price stay NaN
+    last_seen = np.maximum.accumulate(np.where(valid, np.arange(raw.shape[1]), 0), axis=1)
+    filled = np.take_along_axis(raw, last_seen, axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.nan_to_num(filled[:, 1:] / filled[:, :-1] - 1)
+    returns = np.concatenate([np.zeros((raw.shape[0], 1)), returns], axis=1)
+
+    return {
+        'halvings': pd.to_datetime(np.asarray(halving_dates)[keep]),
+        'offsets': offsets,
+        'prices': np.nan_to_num(filled).astype(np.float32),
+        'inverse': np.where(valid, 1 / np.where(valid, raw, 1), 0).astype(np.float32),
+        'valid': valid,
+        'pct': pct.astype(np.float32),
+        'returns': returns.astype(np.float32),
+    }
+
+
+def threshold_equity(data, buy_level, sell_level):
+    """Equity curves (params x cycles x days) and number of trades of the threshold rule"""
+    buy = np.asarray(buy_level, dtype=np.float32)[:, None, None]
+    sell = np.asarray(sell_level, dtype=np.float32)[:, None, None]
+    pct = data['pct'][None]
+    days = data['pct'].shape[1]
+
+    # +1 buy, -1 sell, 0 nothing (NaN percentages compare False)
+    signal = (pct <= buy).astype(np.int8) - (pct >= sell).astype(np.int8)
+    # The position follows the last non-zero signal so far
+    last_signal = np.maximum.accumulate(np.where(signal != 0, np.arange(days, dtype=np.int32), -1), axis=-1)
+    position = (np.take_along_axis(signal, np.maximum(last_signal, 0), axis=-1) == 1) & (last_signal >= 0)
+    # Trades happen at the close, so day t earns the return of the position held after day t - 1
+    held = np.zeros(position.shape, dtype=np.float32)
+    held[..., 1:] = position[..., :-1]
+
+    equity = np.cumprod(1 + held * data['returns'][None], axis=-1, dtype=np.float32)
+    trades = np.count_nonzero(np.diff(position, axis=-1), axis=-1) + position[..., 0]
+    return equity, {'exposure_pct': held.mean(axis=-1) * 100, 'trades': trades}
+
+
+def dca_equity(data, interval, max_pct):
+    """Value per unit invested (params x cycles x days) and number of buys of the DCA rule"""
+    interval = np.asarray(interval, dtype=np.int32)[:, None, None]
+    max_pct = np.asarray(max_pct, dtype=np.float32)[:, None, None]
+    days = np.arange(data['pct'].shape[1], dtype=np.int32)
+
+    buys = (days % interval == 0) & data['valid'][None] & ((data['pct'][None] <= max_pct) | (max_pct >= 100))
+    invested = np.cumsum(buys, axis=-1, dtype=np.float32)
+    units = np.cumsum(buys * data['inverse'][None], axis=-1, dtype=np.float32)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        equity = np.where(invested > 0, units * data['prices'][None] / invested, np.float32(1))
+    return equity, {'buys': invested[..., -1]}
+
+
+STRATEGIES = {
+    'threshold': (threshold_equity, ('buy_level', 'sell_level')),
+    'dca': (dca_equity, ('interval', 'max_pct')),
+}
+
+
+def run_grid(data, strategy, params, chunk=CHUNK):
+    """Backtest every parameter combination on every cycle.
+
+    Args:
+        data (dict): From cycle_data()
+        strategy (str): 'threshold' or 'dca'
+        params (dict): Parameter name -> 1-D array; all arrays have one value per combination
+        chunk (int): Combinations broadcast together (bounds the memory)
+
+    Returns:
+        pd.DataFrame: One row per combination with its parameters, the mean and worst
+        return over the cycles, mean max drawdown, the strategy's activity measure
+        and the return of every cycle
+    """
+    function, names = STRATEGIES[strategy]
+    values = [np.asarray(params[name]) for name in names]
+    count = len(values[0])
+    cycles = len(data['halvings'])
+    returns = np.empty((count, cycles), dtype=np.float32)
+    drawdowns = np.empty((count, cycles), dtype=np.float32)
+    activity = {}
+
+    for start in range(0, count, chunk):
+        stop = min(start + chunk, count)
+        equity, extra = function(data, *(value[start:stop] for value in values))
+        returns[start:stop] = (equity[..., -1] - 1) * 100
+        drawdowns[start:stop] = (equity / np.maximum.accumulate(equity, axis=-1) - 1).min(axis=-1) * 100
+        for name, value in extra.items():
+            activity.setdefault(name, np.empty((count, cycles), dtype=np.float32))[start:stop] = value
+
+    results = pd.DataFrame({name: value for name, value in zip(names, values)})
+    results['mean_return_pct'] = returns.mean(axis=1)
+    results['worst_return_pct'] = returns.min(axis=1)
+    results['mean_max_drawdown_pct'] = drawdowns.mean(axis=1)
+    for name, value in activity.items():
+        results[f'mean_{name}'] = value.mean(axis=1)
+    for cycle, halving in enumerate(data['halvings']):
+        results[f'return_{halving:%Y}'] = returns[:, cycle]
+    return results
+
+
+def equity_curves(data, strategy, results):
+    """Tidy equity curves (combination, halving, day, equity) for the rows of results"""
+    function, names = STRATEGIES[strategy]
+    equity, _ = function(data, *(results[name].to_numpy() for name in names))
+    combinations, cycles, days = equity.shape
+    return pd.DataFrame({
+        'combination': np.repeat(results.index.to_numpy(), cycles * days),
+        'halving': np.tile(np.repeat(data['halvings'].values, days), combinations),
+        'day': np.tile(data['offsets'], combinations * cycles),
+        'equity': equity.ravel(),
+    })
+
+
+def threshold_grid(buy_levels, sell_levels):
+    buy, sell = np.meshgrid(buy_levels, sell_levels, indexing='ij')
+    keep = buy < sell
+    return {'buy_level': buy[keep], 'sell_level': sell[keep]}
+
+
+def dca_grid(intervals, max_pcts):
+    interval, max_pct = np.meshgrid(intervals, max_pcts, indexing='ij')
+    return {'interval': interval.ravel(), 'max_pct': max_pct.ravel()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest threshold and DCA rules over every halving cycle.")
+    parser.add_argument("--store", default=STORE_PATH, help="Price store CSV (default: data/btc_price_history.csv)")
+    parser.add_argument("--strategy", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES),
+                        help="Strategies to test (default: threshold dca)")
+    parser.add_argument("--halvings", nargs="+", default=list(HALVING_DATES), help="Halving dates (YYYY-MM-DD)")
+    parser.add_argument("--before", type=int, default=WINDOW_DAYS, help=f"Days before each halving (default: {WINDOW_DAYS})")
+    parser.add_argument("--after", type=int, default=WINDOW_DAYS, help=f"Days after each halving (default: {WINDOW_DAYS})")
+    parser.add_argument("--range-mode", choices=('cycle', 'expanding'), default='cycle',
+                        help="Range of the percentage: the whole cycle window or the low/high so far")
+    parser.add_argument("--buy-levels", type=float, nargs=3, default=(0, 50, 0.5), metavar=("FIRST", "STOP", "STEP"),
+                        help="Threshold buy levels in %% of range (default: 0 50 0.5)")
+    parser.add_argument("--sell-levels", type=float, nargs=3, default=(50, 100, 0.5), metavar=("FIRST", "STOP", "STEP"),
+                        help="Threshold sell levels in %% of range (default: 50 100 0.5)")
+    parser.add_argument("--intervals", type=int, nargs=2, default=(1, 60), metavar=("FIRST", "LAST"),
+                        help="DCA intervals in days (default: 1 60)")
+    parser.add_argument("--max-pct", type=float, nargs=3, default=(10, 100, 5), metavar=("FIRST", "LAST", "STEP"),
+                        help="DCA buy limits in %% of range, LAST included (default: 10 100 5)")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help=f"Combinations per block (default: {CHUNK})")
+    parser.add_argument("--top", type=int, default=10, help="Best combinations to show (default: 10)")
+    parser.add_argument("--csv", help="Write all results to this CSV file (strategy name appended)")
+    parser.add_argument("--equity", help="Write the equity curves of the top combinations to this CSV file")
+    args = parser.parse_args(argv)
+
+    data = cycle_data(load_prices(args.store), args.halvings, args.before, args.after, args.range_mode)
+    grids = {
+        'threshold': lambda: threshold_grid(np.arange(*args.buy_levels), np.arange(*args.sell_levels)),
+        'dca': lambda: dca_grid(np.arange(args.intervals[0], args.intervals[1] + 1),
+                                np.arange(args.max_pct[0], args.max_pct[1] + args.max_pct[2] / 2, args.max_pct[2])),
+    }
+
+    curves = []
+    for strategy in args.strategy:
+        params = grids[strategy]()
+        start = time.perf_counter()
+        results = run_grid(data, strategy, params, args.chunk)
+        seconds = time.perf_counter() - start
+
+        top = results.nlargest(args.top, 'mean_return_pct')
+        print(f"\n{strategy}: {len(results):,d} combinations x {len(data['halvings'])} cycles x "
+              f"{len(data['offsets'])} days in {seconds:.2f}s ({len(results) / seconds:,.0f} combinations/s)")
+        with pd.option_context('display.width', 160, 'display.max_columns', 20):
+            print(top.round(2).to_string())
+
+        if args.csv:
+            results.to_csv(f"{os.path.splitext(args.csv)[0]}_{strategy}.csv", index_label='combination')
+        if args.equity:
+            curves.append(equity_curves(data, strategy, top).assign(strategy=strategy))
+
+    if args.equity and curves:
+        pd.concat(curves, ignore_index=True).to_csv(args.equity, index=False)
+
+
+if __name__ == "__main__":
+    main()
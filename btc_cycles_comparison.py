@@ -1,26 +1,159 @@
+"""
+BTC Halving Cycle Comparison
+
+Aligns the BTC price on the days around every halving and compares the cycles.
+
+- All cycles are aligned at once: a NumPy matrix of days since halving x cycle is
+  filled with one searchsorted over the price dates, so adding a halving or changing
+  the window is just another argument
+- Each cycle is normalised to its own low and high (0-100 % of its range) in one
+  vectorised pass; days without data (weekends missing from the CSV, or a cycle
+  before the start of the history) stay NaN instead of being filled in
+- The result is a tidy panel (halving, day, date, price, percentage) plus per-cycle
+  statistics and the correlation of the normalised cycles
+
+Usage:
+    python btc_cycles_comparison.py [--before 304] [--after 304] [--halvings 2016-07-09 2020-05-11]
+                                    [--column Close] [--panel cycles.csv]
+"""
+
+import argparse
+
+import numpy as np
 import pandas as pd
-from pandas.tseries.offsets import DateOffset
+
+from data.btc_get_data import STORE_PATH
+from data.btc_price_cache import DATE_COLUMN, load_columns
+
+HALVING_DATES = ("2012-11-28", "2016-07-09", "2020-05-11", "2024-04-20")
+WINDOW_DAYS = 304  # about 10 months on either side of a halving
+
+
+def load_prices(path=STORE_PATH, column='Close'):
+    """Daily prices from the price store as a Series indexed by date, sorted and without duplicates.
+
+    Read through the columnar cache (data/btc_price_cache.py), so the CSV is only
+    parsed on the first run after it changed.
+    """
+    columns = load_columns(path, columns=[column])
+    index = pd.DatetimeIndex(columns[DATE_COLUMN].astype('datetime64[ns]'))
+    prices = pd.Series(columns[column], index=index, name=column, copy=False)
+    if not (index.is_monotonic_increasing and index.is_unique):
+        prices = prices.sort_index()
+        prices = prices[~prices.index.duplicated(keep='last')]
+    return prices
+
+
+def align_cycles(prices, halving_dates=HALVING_DATES, before=WINDOW_DAYS, after=WINDOW_DAYS):
+    """Align prices on days since each halving.
+
+    Returns:
+        (offsets, matrix): offsets are the days since halving (-before..after) and
+        matrix[i, j] the price offsets[i] days after halving_dates[j], NaN without data
+    """
+    days = prices.index.values.astype('datetime64[D]')
+    values = prices.to_numpy(dtype=float)
+    offsets = np.arange(-before, after + 1)
+    targets = np.array(halving_dates, dtype='datetime64[D]')[None, :] + offsets[:, None]
+
+    if not len(days):
+        return offsets, np.full(targets.shape, np.nan)
+    positions = np.minimum(np.searchsorted(days, targets), len(days) - 1)
+    matrix = np.where(days[positions] == targets, values[positions], np.nan)
+    return offsets, matrix
+
+
+def normalise_cycles(matrix):
+    """Each column as a percentage of its own low-high range; all-NaN or flat columns stay NaN"""
+    missing = np.isnan(matrix)
+    low = np.where(missing, np.inf, matrix).min(axis=0)
+    high = np.where(missing, -np.inf, matrix).max(axis=0)
+    span = np.where(high > low, high - low, np.nan)
+    return (matrix - low) / span * 100
+
+
+def cycle_panel(prices, halving_dates=HALVING_DATES, before=WINDOW_DAYS, after=WINDOW_DAYS):
+    """Tidy DataFrame with one row per cycle and day that has a price"""
+    offsets, matrix = align_cycles(prices, halving_dates, before, after)
+    percentage = normalise_cycles(matrix)
+    halvings = pd.to_datetime(list(halving_dates))
+
+    panel = pd.DataFrame({
+        'halving': np.tile(halvings.values, len(offsets)),
+        'day': np.repeat(offsets, len(halvings)),
+        'price': matrix.ravel(),
+        'percentage': percentage.ravel(),
+    })
+    panel.insert(2, 'date', panel['halving'] + pd.to_timedelta(panel['day'], unit='D'))
+    return panel.dropna(subset=['price']).reset_index(drop=True)
+
+
+def cycle_stats(prices, halving_dates=HALVING_DATES, before=WINDOW_DAYS, after=WINDOW_DAYS):
+    """Per-cycle statistics: coverage, low and high (with their day), and change over the window"""
+    offsets, matrix = align_cycles(prices, halving_dates, before, after)
+    available = ~np.isnan(matrix)
+    has_data = available.any(axis=0)
+    columns = np.arange(matrix.shape[1])
+
+    low_index = np.where(available, matrix, np.inf).argmin(axis=0)
+    high_index = np.where(available, matrix, -np.inf).argmax(axis=0)
+    # First and last day with a price in each cycle
+    first_index = available.argmax(axis=0)
+    last_index = len(offsets) - 1 - available[::-1].argmax(axis=0)
+    halving_row = before if 0 <= before < len(offsets) else None
+
+    def pick(rows):
+        return np.where(has_data, matrix[rows, columns], np.nan)
+
+    def day(rows):
+        return pd.Series(offsets[rows], dtype='Int64').where(has_data)
+
+    stats = pd.DataFrame({
+        'halving': pd.to_datetime(list(halving_dates)),
+        'days': available.sum(axis=0),
+        'low': pick(low_index),
+        'low_day': day(low_index),
+        'high': pick(high_index),
+        'high_day': day(high_index),
+        'at_halving': matrix[halving_row] if halving_row is not None else np.nan,
+        'first': pick(first_index),
+        'last': pick(last_index),
+    })
+    stats['high_low_ratio'] = stats['high'] / stats['low']
+    stats['change_pct'] = (stats['last'] / stats['first'] - 1) * 100
+    return stats.set_index('halving')
 
 
-# Load the historical Bitcoin data from the saved CSV file
-btc_data = pd.read_csv('./data/btc_price_history.csv', index_col='Date', parse_dates=True)
+def cycle_correlation(panel):
+    """Correlation of the normalised cycles on the days they share"""
+    wide = panel.pivot(index='day', columns='halving', values='percentage')
+    return wide.corr(min_periods=30)
 
 
-# Example for the 1st halving cycle
-halving_date = pd.Timestamp('2012-11-28')
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare BTC price cycles around the halvings.")
+    parser.add_argument("--store", default=STORE_PATH, help="Price store CSV (default: data/btc_price_history.csv)")
+    parser.add_argument("--column", default='Close', help="Price column to compare (default: Close)")
+    parser.add_argument("--halvings", nargs="+", default=list(HALVING_DATES), help="Halving dates (YYYY-MM-DD)")
+    parser.add_argument("--before", type=int, default=WINDOW_DAYS, help=f"Days before each halving (default: {WINDOW_DAYS})")
+    parser.add_argument("--after", type=int, default=WINDOW_DAYS, help=f"Days after each halving (default: {WINDOW_DAYS})")
+    parser.add_argument("--panel", help="Write the tidy panel to this CSV file")
+    args = parser.parse_args(argv)
 
-# Calculate start and end dates for the cycle range
-start_date = halving_date - DateOffset(months=10)
-end_date = halving_date + DateOffset(months=10)
+    prices = load_prices(args.store, args.column)
+    panel = cycle_panel(prices, args.halvings, args.before, args.after)
+    stats = cycle_stats(prices, args.halvings, args.before, args.after)
 
-# Slice the DataFrame to get data for this cycle
-cycle_data = btc_data.loc[start_date:end_date]
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        print(f"Cycles from {args.before} days before to {args.after} days after each halving ({args.column})\n")
+        print(stats.round(2))
+        print("\nCorrelation of the normalised cycles:")
+        print(cycle_correlation(panel).round(3))
 
-# Find low and high prices
-low_price = cycle_data['Close'].min()
-high_price = cycle_data['Close'].max()
+    if args.panel:
+        panel.to_csv(args.panel, index=False)
+        print(f"\nPanel with {len(panel)} rows written to {args.panel}")
 
-# Calculate price as percentage of the range
-cycle_data['Percentage'] = (cycle_data['Close'] - low_price) / (high_price - low_price) * 100
 
-# Now cycle_data includes the price percentage for each day in the cycle range
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,132 @@
-import yfinance as yf
+"""
+BTC Price History
+
+Rolling cycle statistics of the BTC-USD history from the local price store
+(data/btc_price_history.csv, kept up to date by data/btc_get_data.py), at daily,
+weekly and monthly resolution.
+
+For every resolution the OHLCV bars are resampled once and these columns are added,
+each in one vectorised O(n) pass:
+- ath: all-time high so far, and drawdown_pct: close below it in percent
+- rolling_low / rolling_high: lowest low and highest high of the last `window` bars
+- range_pct: close as a percentage of that rolling range
+
+The result is cached per (store, resolution, window), so querying any date range
+afterwards is a slice of the cached frame without recomputation. Only the latest
+store version is kept: a changed store replaces the cached frames instead of adding
+to them, so long sessions do not accumulate old versions.
+
+Usage:
+    python btc_price_history.py [--update] [--resolution D W M] [--window D=365 W=52 M=12]
+                                [--start 2020-05-11] [--end 2024-05-01]
+"""
+
+import argparse
+
 import pandas as pd
 
-# Fetch historical data for Bitcoin
-btc = yf.Ticker("BTC-USD")
+from data.btc_get_data import STORE_PATH, load_history, update_store
+from data.btc_price_cache import cache_key
+
+# Resolution -> pandas resample rule; months are labelled by their first day
+RESOLUTIONS = {'D': 'D', 'W': 'W', 'M': 'MS'}
+WINDOWS = {'D': 365, 'W': 52, 'M': 12}  # one year
+OHLCV = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+# (path, resolution, window) -> (store version, statistics frame)
+_stats_cache = {}
+
+
+def resample(history, resolution):
+    """OHLCV bars of one resolution; bars without any trade are dropped"""
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown resolution {resolution!r}, expected one of {', '.join(RESOLUTIONS)}")
+    bars = history[list(OHLCV)]
+    if resolution != 'D':
+        bars = bars.resample(RESOLUTIONS[resolution]).agg(OHLCV)
+    return bars.dropna(subset=['Close'])
+
+
+def rolling_stats(bars, window):
+    """bars with ath, drawdown_pct, rolling_low, rolling_high and range_pct columns added"""
+    ath = bars['High'].cummax()
+    rolling_low = bars['Low'].rolling(window, min_periods=1).min()
+    rolling_high = bars['High'].rolling(window, min_periods=1).max()
+    span = (rolling_high - rolling_low).where(rolling_high > rolling_low)
+    return bars.assign(
+        ath=ath,
+        drawdown_pct=(bars['Close'] / ath - 1) * 100,
+        rolling_low=rolling_low,
+        rolling_high=rolling_high,
+        range_pct=(bars['Close'] - rolling_low) / span * 100,
+    )
+
+
+def get_stats(resolution='D', window=None, path=STORE_PATH):
+    """Rolling statistics of one resolution, computed once per store version (treat as read-only)"""
+    window = window or WINDOWS[resolution]
+    key = (path, resolution, window)
+    # The version (the store's size and mtime) is checked, not keyed, so an old frame is replaced
+    version = cache_key(path)
+    cached = _stats_cache.get(key)
+    if cached is None or cached[0] != version:
+        cached = _stats_cache[key] = (version, rolling_stats(resample(load_history(path), resolution), window))
+    return cached[1]
+
+
+def query(start=None, end=None, resolution='D', window=None, path=STORE_PATH):
+    """Rows of get_stats() between start and end (inclusive), by slicing the cached frame"""
+    return get_stats(resolution, window, path).loc[start:end]
+
+
+def cycle_range(start=None, end=None, path=STORE_PATH):
+    """(low, high) of the daily bars between start and end"""
+    cycle_data = query(start, end, 'D', path=path)
+    return cycle_data['Low'].min(), cycle_data['High'].max()
+
 
-# Define the period for historical data, e.g., the last 5 years
-btc_hist = btc.history(period="5y")
+def parse_windows(values):
+    """['D=365', 'W=52'] -> {'D': 365, 'W': 52} on top of the defaults"""
+    windows = dict(WINDOWS)
+    for value in values or []:
+        resolution, _, bars = value.partition('=')
+        if resolution not in RESOLUTIONS or not bars.isdigit() or int(bars) < 1:
+            raise argparse.ArgumentTypeError(f"Invalid window {value!r}, expected e.g. W=52")
+        windows[resolution] = int(bars)
+    return windows
 
-# Display the data
-print(btc_hist)
 
-# Example: Finding the low and high within a specific period
-# You would replace 'start_date' and 'end_date' with the cycle start and end dates
-start_date = '2020-05-11'
-end_date = '2024-05-01'  # Hypothetical end date for illustration
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rolling BTC-USD cycle statistics from the local price store.")
+    parser.add_argument("--store", default=STORE_PATH, help="CSV store (default: data/btc_price_history.csv)")
+    parser.add_argument("--update", action="store_true", help="Fetch the missing days into the store first")
+    parser.add_argument("--resolution", nargs="+", choices=list(RESOLUTIONS), default=list(RESOLUTIONS),
+                        help="Resolutions to show (default: D W M)")
+    parser.add_argument("--window", nargs="+", metavar="RES=BARS",
+                        help="Rolling window per resolution (default: D=365 W=52 M=12)")
+    parser.add_argument("--start", default='2020-05-11', help="Start date (default: 2020-05-11)")
+    parser.add_argument("--end", default='2024-05-01', help="End date (default: 2024-05-01)")
+    parser.add_argument("--rows", type=int, default=10, help="Rows to show per resolution (default: 10)")
+    args = parser.parse_args(argv)
+    try:
+        windows = parse_windows(args.window)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
 
-# Filter the historical data for the cycle
-cycle_data = btc_hist.loc[start_date:end_date]
+    if args.update:
+        update_store(path=args.store)
 
-# Find the low and high prices in the cycle
-low_price = cycle_data['Low'].min()
-high_price = cycle_data['High'].max()
+    columns = ['Close', 'ath', 'drawdown_pct', 'rolling_low', 'rolling_high', 'range_pct']
+    with pd.option_context('display.width', 160, 'display.max_columns', 20):
+        for resolution in args.resolution:
+            stats = query(args.start, args.end, resolution, windows[resolution], args.store)
+            print(f"\n{resolution} bars from {args.start} to {args.end}, window {windows[resolution]} "
+                  f"({len(stats)} bars, last {args.rows}):")
+            print(stats[columns].tail(args.rows).round(2))
 
-print(f"Low Price: {low_price}, High Price: {high_price}")
+    low_price, high_price = cycle_range(args.start, args.end, args.store)
+    print(f"\nLow Price: {low_price}, High Price: {high_price}")
 
-# With the low and high prices, you could then calculate the percentage range for each month
-# This would involve similar logic to the hypothetical code provided, 
-# interpolating prices and calculating their relative positions between low and high.
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+BTC Cycle Similarity Search
+
+Finds the past windows of the BTC price history whose shape most resembles the
+current one (the last `window` days, or the days up to --end), for many window
+lengths at once.
+
+- z-normalised Euclidean distance profiles as in MASS (Mueen's algorithm for
+  similarity search): the sliding dot products of a query with the whole history
+  come from one FFT convolution, and the sliding means and standard deviations
+  from cumulative sums, so a profile costs O(n log n) instead of O(n * window)
+- The history is transformed once; the queries of all window lengths are
+  transformed together as the rows of one 2-D FFT
+- Top-k matches per window with an exclusion zone, so the k matches are distinct
+  episodes rather than neighbouring days; matches sharing any day with the query
+  are skipped, and with --end only the history up to that date is searched (the
+  returns after a match stop there too)
+- Every match is placed relative to the last halving before it (day of the cycle),
+  with the return over the following --horizon days
+
+Usage:
+    python btc_similarity.py [--windows 30 90 180 365] [--range 30 365 5] [--k 5] [--end 2024-02-01]
+                             [--horizon 90] [--exclusion 0.5]
+"""
+
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from btc_cycles_comparison import HALVING_DATES, load_prices
+from data.btc_get_data import STORE_PATH
+
+WINDOWS = (30, 90, 180, 365)
+FFT_BATCH_BYTES = 64 * 1024 * 1024  # memory for the query transforms of one batch
+
+
+def sliding_mean_std(x, m):
+    """Mean and standard deviation of every window of length m of x"""
+    csum = np.concatenate(([0.0], np.cumsum(x)))
+    csum2 = np.concatenate(([0.0], np.cumsum(x * x)))
+    mean = (csum[m:] - csum[:-m]) / m
+    var = (csum2[m:] - csum2[:-m]) / m - mean * mean
+    return mean, np.sqrt(np.maximum(var, 0))
+
+
+def distance_profiles(values, windows=WINDOWS, query_end=None):
+    """z-normalised distance of the query ending at query_end to every window of values.
+
+    Args:
+        values: The series (1-D)
+        windows: Window lengths; the query of length m is values[query_end - m:query_end]
+        query_end (int): End (exclusive) of the queries, default len(values)
+
+    Returns:
+        dict: window length -> distance profile, where profile[i] is the distance of
+        values[i:i + m] to the query (inf where the window is constant)
+    """
+    x = np.asarray(values, dtype=float)
+    x = x - x.mean()  # smaller magnitudes keep the cumulative sums accurate
+    n = len(x)
+    query_end = n if query_end is None else query_end
+    windows = sorted(set(int(m) for m in windows))
+    if not windows or windows[0] < 2 or windows[-1] > query_end:
+        raise ValueError(f"Window lengths must be between 2 and {query_end}")
+
+    size = 1 << (n + windows[-1] - 1).bit_length()
+    history = np.fft.rfft(x, size)
+    batch = max(1, FFT_BATCH_BYTES // (size * 16))
+
+    profiles = {}
+    for first in range(0, len(windows), batch):
+        group = windows[first:first + batch]
+        queries = np.zeros((len(group), size))
+        for row, m in enumerate(group):
+            queries[row, :m] = x[query_end - m:query_end][::-1]
+        # Row r, index i + m - 1: dot product of the query with x[i:i + m]
+        products = np.fft.irfft(np.fft.rfft(queries, axis=1) * history, size, axis=1)
+
+        for row, m in enumerate(group):
+            dot = products[row, m - 1:n]
+            mean, std = sliding_mean_std(x, m)
+            query = x[query_end - m:query_end]
+            query_mean, query_std = query.mean(), query.std()
+            with np.errstate(divide='ignore', invalid='ignore'):
+                correlation = (dot - m * mean * query_mean) / (m * std * query_std)
+            distance = np.sqrt(np.maximum(2 * m * (1 - correlation), 0))
+            distance[(std < 1e-12) | ~np.isfinite(distance)] = np.inf
+            profiles[m] = distance
+    return profiles
+
+
+def top_matches(profile, k, exclusion, forbidden=None):
+    """Indices of the k best windows, each at least `exclusion` positions from the others.
+
+    forbidden is a (start, stop) range of indices that may not match, e.g. the query itself.
+    """
+    profile = profile.copy()
+    if forbidden:
+        profile[max(forbidden[0], 0):max(forbidden[1], 0)] = np.inf
+    matches = []
+    for _ in range(k):
+        best = int(np.argmin(profile))
+        if not np.isfinite(profile[best]):
+            break
+        matches.append(best)
+        profile[max(0, best - exclusion):best + exclusion + 1] = np.inf
+    return matches
+
+
+def cycle_day(dates, halving_dates=HALVING_DATES):
+    """(last halving on or before each date, days since it); NaT/NaN before the first halving"""
+    halvings = np.array(halving_dates, dtype='datetime64[D]')
+    days = np.asarray(dates, dtype='datetime64[D]')
+    position = np.searchsorted(halvings, days, side='right') - 1
+    valid = position >= 0
+    halving = np.where(valid, halvings[np.maximum(position, 0)], np.datetime64('NaT'))
+    offset = np.where(valid, (days - halving).astype(float), np.nan)
+    return halving, offset
+
+
+def search(prices, windows=WINDOWS, k=5, end=None, horizon=90, exclusion=0.5, log=True,
+           halving_dates=HALVING_DATES):
+    """Top-k matches of the path up to end for every window length.
+
+    Args:
+        prices (pd.Series): Prices indexed by date
+        windows: Window lengths in bars (days for the daily store)
+        k (int): Matches per window
+        end: Last date of the query (default: the last price)
+        horizon (int): Bars after a match over which its following return is measured
+        exclusion (float): Minimum distance between matches, as a fraction of the window
+        log (bool): Compare log prices, so a path's shape does not depend on the price level
+
+    Returns:
+        pd.DataFrame: One row per match: window, rank, start, end, distance, the
+        match's halving and day of cycle, the query's day of cycle and the return
+        over the next horizon bars
+    """
+    prices = prices.dropna()
+    if end is not None:
+        # Only what was known at the end of the query: no matches or returns after it
+        prices = prices[prices.index <= pd.Timestamp(end)]
+    raw = prices.to_numpy(dtype=float)
+    values = np.log(raw) if log else raw
+    dates = prices.index.values
+    query_end = len(values)
+
+    profiles = distance_profiles(values, windows)
+    _, query_day = cycle_day(dates[query_end - 1:query_end], halving_dates)
+
+    rows = []
+    for m, profile in profiles.items():
+        query_start = query_end - m
+        zone = max(1, int(np.ceil(exclusion * m)))
+        # Windows starting after query_start - m share days with the query
+        for rank, start in enumerate(top_matches(profile, k, zone, (query_start - m + 1, query_end)), 1):
+            last = start + m - 1
+            following = last + horizon
+            rows.append({
+                'window': m,
+                'rank': rank,
+                'start': dates[start],
+                'end': dates[last],
+                'distance': profile[start],
+                'next_return_pct': (raw[following] / raw[last] - 1) * 100 if following < len(raw) else np.nan,
+            })
+
+    matches = pd.DataFrame(rows, columns=['window', 'rank', 'start', 'end', 'distance', 'next_return_pct'])
+    halving, day = cycle_day(matches['end'].values, halving_dates)
+    matches.insert(5, 'halving', pd.to_datetime(halving))
+    matches.insert(6, 'cycle_day', day)
+    matches.insert(7, 'query_cycle_day', query_day[0])
+    return matches
+
+
+def parse_range(values):
+    first, last, step = values
+    return list(range(first, last + 1, step))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find the past BTC price paths most similar to the current one.")
+    parser.add_argument("--store", default=STORE_PATH, help="Price store CSV (default: data/btc_price_history.csv)")
+    parser.add_argument("--column", default='Close', help="Price column (default: Close)")
+    parser.add_argument("--windows", type=int, nargs="+", default=list(WINDOWS),
+                        help=f"Window lengths in days (default: {' '.join(map(str, WINDOWS))})")
+    parser.add_argument("--range", type=int, nargs=3, metavar=("FIRST", "LAST", "STEP"),
+                        help="Use every window length from FIRST to LAST in steps of STEP instead")
+    parser.add_argument("--k", type=int, default=5, help="Matches per window (default: 5)")
+    parser.add_argument("--end", help="Last date of the query (default: the latest price)")
+    parser.add_argument("--horizon", type=int, default=90, help="Days after a match for its return (default: 90)")
+    parser.add_argument("--exclusion", type=float, default=0.5,
+                        help="Minimum gap between matches as a fraction of the window (default: 0.5)")
+    parser.add_argument("--no-log", dest="log", action="store_false", help="Compare prices instead of log prices")
+    parser.add_argument("--csv", help="Write all matches to this CSV file")
+    args = parser.parse_args(argv)
+
+    prices = load_prices(args.store, args.column)
+    windows = parse_range(args.range) if args.range else args.windows
+
+    start = time.perf_counter()
+    matches = search(prices, windows, args.k, args.end, args.horizon, args.exclusion, args.log)
+    seconds = time.perf_counter() - start
+
+    shown = matches if len(windows) <= 10 else matches[matches['rank'] == 1]
+    with pd.option_context('display.width', 160, 'display.max_columns', 20, 'display.max_rows', 200):
+        print(shown.round(2).to_string(index=False))
+    print(f"\n{len(set(windows))} window length(s) over {len(prices)} days searched in {seconds * 1000:.0f} ms")
+
+    if args.csv:
+        matches.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,180 @@
 # A try to avoide Pandoc and use python-docx instead
-from docx import Document
-from docx.oxml.ns import qn
+# Now reads the DOCX XML directly: the body is streamed once with iterparse and
+# every heading, paragraph and table is written as soon as it has been read, so
+# conversion time is linear and memory stays bounded on very large documents.
+import argparse
+import zipfile
+import xml.etree.ElementTree as ET
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def qn(tag):
+    """Clark notation for a w: tag, e.g. qn('w:p')"""
+    return "{%s}%s" % (W_NS, tag.split(':', 1)[1])
+
+
+W_P, W_TBL, W_TR, W_TC = qn('w:p'), qn('w:tbl'), qn('w:tr'), qn('w:tc')
+W_T, W_TAB, W_BR, W_CR = qn('w:t'), qn('w:tab'), qn('w:br'), qn('w:cr')
+W_PTAB, W_NB_HYPHEN = qn('w:ptab'), qn('w:noBreakHyphen')
+W_TXBX, W_PPR, W_PSTYLE, W_TCPR = qn('w:txbxContent'), qn('w:pPr'), qn('w:pStyle'), qn('w:tcPr')
+W_GRIDSPAN, W_VMERGE = qn('w:gridSpan'), qn('w:vMerge')
+W_STYLE, W_NAME, W_VAL, W_TYPE, W_STYLE_ID, W_DEFAULT = (
+    qn('w:style'), qn('w:name'), qn('w:val'), qn('w:type'), qn('w:styleId'), qn('w:default'))
+
+
+def read_paragraph_styles(docx):
+    """Return ({styleId: style name}, default paragraph style name) from word/styles.xml"""
+    try:
+        root = ET.fromstring(docx.read('word/styles.xml'))
+    except KeyError:
+        return {}, 'Normal'
+
+    names, default = {}, 'Normal'
+    for style in root.iter(W_STYLE):
+        if style.get(W_TYPE) != 'paragraph':
+            continue
+        name_el = style.find(W_NAME)
+        name = name_el.get(W_VAL) if name_el is not None else style.get(W_STYLE_ID)
+        # Built-in styles are stored lowercase ("heading 1"); Word shows "Heading 1"
+        if name and name.lower().startswith('heading '):
+            name = 'Heading ' + name[8:]
+        names[style.get(W_STYLE_ID)] = name
+        if style.get(W_DEFAULT) == '1':
+            default = name
+    return names, default
+
+
+def paragraph_text(p):
+    """Text of a w:p element the way python-docx reports it (tabs and breaks included)"""
+    parts = []
+
+    def walk(el):
+        for child in el:
+            tag = child.tag
+            if tag == W_T:
+                parts.append(child.text or '')
+            elif tag in (W_TAB, W_PTAB):
+                parts.append('\t')
+            elif tag == W_CR or (tag == W_BR and child.get(W_TYPE) in (None, 'textWrapping')):
+                parts.append('\n')
+            elif tag == W_NB_HYPHEN:
+                parts.append('-')
+            elif tag != W_TXBX and tag != W_PPR:
+                # Text boxes hold their own paragraphs and are not part of this one
+                walk(child)
+
+    walk(p)
+    return ''.join(parts)
+
+
+def table_rows(tbl):
+    """Yield the cell texts of each row, repeating merged cells like python-docx row.cells"""
+    previous = []
+
+    # Direct children only: rows of nested tables belong to a cell of this table
+    for tr in tbl.findall(W_TR):
+        cells = []
+        for tc in tr.findall(W_TC):
+            tc_pr = tc.find(W_TCPR)
+            span, merge = 1, None
+            if tc_pr is not None:
+                span_el = tc_pr.find(W_GRIDSPAN)
+                if span_el is not None:
+                    span = int(span_el.get(W_VAL, 1))
+                merge_el = tc_pr.find(W_VMERGE)
+                if merge_el is not None:
+                    merge = merge_el.get(W_VAL, 'continue')
+
+            if merge == 'continue':
+                start = len(cells)
+                cells.extend(previous[start:start + span] if len(previous) >= start + span
+                             else [''] * span)
+            else:
+                text = '\n'.join(paragraph_text(p) for p in tc.findall(W_P))
+                cells.extend([text] * span)
+        previous = cells
+        yield cells
+
 
 def convert_docx_to_markdown(docx_file, md_file):
-    doc = Document(docx_file)
-    md_content = []
-
-    def get_heading_level(style):
-        if style.startswith('Heading'):
-            try:
-                level = int(style.replace('Heading', '').strip())
-                return level
-            except ValueError:
-                return None
-        return None
-
-    def process_paragraph(paragraph):
-        style = paragraph.style.name
-        level = get_heading_level(style)
-        if level:
-            md_content.append(f"{'#' * level} {paragraph.text}\n")
-        else:
-            md_content.append(f"{paragraph.text}\n")
-
-    def process_table(table):
-        for i, row in enumerate(table.rows):
-            row_content = []
-            for cell in row.cells:
-                row_content.append(cell.text.strip().replace('\n', ' '))
-            md_content.append(' | '.join(row_content) + '\n')
-            if i == 0:
-                md_content.append(' | '.join(['---'] * len(row.cells)) + '\n')
-
-    def iter_block_items(parent):
-        """Yield each paragraph and table child within *parent*, in document order."""
-        for child in parent.element.body:
-            if child.tag == qn('w:p'):
-                yield 'paragraph', doc.paragraphs[next(paragraph_count)]
-            elif child.tag == qn('w:tbl'):
-                yield 'table', doc.tables[next(table_count)]
-
-    paragraph_count = iter(range(len(doc.paragraphs)))
-    table_count = iter(range(len(doc.tables)))
-
-    for block_type, block in iter_block_items(doc):
-        if block_type == 'paragraph':
-            process_paragraph(block)
-        elif block_type == 'table':
-            process_table(block)
-
-    with open(md_file, 'w', encoding='utf-8') as f:
-        f.writelines(md_content)
-
-# Usage example
-convert_docx_to_markdown('data/example.docx', 'tmp/example.md')
+    with zipfile.ZipFile(docx_file) as docx, open(md_file, 'w', encoding='utf-8') as out:
+        style_names, default_style = read_paragraph_styles(docx)
+
+        def get_heading_level(style):
+            if style.startswith('Heading'):
+                try:
+                    level = int(style.replace('Heading', '').strip())
+                    return level
+                except ValueError:
+                    return None
+            return None
+
+        def process_paragraph(p):
+            style = default_style
+            p_pr = p.find(W_PPR)
+            if p_pr is not None:
+                p_style = p_pr.find(W_PSTYLE)
+                if p_style is not None:
+                    style = style_names.get(p_style.get(W_VAL), default_style)
+            level = get_heading_level(style or '')
+            text = paragraph_text(p)
+            if level:
+                out.write(f"{'#' * level} {text}\n")
+            else:
+                out.write(f"{text}\n")
+
+        def process_table(tbl):
+            for i, row in enumerate(table_rows(tbl)):
+                row_content = [cell.strip().replace('\n', ' ') for cell in row]
+                out.write(' | '.join(row_content) + '\n')
+                if i == 0:
+                    out.write(' | '.join(['---'] * len(row)) + '\n')
+
+        with docx.open('word/document.xml') as xml_stream:
+            depth = 0
+            body = None
+            for event, elem in ET.iterparse(xml_stream, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if depth == 2:
+                        body = elem
+                    continue
+
+                # Body blocks are at depth 3: w:document > w:body > block
+                if depth == 3:
+                    if elem.tag == W_P:
+                        process_paragraph(elem)
+                    elif elem.tag == W_TBL:
+                        process_table(elem)
+                    # Drop finished blocks so memory does not grow with the document
+                    body.remove(elem)
+                depth -= 1
+
+
+def batch_convert_docx_to_markdown(src_dir, out_dir, workers=None, force=False):
+    """Convert every .docx under src_dir to .md under out_dir, skipping unchanged files"""
+    from batch_convert import convert_tree
+    return convert_tree(src_dir, out_dir, convert_docx_to_markdown, ".docx", ".md", workers, force)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a DOCX file (or a directory tree with --batch) to Markdown.")
+    parser.add_argument("docx_file", nargs="?", default='data/example.docx', help="DOCX file (or source directory)")
+    parser.add_argument("md_file", nargs="?", default='tmp/example.md', help="Markdown file (or output directory)")
+    parser.add_argument("--batch", action="store_true", help="Convert a whole directory tree incrementally")
+    parser.add_argument("--workers", type=int, help="Processes for --batch (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="Reconvert unchanged files in --batch mode")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        summary = batch_convert_docx_to_markdown(args.docx_file, args.md_file, args.workers, args.force)
+        return 1 if summary["failed"] else 0
+
+    # Usage example
+    convert_docx_to_markdown(args.docx_file, args.md_file)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
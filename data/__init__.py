@@ -0,0 +1 @@
+"""Local market data: the BTC price store (btc_get_data)"""
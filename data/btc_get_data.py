@@ -1,8 +1,145 @@
-import yfinance as yf
-import pandas as pd
+"""
+BTC Price Store
 
-# Fetch full historical data for Bitcoin (BTC-USD)
-btc_data = yf.download("BTC-USD", start="2010-01-01")
+Keeps the daily BTC-USD history in data/btc_price_history.csv and brings it up to
+date incrementally: only the days after the last stored date are fetched (plus the
+last stored day itself, which may have been a partial day when it was fetched).
 
-# Save the data to a CSV file in the './data/' directory. Ensure the directory exists or adjust the path as needed.
-btc_data.to_csv('./data/btc_price_history.csv')
+- Rows are deduplicated by date, with fetched rows replacing stored ones, and the
+  file stays sorted; the updated file is written to a temporary file and renamed
+  into place, so readers never see a half-written store
+- The data source is pluggable: YahooSource downloads with yfinance, CsvSource reads
+  a local CSV in the same format (a fixture standing in for the network in tests)
+- btc_price_history.py and btc_cycles_comparison.py read from this store
+
+Usage:
+    python -m data.btc_get_data [--store data/btc_price_history.csv] [--fixture prices.csv] [--full]
+"""
+
+import os
+import csv
+import argparse
+
+from file_utils import atomic_path
+
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'btc_price_history.csv')
+COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+START_DATE = "2010-01-01"
+TICKER = "BTC-USD"
+
+
+class YahooSource:
+    """Daily OHLCV rows from Yahoo Finance"""
+
+    def __init__(self, ticker=TICKER):
+        self.ticker = ticker
+
+    def fetch(self, start):
+        """Rows [date, open, high, low, close, adj close, volume] (strings) from start (YYYY-MM-DD) on"""
+        import yfinance as yf
+        import pandas as pd
+
+        data = yf.download(self.ticker, start=start, auto_adjust=False, progress=False)
+        if isinstance(data.columns, pd.MultiIndex):
+            # Recent yfinance versions add the ticker as a second column level
+            data.columns = data.columns.get_level_values(0)
+        return [[date.strftime('%Y-%m-%d')] + [repr(float(row[column])) for column in COLUMNS[1:-1]]
+                + [str(int(row['Volume']))]
+                for date, row in data.dropna(subset=['Close']).iterrows()]
+
+
+class CsvSource:
+    """Rows from a local CSV with the store's columns"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self, start):
+        return [row for row in read_rows(self.path) if row[0] >= start]
+
+
+def read_rows(path):
+    """Data rows of a price CSV, without the header"""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header and header != COLUMNS:
+            raise ValueError(f"{path} has columns {header}, expected {COLUMNS}")
+        return [row for row in reader if row]
+
+
+def last_date(path=STORE_PATH):
+    """Date (YYYY-MM-DD) of the last row of the store, or None if it is missing or empty"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        # Only the end of the file is read
+        f.seek(max(0, f.tell() - 4096))
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    if not lines or lines[-1].startswith(b'Date'):
+        return None
+    return lines[-1].split(b',', 1)[0].decode()
+
+
+def update_store(source=None, path=STORE_PATH, start=START_DATE, full=False):
+    """Fetch the days missing from the store and merge them in.
+
+    Args:
+        source: Object with fetch(start) -> rows, default YahooSource()
+        path (str): CSV store, created if missing
+        start (str): First date to fetch for a new store
+        full (bool): Fetch everything from start again instead of only the missing days
+
+    Returns:
+        int: Number of rows added or replaced
+    """
+    source = source or YahooSource()
+    last = last_date(path)
+    fetch_start = start if full or not last else last
+    fetched = {row[0]: row for row in source.fetch(fetch_start) if row[0] >= fetch_start}
+    if not fetched:
+        return 0
+
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out, lineterminator='\n')
+            writer.writerow(COLUMNS)
+            tail = {}
+            if last:
+                for row in read_rows(path):
+                    if row[0] < fetch_start:
+                        writer.writerow(row)
+                    else:
+                        tail[row[0]] = row
+            changed = sum(1 for date, row in fetched.items() if tail.get(date) != row)
+            tail.update(fetched)
+            writer.writerows(tail[date] for date in sorted(tail))
+        if not changed:
+            # Nothing new: keep the store (and its mtime, the cache key) as it is
+            os.remove(tmp_path)
+    return changed
+
+
+def load_history(path=STORE_PATH):
+    """The store as a pandas DataFrame indexed by date, read through the columnar cache"""
+    from data.btc_price_cache import load_frame
+
+    return load_frame(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bring the local BTC-USD price history up to date.")
+    parser.add_argument("--store", default=STORE_PATH, help="CSV store (default: data/btc_price_history.csv)")
+    parser.add_argument("--fixture", help="Read prices from this CSV instead of downloading them")
+    parser.add_argument("--ticker", default=TICKER, help=f"Yahoo Finance ticker (default: {TICKER})")
+    parser.add_argument("--full", action="store_true", help=f"Fetch again from {START_DATE}")
+    args = parser.parse_args(argv)
+
+    source = CsvSource(args.fixture) if args.fixture else YahooSource(args.ticker)
+    changed = update_store(source, args.store, full=args.full)
+    print(f"{changed} row(s) added or updated; {args.store} now ends on {last_date(args.store)}")
+
+
+if __name__ == "__main__":
+    main()
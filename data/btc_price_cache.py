@@ -0,0 +1,152 @@
+"""
+BTC Price Cache
+
+A binary columnar copy of a price CSV (by default the store, data/btc_price_history.csv)
+that loads without parsing: every column is a .npy file opened as a read-only NumPy
+memmap, so loading is a few file opens no matter how long the history is, and only
+the pages that are actually used are read from disk.
+
+- Dates are stored as datetime64: epoch days for daily data, epoch seconds for
+  intraday data such as minute bars
+- The cache is keyed by the CSV's size and modification time and is rebuilt
+  automatically when the CSV changes (e.g. after data/btc_get_data.py appended days)
+- A rebuild writes new column files first (each renamed into place) and then
+  replaces the metadata file, so a reader sees either the old or the new cache,
+  never a mix. The previous version's files are kept for readers that already
+  read its metadata; older ones are removed, and a reader that still misses a
+  file re-reads the metadata once
+
+Usage:
+    python -m data.btc_price_cache [CSV] [--rebuild]
+"""
+
+import os
+import json
+import argparse
+
+import numpy as np
+
+from data.btc_get_data import STORE_PATH
+from file_utils import atomic_path
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+DATE_COLUMN = 'Date'
+
+
+def cache_key(csv_path):
+    """Identifies the CSV contents: size and modification time"""
+    stat = os.stat(csv_path)
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def _meta_path(csv_path, cache_dir):
+    return os.path.join(cache_dir, os.path.splitext(os.path.basename(csv_path))[0] + '.json')
+
+
+def _file_name(column):
+    return column.lower().replace(' ', '_')
+
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def build_cache(csv_path=STORE_PATH, cache_dir=CACHE_DIR):
+    """Parse the CSV once and write one .npy file per column; return the cache metadata"""
+    import pandas as pd
+
+    key = cache_key(csv_path)
+    frame = pd.read_csv(csv_path, parse_dates=[DATE_COLUMN])
+    dates = frame.pop(DATE_COLUMN).to_numpy(dtype='datetime64[ns]')
+    daily = bool((dates == dates.astype('datetime64[D]')).all())
+    columns = {DATE_COLUMN: dates.astype('datetime64[D]' if daily else 'datetime64[s]')}
+    columns.update((name, frame[name].to_numpy()) for name in frame.columns)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    meta_path = _meta_path(csv_path, cache_dir)
+    previous = _read_meta(meta_path) or {"columns": {}}
+    meta = {"source": os.path.abspath(csv_path), "key": key, "rows": len(frame), "columns": {}}
+    for name, values in columns.items():
+        if values.dtype == object:
+            raise ValueError(f"Column {name!r} of {csv_path} is not numeric")
+        file_name = f"{stem}.{key}.{_file_name(name)}.npy"
+        # Renamed into place: another process building the same version may be reading it
+        with atomic_path(os.path.join(cache_dir, file_name), keep_extension=True) as tmp_path:
+            np.save(tmp_path, np.ascontiguousarray(values))
+        meta["columns"][name] = {"file": file_name, "dtype": str(values.dtype)}
+
+    with atomic_path(meta_path) as tmp_path, open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    # Column files of versions before the previous one of this CSV
+    keep = {column["file"] for version in (meta, previous) for column in version["columns"].values()}
+    for name in os.listdir(cache_dir):
+        if name.startswith(f"{stem}.") and name.endswith('.npy') and name not in keep:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass
+    return meta
+
+
+def cached_meta(csv_path=STORE_PATH, cache_dir=CACHE_DIR):
+    """Metadata of an up-to-date cache of csv_path, or None if there is none"""
+    meta = _read_meta(_meta_path(csv_path, cache_dir))
+    if meta is None or meta.get("key") != cache_key(csv_path):
+        return None
+    return meta
+
+
+def load_columns(csv_path=STORE_PATH, cache_dir=CACHE_DIR, columns=None, rebuild=False):
+    """Columns of the CSV as read-only memmapped arrays, {name: array}; builds the cache if needed.
+
+    columns selects the columns (default: all); 'Date' is always included.
+    """
+    for attempt in range(2):
+        meta = None if rebuild else cached_meta(csv_path, cache_dir)
+        if meta is None:
+            meta = build_cache(csv_path, cache_dir)
+        names = [DATE_COLUMN] + [name for name in (columns or meta["columns"]) if name != DATE_COLUMN]
+        arrays = {}
+        try:
+            for name in names:
+                if name not in meta["columns"]:
+                    raise KeyError(f"{csv_path} has no column {name!r}")
+                arrays[name] = np.load(os.path.join(cache_dir, meta["columns"][name]["file"]), mmap_mode='r')
+            return arrays
+        except FileNotFoundError:
+            # Rebuilds by other processes removed this version after its metadata was read
+            if attempt:
+                raise
+            rebuild = False
+
+
+def load_frame(csv_path=STORE_PATH, cache_dir=CACHE_DIR, columns=None):
+    """The CSV as a DataFrame indexed by Date whose value columns are passed to pandas without copying"""
+    import pandas as pd
+
+    arrays = load_columns(csv_path, cache_dir, columns)
+    index = pd.DatetimeIndex(arrays.pop(DATE_COLUMN).astype('datetime64[ns]'), name=DATE_COLUMN)
+    return pd.DataFrame(arrays, index=index, copy=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or refresh the columnar cache of a price CSV.")
+    parser.add_argument("csv_path", nargs="?", default=STORE_PATH, help="Price CSV (default: the price store)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Cache directory (default: data/.cache)")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild even if the cache is up to date")
+    args = parser.parse_args(argv)
+
+    fresh = not args.rebuild and cached_meta(args.csv_path, args.cache_dir)
+    meta = fresh or build_cache(args.csv_path, args.cache_dir)
+    state = "up to date" if fresh else "built"
+    print(f"Cache of {args.csv_path} {state}: {meta['rows']} rows, columns {', '.join(meta['columns'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+File Helpers
+
+Small file operations shared by the scripts:
+- file_sha256: content hash for change detection (batch_convert.py, fts_index.py)
+- atomic_path: write to a temporary file next to the target and rename it into
+  place, so readers see the old or the new file and never a half-written one
+"""
+
+import os
+import hashlib
+from contextlib import contextmanager
+
+
+def file_sha256(path):
+    """SHA-256 of a file, read in 1MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def atomic_path(path, keep_extension=False):
+    """Yield a temporary path next to path; renamed onto path when the block succeeds.
+
+    The temporary file is removed if the block raises. A block that leaves no file
+    at the temporary path (never writes it, or deletes it) leaves path untouched.
+    keep_extension puts the real extension last (out.tmp-123.docx), for writers
+    that choose the format from it.
+    """
+    root, ext = os.path.splitext(path) if keep_extension else (path, "")
+    tmp_path = f"{root}.tmp-{os.getpid()}{ext}"
+    try:
+        yield tmp_path
+        if os.path.exists(tmp_path):
+            os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,277 @@
+"""
+Full-Text Index for Extracted Documents
+
+Loads the page texts produced by the extraction scripts into an SQLite FTS5 database
+and searches them with ranked results and snippets.
+
+Indexed sources:
+- pdf_to_text.py output (*.txt); pages are split on the form feeds pdf_to_text.py
+  writes between them (a text file without form feeds is one page)
+- extract_text.py / qa_pipeline.py --ocr-only output (JSON with a "pages" list)
+- process_questionnaire.py output (output/batch_*/texts/page_N.md)
+
+Features:
+- Incremental: a file_state table records size, mtime and SHA-256 per file, so
+  unchanged files are skipped and changed files are re-indexed
+- Files that disappeared from the indexed directories are removed
+- Document, page and batch metadata for every hit
+- BM25-ranked queries with highlighted snippets, using FTS5 query syntax
+  ("gcc AND talent", "scale*", "\"shared services\"")
+
+Usage:
+    python fts_index.py index output/ data/ [--db corpus.db]
+    python fts_index.py query "opportunities AND talent" [--db corpus.db] [--limit 20] [--batch batch_20240101_120000]
+
+Requirements:
+- Python 3.8+ with SQLite compiled with FTS5 (standard in CPython builds)
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import argparse
+from datetime import datetime
+
+from file_utils import file_sha256
+
+
+DEFAULT_DB = "corpus.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    batch TEXT
+);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    page INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_document ON pages(document_id);
+CREATE TABLE IF NOT EXISTS file_state (
+    document_id INTEGER PRIMARY KEY REFERENCES documents(id),
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(text, tokenize='porter unicode61');
+"""
+
+_PAGE_FILE = re.compile(r"^page_(\d+)\.md$")
+_BATCH_DIR = re.compile(r"^batch_\d{8}_\d{6}$")
+
+
+def connect(db_path=DEFAULT_DB):
+    """Open (and create if needed) the index database"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def classify(path):
+    """Return (kind, batch) for an indexable file, or None to skip it"""
+    name = os.path.basename(path)
+    parent = os.path.basename(os.path.dirname(path))
+    batch_dir = os.path.basename(os.path.dirname(os.path.dirname(path)))
+
+    if _PAGE_FILE.match(name) and parent == "texts":
+        return "questionnaire", batch_dir if _BATCH_DIR.match(batch_dir) else None
+    if name.endswith(".json"):
+        return "extracted_json", None
+    if name.endswith(".txt"):
+        return "pdf_text", None
+    return None
+
+
+def read_pages(path, kind):
+    """Return a list of (page number, text) for a file"""
+    if kind == "questionnaire":
+        page = int(_PAGE_FILE.match(os.path.basename(path)).group(1))
+        with open(path, 'r', encoding='utf-8') as f:
+            return [(page, f.read())]
+
+    if kind == "extracted_json":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        pages = data.get("pages") if isinstance(data, dict) else None
+        if not isinstance(pages, list):
+            return []
+        return [(number, text) for number, text in enumerate(pages, 1) if isinstance(text, str)]
+
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return list(enumerate(f.read().split("\f"), 1))
+
+
+def iter_files(roots):
+    """Yield (path, kind, batch) for every indexable file under the given paths"""
+    for root in roots:
+        if os.path.isfile(root):
+            paths = [root]
+        else:
+            paths = (os.path.join(dirpath, name)
+                     for dirpath, _, names in os.walk(root) for name in sorted(names))
+        for path in paths:
+            info = classify(path)
+            if info:
+                yield os.path.abspath(path), info[0], info[1]
+
+
+def _delete_document_pages(conn, document_id):
+    conn.execute("DELETE FROM pages_fts WHERE rowid IN (SELECT id FROM pages WHERE document_id = ?)", (document_id,))
+    conn.execute("DELETE FROM pages WHERE document_id = ?", (document_id,))
+
+
+def index_paths(conn, roots, prune=True):
+    """Incrementally index files under roots.
+
+    Args:
+        conn (sqlite3.Connection): Database from connect()
+        roots (list): Files and/or directories to scan
+        prune (bool): Remove indexed files under the scanned directories that no longer exist
+
+    Returns:
+        dict: Counts of added, updated, unchanged and removed files and indexed pages
+    """
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "pages": 0}
+    state = {
+        path: (document_id, size, mtime, sha256)
+        for document_id, path, size, mtime, sha256 in conn.execute(
+            "SELECT d.id, d.path, s.size, s.mtime, s.sha256 FROM documents d JOIN file_state s ON s.document_id = d.id")
+    }
+    seen = set()
+    now = datetime.now().isoformat(timespec="seconds")
+
+    with conn:
+        for path, kind, batch in iter_files(roots):
+            seen.add(path)
+            st = os.stat(path)
+            known = state.get(path)
+            if known and known[1] == st.st_size and known[2] == st.st_mtime:
+                stats["unchanged"] += 1
+                continue
+
+            sha256 = file_sha256(path)
+            if known and known[3] == sha256:
+                # Touched but not changed: only refresh the recorded mtime
+                conn.execute("UPDATE file_state SET mtime = ?, indexed_at = ? WHERE document_id = ?",
+                             (st.st_mtime, now, known[0]))
+                stats["unchanged"] += 1
+                continue
+
+            try:
+                pages = read_pages(path, kind)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not read {path}: {str(e)}")
+                continue
+
+            if known:
+                document_id = known[0]
+                _delete_document_pages(conn, document_id)
+                conn.execute("UPDATE documents SET kind = ?, batch = ? WHERE id = ?", (kind, batch, document_id))
+                stats["updated"] += 1
+            else:
+                document_id = conn.execute("INSERT INTO documents (path, kind, batch) VALUES (?, ?, ?)",
+                                           (path, kind, batch)).lastrowid
+                stats["added"] += 1
+
+            for page, text in pages:
+                page_id = conn.execute("INSERT INTO pages (document_id, page) VALUES (?, ?)",
+                                       (document_id, page)).lastrowid
+                conn.execute("INSERT INTO pages_fts (rowid, text) VALUES (?, ?)", (page_id, text))
+            stats["pages"] += len(pages)
+
+            conn.execute("INSERT OR REPLACE INTO file_state (document_id, size, mtime, sha256, indexed_at) "
+                         "VALUES (?, ?, ?, ?, ?)", (document_id, st.st_size, st.st_mtime, sha256, now))
+
+        if prune:
+            prefixes = tuple(os.path.join(os.path.abspath(root), "") for root in roots if os.path.isdir(root))
+            for path, (document_id, _, _, _) in state.items():
+                if path not in seen and path.startswith(prefixes) and not os.path.exists(path):
+                    _delete_document_pages(conn, document_id)
+                    conn.execute("DELETE FROM file_state WHERE document_id = ?", (document_id,))
+                    conn.execute("DELETE FROM documents WHERE id = ?", (document_id,))
+                    stats["removed"] += 1
+
+    return stats
+
+
+def search(conn, query, limit=20, batch=None, kind=None, snippet_tokens=16):
+    """Return ranked page hits for an FTS5 query.
+
+    Returns:
+        list: dicts with path, kind, batch, page, snippet and score (lower is better)
+    """
+    sql = ("SELECT d.path, d.kind, d.batch, p.page, "
+           "snippet(pages_fts, 0, '[', ']', '...', ?), rank "
+           "FROM pages_fts JOIN pages p ON p.id = pages_fts.rowid JOIN documents d ON d.id = p.document_id "
+           "WHERE pages_fts MATCH ?")
+    params = [snippet_tokens, query]
+    if batch:
+        sql += " AND d.batch = ?"
+        params.append(batch)
+    if kind:
+        sql += " AND d.kind = ?"
+        params.append(kind)
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+
+    return [
+        {"path": path, "kind": doc_kind, "batch": doc_batch, "page": page,
+         "snippet": " ".join(snippet.split()), "score": score}
+        for path, doc_kind, doc_batch, page, snippet, score in conn.execute(sql, params)
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Full-text index over extracted page texts.")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"Index database (default: {DEFAULT_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser("index", help="Add new and changed files to the index")
+    index_parser.add_argument("paths", nargs="+", help="Files or directories to index")
+    index_parser.add_argument("--no-prune", action="store_true", help="Keep entries for deleted files")
+
+    query_parser = commands.add_parser("query", help="Search the index")
+    query_parser.add_argument("query", help="FTS5 query, e.g. 'gcc AND talent' or '\"shared services\"'")
+    query_parser.add_argument("--limit", type=int, default=20, help="Maximum hits (default: 20)")
+    query_parser.add_argument("--batch", help="Only hits from this questionnaire batch")
+    query_parser.add_argument("--kind", choices=["questionnaire", "extracted_json", "pdf_text"],
+                              help="Only hits from this kind of source")
+    query_parser.add_argument("--json", action="store_true", help="Print hits as JSON")
+
+    args = parser.parse_args(argv)
+    conn = connect(args.db)
+
+    try:
+        if args.command == "index":
+            start = time.perf_counter()
+            stats = index_paths(conn, args.paths, prune=not args.no_prune)
+            print(f"Indexed in {time.perf_counter() - start:.2f}s: {stats['added']} added, "
+                  f"{stats['updated']} updated, {stats['unchanged']} unchanged, "
+                  f"{stats['removed']} removed ({stats['pages']} pages)")
+        else:
+            start = time.perf_counter()
+            hits = search(conn, args.query, args.limit, args.batch, args.kind)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if args.json:
+                print(json.dumps(hits, ensure_ascii=False, indent=2))
+                return
+            for hit in hits:
+                batch = f" [{hit['batch']}]" if hit["batch"] else ""
+                print(f"{hit['path']}{batch} page {hit['page']}: {hit['snippet']}")
+            print(f"\n{len(hits)} hits in {elapsed_ms:.1f} ms")
+    except sqlite3.OperationalError as e:
+        print(f"Error: {str(e)}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
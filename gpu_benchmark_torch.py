@@ -1,47 +1,27 @@
-import torch
-import time
-
-def benchmark_gpu():
-    # Size of the matrices to multiply
-    size = 10000
-    # Number of times to repeat the operation for averaging
-    repeats = 1200
-
-    # Ensures that CUDA is available and selects the default GPU
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    print(f"Using device: {device}")
-
-    # Initialize two random matrices
-    a = torch.rand(size, size, device=device)
-    b = torch.rand(size, size, device=device)
-
-    # Warm-up run, not measured
-    torch.matmul(a, b)
-
-    # Benchmark
-    start_time = time.time()
-    for _ in range(repeats):
-        if _ % 100 == 0:
-            print(f"Step {_}")
-        torch.matmul(a, b)
-    end_time = time.time()
-
-    # Calculate and print average time
-    avg_time = (end_time - start_time) / repeats
-    print(f"Average time per multiplication: {avg_time:.5f} seconds")
+"""
+Matrix Multiplication Benchmark (PyTorch)
+
+Runs benchmark_harness.py with the PyTorch backend: square matrix multiplications
+on CUDA, Apple MPS or the CPU over a sweep of sizes and dtypes (fp32/bf16/fp16
+where supported), synchronised and warmed up, with median and percentile timings,
+GFLOPS and memory use per configuration (peak device memory, or resident-set
+growth on the CPU). The options are those of benchmark_harness.py, so the
+results can be compared with gpu_benchmark_tensorflow.py and with a --baseline.
+
+Usage:
+    python gpu_benchmark_torch.py [--device auto|cpu|gpu|cuda:1] [--sizes 1024 2048 4096]
+                                  [--dtypes fp32 bf16 fp16] [--repeat 30] [--json results.json]
+"""
+
+import sys
+
+from benchmark_harness import main as harness_main
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    return harness_main(["--backends", "torch"] + argv)
+
 
 if __name__ == "__main__":
-    print("GPU benchmark using PyTorch")
-    print(f"PyTorch version: {torch.__version__}")
-    print("Device count: " + str(torch.cuda.device_count()))
-    print("GPU Device name" + torch.cuda.get_device_name(0))
-
-    if torch.cuda.is_available():
-        try:
-            print("GPU Device name: " + torch.cuda.get_device_name(0))
-        except RuntimeError as e:
-            print("Error accessing GPU properties: ", e)
-    else:
-        print("CUDA is not available.")
-
-    benchmark_gpu()
+    sys.exit(main())
@@ -1,25 +1,747 @@
+"""
+Stringified JSON to indented JSON
+
+Turns a file holding a JSON document that was serialised into a JSON string, e.g.
+"{\"name\": \"x\", \"text\": \"line\\nbreak\"}" as found in API dumps and logs,
+back into an indented JSON document.
+
+- String escapes are decoded properly (\\n, \\\\, \\uXXXX and surrogate pairs), not by
+  stripping quotes and replacing \\" - nested escapes survive
+- Several levels of stringification are undone ("\"{\\\"a\\\": 1}\""), as well as an
+  escaped document without its outer quotes ({\"a\": 1})
+- The file is read, decoded and pretty-printed in chunks, so memory stays bounded
+  (by the chunk size and the longest single string) even for multi-GB dumps
+- Output goes to a temporary file that is renamed into place, so the input is never
+  left half-written
+- With orjson installed and --indent 2, documents up to FAST_MAX_BYTES are decoded and
+  re-serialised by orjson in memory instead, which is several times faster. orjson
+  turns integers wider than 64 bits into floats and rewrites float text (1e5 becomes
+  100000.0, 1.10 becomes 1.1), so documents holding such numbers are streamed instead
+
+Strings and numbers are copied as they are; only whitespace between tokens changes.
+
+Batch mode (--batch) normalises a file or a directory tree of exports in parallel:
+- .json files are converted as above, one file per worker
+- JSON Lines files (.jsonl, .ndjson) are split into byte ranges of --split-mb at line
+  boundaries, so a single multi-GB export keeps every core busy. Each record is
+  decoded on its own (any level of stringification, and string fields holding
+  stringified objects with --decode-fields) and written compact, one per line, or
+  indented with --indent; numbers are kept exactly as written
+- Records that fail to decode are skipped and reported per file with their line
+  number; the other records are still written
+- Records per second and MB per second are reported, and --report writes the per-file
+  results as JSON
+
+Usage:
+    python jsonstrin_to_json.py [tmp/test.json] [-o pretty.json] [--indent 4 | --compact] [--fast | --no-fast]
+    python jsonstrin_to_json.py exports/ --batch [-o normalised/] [--workers 8] [--decode-fields] [--report report.json]
+"""
+import os
+import re
 import json
+import time
+import shutil
+from functools import partial
+from itertools import chain
+from json.decoder import scanstring
+
+from file_utils import atomic_path
+
+CHUNK_SIZE = 1 << 20  # characters
+FAST_MAX_BYTES = 256 * 1024 * 1024
+LINE_EXTENSIONS = (".jsonl", ".ndjson")
+SPLIT_BYTES = 64 * 1024 * 1024  # JSON Lines bytes per batch task
+MAX_REPORTED_ERRORS = 100  # error messages kept per file
+
+# Text of a string literal up to (not including) the closing quote, consuming only
+# complete escapes: a \u escape cut by the end of a chunk, or a high surrogate
+# without its low half yet, stops the match so it can be completed by the next chunk
+STRING_BODY = re.compile(r'''
+    [^"\\]*
+    (?:
+        (?: \\["\\/bfnrt]
+          | \\u(?![dD][89abAB])[0-9a-fA-F]{4}
+          | \\u[dD][89abAB][0-9a-fA-F]{2}\\u[dD][c-fC-F][0-9a-fA-F]{2}
+        )
+        [^"\\]*
+    )*''', re.VERBOSE)
+UNICODE_ESCAPE = re.compile(r'\\u[0-9a-fA-F]{4}')
+# An escaped document without the surrounding quotes: {\"key\": ... or [\"...
+BARE_ESCAPED = re.compile(r'[\[{]\s*\\"')
+
+# One JSON token with its leading whitespace: 1 string, 2 punctuation, 3 number, 4 literal
+TOKEN = re.compile(r'''
+    [ \t\n\r]*
+    (?: ("[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*")
+      | ([{}\[\],:])
+      | (-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)
+      | (true|false|null)
+    )''', re.VERBOSE | re.DOTALL)
+STRING, PUNCT, NUMBER, LITERAL = 1, 2, 3, 4
+# The valid start of a string token whose closing quote has not been read yet
+STRING_START = re.compile(r'"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*')
+SCALAR = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?|true|false|null')
+# What may still follow a number that reaches the end of the data read so far
+NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')
+# A number anywhere in a text, strings included, that is not part of a longer number
+NUMBER_LITERAL = re.compile(r'(?<![0-9.+-])-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?')
+
+
+def read_chunks(file, chunk_size=CHUNK_SIZE):
+    return iter(lambda: file.read(chunk_size), "")
+
+
+def peek(chunks, size=64):
+    """Return (the first characters of the stream, the full stream)"""
+    chunks = iter(chunks)
+    head = ""
+    for chunk in chunks:
+        head += chunk
+        if len(head.lstrip()) >= size:
+            break
+    return head, chain([head], chunks)
+
+
+def unescape_chunks(chunks, quoted=True):
+    """Decode a JSON string literal arriving in chunks, yielding its text in chunks.
+
+    With quoted=True the stream starts with the opening quote and must end after the
+    closing one; with quoted=False it is an escaped text without quotes.
+    """
+    pending = ""
+    started = not quoted
+    closed = False
+
+    for chunk in chain(chunks, [None]):
+        final = chunk is None
+        if closed:
+            if not final and chunk.strip():
+                raise ValueError("Unexpected data after the end of the JSON string")
+            continue
+        buf = pending + (chunk or "")
+        pos = 0
+        if not started:
+            stripped = buf.lstrip()
+            if not stripped:
+                pending = ""
+                continue
+            if stripped[0] != '"':
+                raise ValueError("Expected a JSON string")
+            pos = len(buf) - len(stripped) + 1
+            started = True
+
+        pieces = []
+        while True:
+            end = STRING_BODY.match(buf, pos).end()
+            if end > pos:
+                pieces.append(scanstring(buf[pos:end] + '"', 0, False)[0])
+            pos = end
+            if end == len(buf):
+                break
+            if buf[end] == '"':
+                if not quoted:
+                    raise ValueError(f"Unescaped quote at character {end} of an escaped JSON text")
+                if buf[end + 1:].strip():
+                    raise ValueError("Unexpected data after the end of the JSON string")
+                closed = True
+                pos = len(buf)
+                break
+            # A backslash the pattern did not take: incomplete, a lone surrogate or invalid
+            if len(buf) - end < 12 and not final:
+                break
+            escape = UNICODE_ESCAPE.match(buf, end)
+            if escape is None:
+                raise ValueError(f"Invalid escape {buf[end:end + 2]!r} in JSON string")
+            pieces.append(chr(int(buf[end + 2:end + 6], 16)))
+            pos = end + 6
+
+        pending = buf[pos:]
+        if pieces:
+            yield "".join(pieces)
+
+    if pending or (quoted and not closed):
+        raise ValueError("Unterminated JSON string")
+
+
+def stringification(head):
+    """"quoted" or "bare" if the text starting with head is a stringified JSON document.
+
+    A string only counts as stringified JSON if its text starts with an object, an
+    array or another string, or is a single number or literal; otherwise it is a
+    document that is just a string.
+    """
+    stripped = head.lstrip()
+    if BARE_ESCAPED.match(stripped):
+        return "bare"
+    if stripped.startswith('"'):
+        end = STRING_BODY.match(stripped, 1).end()
+        text = scanstring(stripped[1:end] + '"', 0, False)[0]
+        if _starts_json(text, complete=stripped[end:end + 1] == '"'):
+            return "quoted"
+    return None
+
+
+def _starts_json(text, complete):
+    """Whether text (all of a string, or its start) can be the start of a JSON document"""
+    text = text.strip() if complete else text.lstrip()
+    if text[:1] in ("{", "["):
+        return True
+    if text[:1] == '"':
+        end = STRING_BODY.match(text, 1).end()
+        if end == len(text) or (text[end] == "\\" and len(text) - end < 12):
+            return not complete
+        return text[end] == '"' and not text[end + 1:].strip()
+    return complete and SCALAR.fullmatch(text) is not None
+
+
+def decode_levels(chunks):
+    """Undo every level of stringification; return (JSON text chunks, number of levels)"""
+    levels = 0
+    while True:
+        head, chunks = peek(chunks)
+        kind = stringification(head)
+        if kind is None:
+            return chunks, levels
+        chunks = unescape_chunks(chunks, quoted=kind == "quoted")
+        levels += 1
+
+
+def _may_continue(rest):
+    """Whether unmatched text can still become a token once more data arrives"""
+    if rest[0] == '"':
+        end = STRING_START.match(rest).end()
+        return end == len(rest) or (rest[end] == "\\" and len(rest) - end < 6)
+    # Numbers and literals are short
+    return rest[0] in "-0123456789tfn" and len(rest) < 1024
+
+
+# What the next token may be
+VALUE, KEY, COLON, NEXT, END = range(5)
+
+
+def pretty_chunks(chunks, indent=4):
+    """Validate a JSON text arriving in chunks and yield it indented like json.dumps(indent=...).
+
+    Tokens are matched by one regex and formatted in a single loop; strings and
+    numbers are copied unchanged. indent=None writes compact JSON without any whitespace.
+    """
+    newline = "" if indent is None else "\n"
+    colon = ":" if indent is None else ": "
+    unit = " " * (indent or 0)
+    newlines = [newline]       # newline plus indentation, per depth
+    stack = []                 # open containers, "{" or "["
+    expect = VALUE
+    just_opened = False
+    buf = ""
+    waiting_for_quote = False
+
+    for chunk in chain(chunks, [None]):
+        final = chunk is None
+        if not final:
+            buf += chunk
+            # An unfinished string can only end once a quote arrives
+            if waiting_for_quote and '"' not in chunk:
+                continue
+
+        out = []
+        append = out.append
+        pos, size = 0, len(buf)
+        for m in TOKEN.finditer(buf):
+            if m.start() != pos:
+                break
+            end = m.end()
+            token = m.group(m.lastindex)
+            c = token[0]
+
+            if m.lastindex == PUNCT:
+                if c == ",":
+                    if expect != NEXT:
+                        raise ValueError("Unexpected ','")
+                    depth = len(stack)
+                    if depth >= len(newlines):
+                        newlines.append(newline + unit * depth)
+                    append(",")
+                    append(newlines[depth])
+                    expect = KEY if stack[-1] == "{" else VALUE
+                elif c == ":":
+                    if expect != COLON:
+                        raise ValueError("Unexpected ':'")
+                    append(colon)
+                    expect = VALUE
+                elif c in "}]":
+                    if not stack or stack[-1] != ("{" if c == "}" else "["):
+                        raise ValueError(f"Unexpected {c!r}")
+                    stack.pop()
+                    if just_opened:
+                        just_opened = False
+                    elif expect == NEXT:
+                        append(newlines[len(stack)])
+                    else:
+                        raise ValueError(f"Unexpected {c!r} after ',' or ':'")
+                    append(c)
+                    expect = NEXT if stack else END
+                else:
+                    if expect != VALUE:
+                        raise ValueError(f"Unexpected {c!r}")
+                    if just_opened:
+                        append(newlines[len(stack)])
+                    append(c)
+                    stack.append(c)
+                    if len(stack) >= len(newlines):
+                        newlines.append(newline + unit * len(stack))
+                    just_opened = True
+                    expect = KEY if c == "{" else VALUE
+            else:
+                # A number or literal at the very end may continue in the next chunk
+                if not final and (m.lastindex == NUMBER and NUMBER_TAIL.match(buf, end)
+                                  or m.lastindex == LITERAL and end == size):
+                    break
+                if expect == KEY:
+                    if c != '"':
+                        raise ValueError(f"Expected an object key, got {token[:20]!r}")
+                    expect = COLON
+                elif expect == VALUE:
+                    expect = NEXT if stack else END
+                elif expect == END:
+                    raise ValueError(f"Unexpected {token[:20]!r} after the end of the JSON document")
+                else:
+                    expected = "':'" if expect == COLON else "',' or a closing bracket"
+                    raise ValueError(f"Unexpected {token[:20]!r}, expected {expected}")
+                if just_opened:
+                    append(newlines[len(stack)])
+                    just_opened = False
+                append(token)
+            pos = end
+
+        rest = buf[pos:].lstrip(" \t\n\r")
+        if rest and (final or not _may_continue(rest)):
+            raise ValueError(f"Invalid JSON near {rest[:40]!r}")
+        waiting_for_quote = rest.startswith('"')
+        buf = rest
+        if out:
+            yield "".join(out)
+
+    if expect != END:
+        raise ValueError("Unexpected end of the JSON document")
+
+
+def unquote(text):
+    """One level of stringification undone in memory, or None if text is not stringified"""
+    kind = stringification(text[:4096])
+    stripped = text.strip()
+    if kind == "quoted":
+        value, end = scanstring(stripped, 1, False)
+        if stripped[end:].strip():
+            raise ValueError("Unexpected data after the end of the JSON string")
+        return value
+    if kind == "bare":
+        return scanstring(stripped + '"', 0, False)[0]
+    return None
+
+
+def orjson_keeps_numbers(text):
+    """True if orjson writes every number in text back exactly as written.
+
+    Integers of more than 18 digits, -0, exponents and floats that are not in their
+    shortest form would change. Digits inside strings are checked too, which at worst
+    sends a text to the slower exact path.
+    """
+    for match in NUMBER_LITERAL.finditer(text):
+        literal = match.group()
+        if '.' in literal:
+            if 'e' in literal or 'E' in literal or repr(float(literal)) != literal:
+                return False
+        elif 'e' in literal or 'E' in literal or literal == '-0' or len(literal.lstrip('-')) > 18:
+            return False
+    return True
+
+
+def _fast_prettify(src, tmp_path, indent):
+    """Decode and re-serialise src with orjson; returns None, writing nothing, if a number would change"""
+    import orjson
+
+    with open(src, 'r', encoding='utf-8-sig') as f:
+        text = f.read()
+    if not orjson_keeps_numbers(text):
+        return None
+    levels = 0
+    while (decoded := unquote(text)) is not None:
+        text = decoded
+        levels += 1
+    with open(tmp_path, 'wb') as out:
+        out.write(orjson.dumps(orjson.loads(text), option=orjson.OPT_INDENT_2 if indent else 0))
+    return levels
+
+
+def _stream_prettify(src, tmp_path, indent, chunk_size):
+    with open(src, 'r', encoding='utf-8-sig', newline='') as f, \
+            open(tmp_path, 'w', encoding='utf-8', errors='backslashreplace', newline='') as out:
+        chunks, levels = decode_levels(read_chunks(f, chunk_size))
+        for text in pretty_chunks(chunks, indent):
+            out.write(text)
+    return levels
+
+
+def prettify_file(src, dst=None, indent=4, fast=None, chunk_size=CHUNK_SIZE):
+    """Decode a stringified JSON file and write it indented to dst (default: in place).
+
+    Args:
+        src (str): File holding the (possibly several times) stringified JSON
+        dst (str): Output path; defaults to src, replaced atomically
+        indent (int): Spaces per indentation level, None for compact output
+        fast (bool): Use orjson in memory (indent 2 or compact only). None picks it
+            automatically when orjson can produce the requested layout and the file is
+            at most FAST_MAX_BYTES. Files with numbers orjson would change are streamed
+            either way
+        chunk_size (int): Characters read at a time on the streaming path
 
-def prettify_json_string(file_path):
+    Returns:
+        dict: levels undone, input and output bytes, seconds and whether orjson was used
+
+    Raises:
+        ValueError: If the file is not (stringified) JSON
+    """
+    dst = dst or src
+    if fast is None:
+        try:
+            import orjson  # noqa: F401
+            fast = indent in (2, None) and os.path.getsize(src) <= FAST_MAX_BYTES
+        except ImportError:
+            fast = False
+    elif fast and indent not in (2, None):
+        raise ValueError("The orjson fast path only supports indent=2 or compact output")
+
+    start = time.perf_counter()
+    input_bytes = os.path.getsize(src)
+    with atomic_path(dst) as tmp_path:
+        levels = _fast_prettify(src, tmp_path, indent) if fast else None
+        if levels is None:
+            fast = False
+            levels = _stream_prettify(src, tmp_path, indent, chunk_size)
+
+    return {"levels": levels, "input_bytes": input_bytes, "output_bytes": os.path.getsize(dst),
+            "seconds": round(time.perf_counter() - start, 3), "fast": bool(fast)}
+
+
+def prettify_json_string(file_path, output_path=None, indent=4, fast=None):
     try:
-        # Read the JSON string from the file
-        with open(file_path, 'r') as file:
-            json_str = file.read().strip('"')
-            json_str = json_str.replace('\\"', '"')
-        
-        # Convert the JSON string to a Python dictionary
-        json_data = json.loads(json_str)
-        
-        # Convert the Python dictionary back to a JSON string with indentation
-        pretty_json_str = json.dumps(json_data, indent=4)
-        
-        # Save the indented JSON string back to the same file
-        with open(file_path, 'w') as file:
-            file.write(pretty_json_str)
-        
-        print("Successfully converted to indented JSON format.")
+        stats = prettify_file(file_path, output_path, indent, fast)
+        print(f"Successfully converted to indented JSON format ({stats['levels']} level(s) of "
+              f"stringification undone, {stats['seconds']}s).")
+        return stats
     except Exception as e:
         print(f"An error occurred: {e}")
 
-# Replace 'path_to_your_file.json' with the actual file path
-prettify_json_string('tmp/test.json')
+
+def decode_record(text, loads=json.loads):
+    """Parse one JSON text after undoing every level of stringification"""
+    while (decoded := unquote(text)) is not None:
+        text = decoded
+    return loads(text)
+
+
+def decode_fields(value, loads=json.loads):
+    """Replace string values holding (stringified) JSON objects or arrays by their value"""
+    if isinstance(value, dict):
+        return {key: decode_fields(item, loads) for key, item in value.items()}
+    if isinstance(value, list):
+        return [decode_fields(item, loads) for item in value]
+    if isinstance(value, str) and value.lstrip()[:1] in ('{', '[', '"'):
+        try:
+            decoded = decode_record(value, loads)
+        except ValueError:
+            return value
+        if isinstance(decoded, (dict, list)):
+            return decode_fields(decoded, loads)
+    return value
+
+
+class RawNumber:
+    """A JSON number kept as the text it was written as (parse_int / parse_float hook)"""
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+def encode_raw(value):
+    """Compact JSON of a value parsed with RawNumber numbers, which are written back unchanged"""
+    if isinstance(value, RawNumber):
+        return value.text
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{json.dumps(key, ensure_ascii=False)}:{encode_raw(item)}"
+                              for key, item in value.items()) + "}"
+    if isinstance(value, list):
+        return "[" + ",".join(map(encode_raw, value)) + "]"
+    return json.dumps(value, ensure_ascii=False)
+
+
+def record_converter(indent=None, decode_nested=False):
+    """Return a function converting the text of one record to normalised JSON (UTF-8 bytes).
+
+    Numbers are written exactly as in the input. The function raises ValueError for a
+    record that is not (stringified) JSON.
+    """
+    exact_loads = partial(json.loads, parse_int=RawNumber, parse_float=RawNumber)
+
+    def convert(text):
+        if decode_nested:
+            text = encode_raw(decode_fields(decode_record(text, exact_loads), exact_loads))
+        else:
+            while (decoded := unquote(text)) is not None:
+                text = decoded
+        return "".join(pretty_chunks([text], indent)).encode('utf-8', 'backslashreplace')
+
+    try:
+        import orjson
+    except ImportError:
+        return convert
+    option = orjson.OPT_INDENT_2 if indent else 0
+
+    def convert_fast(text):
+        if not orjson_keeps_numbers(text):
+            return convert(text)
+        try:
+            value = decode_record(text, orjson.loads)
+            if decode_nested:
+                value = decode_fields(value, orjson.loads)
+            if indent in (2, None):
+                return orjson.dumps(value, option=option)
+            return json.dumps(value, indent=indent, ensure_ascii=False).encode('utf-8', 'backslashreplace')
+        except (orjson.JSONDecodeError, orjson.JSONEncodeError):
+            # Text the json module accepts but orjson does not, e.g. lone surrogate escapes
+            return convert(text)
+
+    return convert_fast
+
+
+def _convert_lines(src, start, end, tmp_path, indent, decode_nested):
+    """Convert the records on the lines of src starting in [start, end) and write them to tmp_path.
+
+    Returns (records, lines, number of errors, [(line within the range, error)]).
+    """
+    convert = record_converter(indent, decode_nested)
+    records = lines = failed = 0
+    errors = []
+    pending = []
+    with open(src, 'rb') as f, open(tmp_path, 'wb') as out:
+        if start:
+            # Skip the rest of a line that started in the previous range
+            f.seek(start - 1)
+            f.readline()
+        pos = f.tell()
+        for line in f:
+            if pos >= end:
+                break
+            pos += len(line)
+            lines += 1
+            try:
+                text = line.decode('utf-8-sig' if pos == len(line) else 'utf-8')
+                if not text.strip():
+                    continue
+                pending.append(convert(text))
+                records += 1
+            except (ValueError, RecursionError) as e:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append((lines, f"{type(e).__name__}: {e}"))
+                continue
+            if len(pending) >= 1024:
+                out.write(b"\n".join(pending) + b"\n")
+                pending = []
+        if pending:
+            out.write(b"\n".join(pending) + b"\n")
+    return records, lines, failed, errors
+
+
+def _convert_document(src, dst, indent):
+    """prettify_file for a batch task; returns (records, lines, number of errors, errors)"""
+    try:
+        prettify_file(src, dst, indent)
+        return 1, 0, 0, []
+    except Exception as e:
+        return 0, 0, 1, [(None, f"{type(e).__name__}: {e}")]
+
+
+def batch_sources(src):
+    """The .json and JSON Lines files under src (or src itself if it is a file), sorted"""
+    if not os.path.isdir(src):
+        return [src]
+    files = []
+    for root, dirs, names in os.walk(src):
+        dirs.sort()
+        files += [os.path.join(root, name) for name in sorted(names)
+                  if name.lower().endswith((".json",) + LINE_EXTENSIONS)]
+    return files
+
+
+def _run_tasks(tasks, workers):
+    """Yield (key, result) for tasks [(key, function, args)] as they complete"""
+    if workers == 1:
+        for key, function, args in tasks:
+            yield key, function(*args)
+        return
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(function, *args): key for key, function, args in tasks}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+def batch_prettify(src, out_dir=None, indent=4, line_indent=None, workers=None,
+                   split_bytes=SPLIT_BYTES, decode_nested=False, lines=None, report_path=None):
+    """Normalise every JSON and JSON Lines file under src in parallel worker processes.
+
+    Args:
+        src (str): A file or a directory searched recursively
+        out_dir (str): Directory for the output, mirroring src; default: replace in place
+        indent (int): Indentation of .json documents, None for compact
+        line_indent (int): Indentation of JSON Lines records; None keeps one compact record per line
+        workers (int): Worker processes (default: all cores, 1 runs in this process)
+        split_bytes (int): Size of the byte ranges JSON Lines files are split into
+        decode_nested (bool): Also decode string fields holding stringified objects/arrays
+        lines (bool): Treat every file as JSON Lines (True) or as one document (False);
+            None decides by extension
+        report_path (str): Also write the per-file results to this JSON file
+
+    Returns:
+        dict: Totals (files, records, errors, bytes, seconds, rates) and per-file results
+    """
+    start_time = time.perf_counter()
+    files = batch_sources(src)
+    base = src if os.path.isdir(src) else os.path.dirname(src)
+    pid = os.getpid()
+
+    tasks = []
+    jobs = []
+    for number, path in enumerate(files):
+        dst = os.path.join(out_dir, os.path.relpath(path, base)) if out_dir else path
+        os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+        is_lines = path.lower().endswith(LINE_EXTENSIONS) if lines is None else lines
+        size = os.path.getsize(path)
+        job = {"file": path, "output": dst, "input_bytes": size, "lines": is_lines, "parts": {}}
+        if is_lines:
+            starts = list(range(0, size, split_bytes)) or [0]
+            ends = starts[1:] + [size]
+            job["part_paths"] = [f"{dst}.part{part}-{pid}" for part in range(len(starts))]
+            tasks += [((number, part), _convert_lines,
+                       (path, begin, end, job["part_paths"][part], line_indent, decode_nested))
+                      for part, (begin, end) in enumerate(zip(starts, ends))]
+        else:
+            job["part_paths"] = []
+            tasks.append(((number, 0), _convert_document, (path, dst, indent)))
+        jobs.append(job)
+
+    results = []
+    try:
+        for (number, part), result in _run_tasks(tasks, workers):
+            job = jobs[number]
+            job["parts"][part] = result
+            if len(job["parts"]) == max(len(job["part_paths"]), 1):
+                results.append(_finish_job(job))
+    finally:
+        for job in jobs:
+            for path in job["part_paths"]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    seconds = time.perf_counter() - start_time
+    results.sort(key=lambda result: result["file"])
+    summary = {
+        "files": len(results),
+        "records": sum(result["records"] for result in results),
+        "errors": sum(result["error_count"] for result in results),
+        "input_bytes": sum(result["input_bytes"] for result in results),
+        "output_bytes": sum(result["output_bytes"] for result in results),
+        "seconds": round(seconds, 3),
+    }
+    summary["records_per_second"] = round(summary["records"] / seconds, 1) if seconds else None
+    summary["mb_per_second"] = round(summary["input_bytes"] / 1e6 / seconds, 1) if seconds else None
+    summary["results"] = results
+
+    print(f"{summary['records']:,d} records from {summary['files']} file(s) in {seconds:.2f}s: "
+          f"{summary['records_per_second'] or 0:,.0f} records/s, {summary['mb_per_second'] or 0:,.1f} MB/s, "
+          f"{summary['errors']:,d} error(s)")
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return summary
+
+
+def _finish_job(job):
+    """Join the parts of a finished file into its output and report its result"""
+    parts = [job["parts"][part] for part in sorted(job["parts"])]
+    records = sum(part[0] for part in parts)
+    error_count = sum(part[2] for part in parts)
+    # Line numbers within each part become line numbers within the file
+    errors = []
+    offset = 0
+    for _, lines, _, part_errors in parts:
+        errors += [{"line": line + offset if line else None, "error": error} for line, error in part_errors]
+        offset += lines
+
+    if job["lines"] and (records or not error_count):
+        with atomic_path(job["output"]) as tmp_path, open(tmp_path, 'wb') as out:
+            for path in job["part_paths"]:
+                with open(path, 'rb') as part:
+                    shutil.copyfileobj(part, out, 1 << 20)
+                os.remove(path)
+
+    written = os.path.exists(job["output"]) and (records or not error_count)
+    result = {"file": job["file"], "output": job["output"], "records": records,
+              "error_count": error_count, "errors": errors[:MAX_REPORTED_ERRORS],
+              "input_bytes": job["input_bytes"],
+              "output_bytes": os.path.getsize(job["output"]) if written else 0}
+
+    status = f"{error_count:,d} error(s)" if error_count else "ok"
+    print(f"{records:12,d} records  {status:>12}  {job['file']}")
+    for error in errors[:5]:
+        where = f"line {error['line']}: " if error["line"] else ""
+        print(f"{'':>34}{where}{error['error']}")
+    if error_count > 5:
+        print(f"{'':>34}... {error_count - 5:,d} more")
+    return result
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Turn a file holding a stringified JSON document into indented JSON.")
+    parser.add_argument("file_path", nargs="?", default='tmp/test.json',
+                        help="File to convert (in place by default); with --batch a file or directory")
+    parser.add_argument("-o", "--output", help="Write the JSON here instead of replacing the input "
+                                               "(with --batch: an output directory)")
+    layout = parser.add_mutually_exclusive_group()
+    layout.add_argument("--indent", type=int, help="Spaces per indentation level (default: 4; "
+                                                   "JSON Lines records stay compact unless given)")
+    layout.add_argument("--compact", action="store_true", help="Write compact JSON without whitespace")
+    fast = parser.add_mutually_exclusive_group()
+    fast.add_argument("--fast", dest="fast", action="store_true", default=None,
+                      help="Use orjson in memory whatever the size, unless it would change a number "
+                           "(requires --indent 2 or --compact)")
+    fast.add_argument("--no-fast", dest="fast", action="store_false", help="Always stream")
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--batch", action="store_true", help="Convert every .json and JSON Lines file in parallel")
+    batch.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    batch.add_argument("--split-mb", type=int, default=SPLIT_BYTES >> 20,
+                       help=f"MB of a JSON Lines file per task (default: {SPLIT_BYTES >> 20})")
+    batch.add_argument("--lines", action="store_true", help="Treat every file as JSON Lines")
+    batch.add_argument("--decode-fields", action="store_true",
+                       help="Also decode string fields holding stringified objects or arrays")
+    batch.add_argument("--report", help="Write the per-file results and errors to this JSON file")
+    args = parser.parse_args(argv)
+
+    indent = None if args.compact else (4 if args.indent is None else args.indent)
+    if not args.batch:
+        return 0 if prettify_json_string(args.file_path, args.output, indent, args.fast) else 1
+
+    if not os.path.exists(args.file_path):
+        print(f"Error: {args.file_path} does not exist")
+        return 1
+    summary = batch_prettify(args.file_path, args.output, indent, line_indent=None if args.compact else args.indent,
+                             workers=args.workers, split_bytes=max(args.split_mb, 1) << 20,
+                             decode_nested=args.decode_fields, lines=args.lines or None, report_path=args.report)
+    return 1 if summary["errors"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
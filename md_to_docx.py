@@ -1,60 +1,395 @@
 """Converts a Markdown file to a Word document.
 
-Iterates through the lines of the Markdown file and parses them, adding headings, paragraphs, and formatting based on the Markdown syntax. Headings, bold text, empty lines, etc. are all rendered appropriately in the Word document.
+Parses the Markdown with markdown-it (CommonMark plus tables and strikethrough) and
+walks the token stream, adding headings, paragraphs, bullet and numbered lists,
+block quotes, code blocks, tables, links and images to the Word document.
+
+All formatting comes from named styles (Heading N, List Bullet, Code Block, Strong,
+Emphasis, Hyperlink, ...) that are defined once in the document template, instead of
+setting font sizes and bold on every run. Styles the template lacks (headings, lists
+with their own bullet and numbering definitions, code, ...) are created before the
+conversion, so any .docx can be passed as a template.
 
 Args:
     file_path (str): The path to the Markdown file to convert.
+
+Requirements:
+- python-docx
+- markdown-it-py
 """
+import os
+from functools import partial
 from docx import Document
-from docx.shared import Pt
-import re
-
-# Add a heading to the document.
-def add_heading(document, text, level):
-    heading = document.add_heading(level=level)
-    run = heading.add_run(text)
-    run.bold = True
-    if level == 1:
-        run.font.size = Pt(24)
-    elif level == 2:
-        run.font.size = Pt(20)
-    else:
-        run.font.size = Pt(16)
-
-# Add a paragraph to the document.
-def add_paragraph(document, text):
+from docx.enum.style import WD_STYLE_TYPE
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Pt, RGBColor
+from markdown_it import MarkdownIt
+
+CODE_FONT = "Consolas"
+
+# Character style for each (bold, italic) combination
+EMPHASIS_STYLES = {
+    (True, False): "Strong",
+    (False, True): "Emphasis",
+    (True, True): "Strong Emphasis",
+}
+
+
+# Bullet characters per list level
+BULLETS = ("\u2022", "\u25e6", "\u25aa")
+LIST_LEVELS = 3
+HEADING_SIZES = (16, 14, 13, 12, 11, 11)
+
+
+# The <w:numbering> element of the document, adding a numbering part if the template has none.
+def numbering_element(document):
+    try:
+        return document.part.numbering_part.element
+    except NotImplementedError:
+        # python-docx cannot create the part itself (NumberingPart.new)
+        from docx.opc.constants import CONTENT_TYPE as CT
+        from docx.opc.packuri import PackURI
+        from docx.oxml import parse_xml
+        from docx.oxml.ns import nsdecls
+        from docx.parts.numbering import NumberingPart
+
+        part = NumberingPart(PackURI("/word/numbering.xml"), CT.WML_NUMBERING,
+                             parse_xml(f"<w:numbering {nsdecls('w')}/>"), document.part.package)
+        document.part.relate_to(part, RT.NUMBERING)
+        return part.element
+
+
+# Add a bullet or decimal numbering definition with LIST_LEVELS levels; return its numId.
+def add_list_numbering(document, ordered):
+    numbering = numbering_element(document)
+    abstracts = numbering.findall(qn('w:abstractNum'))
+    abstract_id = max((int(a.get(qn('w:abstractNumId'))) for a in abstracts), default=-1) + 1
+    num_id = max((int(n.get(qn('w:numId'))) for n in numbering.findall(qn('w:num'))), default=0) + 1
+
+    def element(tag, **attributes):
+        el = OxmlElement(tag)
+        for key, value in attributes.items():
+            el.set(qn(f'w:{key}'), str(value))
+        return el
+
+    abstract = element('w:abstractNum', abstractNumId=abstract_id)
+    for level in range(LIST_LEVELS):
+        lvl = element('w:lvl', ilvl=level)
+        lvl.append(element('w:start', val=1))
+        lvl.append(element('w:numFmt', val="decimal" if ordered else "bullet"))
+        lvl.append(element('w:lvlText', val=f"%{level + 1}." if ordered else BULLETS[level]))
+        p_pr = element('w:pPr')
+        p_pr.append(element('w:ind', left=720 * (level + 1), hanging=360))
+        lvl.append(p_pr)
+        abstract.append(lvl)
+    # Every abstractNum comes before the first num
+    position = numbering.index(abstracts[-1]) + 1 if abstracts else 0
+    numbering.insert(position, abstract)
+
+    num = element('w:num', numId=num_id)
+    num.append(element('w:abstractNumId', val=abstract_id))
+    numbering.append(num)
+    return num_id
+
+
+# Point a paragraph style at a level of a numbering definition.
+def set_style_numbering(style, num_id, level):
+    num_pr = OxmlElement('w:numPr')
+    for tag, value in (('w:ilvl', level), ('w:numId', num_id)):
+        child = OxmlElement(tag)
+        child.set(qn('w:val'), str(value))
+        num_pr.append(child)
+    style.element.get_or_add_pPr().insert(0, num_pr)
+
+
+# Create the styles the converter relies on, if the template does not have them.
+def ensure_styles(document):
+    styles = document.styles
+    existing = {style.name for style in styles}
+
+    def add(name, style_type, base=None):
+        if name in existing:
+            return None
+        style = styles.add_style(name, style_type)
+        if base:
+            style.base_style = styles[base]
+        existing.add(name)
+        return style
+
+    for level, size in enumerate(HEADING_SIZES, 1):
+        style = add(f"Heading {level}", WD_STYLE_TYPE.PARAGRAPH, base="Normal")
+        if style:
+            style.font.bold = True
+            style.font.size = Pt(size)
+            style.paragraph_format.space_before = Pt(12)
+            style.paragraph_format.keep_with_next = True
+    style = add("Strong", WD_STYLE_TYPE.CHARACTER)
+    if style:
+        style.font.bold = True
+    style = add("Emphasis", WD_STYLE_TYPE.CHARACTER)
+    if style:
+        style.font.italic = True
+    style = add("Strong Emphasis", WD_STYLE_TYPE.CHARACTER)
+    if style:
+        style.font.bold = True
+        style.font.italic = True
+    style = add("Hyperlink", WD_STYLE_TYPE.CHARACTER)
+    if style:
+        style.font.color.rgb = RGBColor(0x05, 0x63, 0xC1)
+        style.font.underline = True
+    style = add("Inline Code", WD_STYLE_TYPE.CHARACTER)
+    if style:
+        style.font.name = CODE_FONT
+    style = add("Code Block", WD_STYLE_TYPE.PARAGRAPH, base="Normal")
+    if style:
+        style.font.name = CODE_FONT
+        style.font.size = Pt(9)
+        style.paragraph_format.space_after = Pt(6)
+    add("Quote", WD_STYLE_TYPE.PARAGRAPH, base="Normal")
+
+    # List styles get a numbering definition, so they show bullets and numbers
+    for base, ordered in (("List Bullet", False), ("List Number", True)):
+        num_id = None
+        for level in range(LIST_LEVELS):
+            style = add(base if level == 0 else f"{base} {level + 1}", WD_STYLE_TYPE.PARAGRAPH, base="Normal")
+            if style:
+                num_id = num_id or add_list_numbering(document, ordered)
+                set_style_numbering(style, num_id, level)
+    style = add("List Continue", WD_STYLE_TYPE.PARAGRAPH, base="Normal")
+    if style:
+        style.paragraph_format.left_indent = Pt(36)
+
+
+def create_parser():
+    # Raw HTML is kept as literal text rather than interpreted
+    return MarkdownIt("commonmark", {"html": False}).enable(["table", "strikethrough"])
+
+
+# Add a horizontal rule as a paragraph with a bottom border.
+def add_horizontal_rule(document):
     paragraph = document.add_paragraph()
-    run = paragraph.add_run(text)
-    run.font.size = Pt(12)
-
-# Add a hyperlink to the document.
-def parse_markdown_line(document, line):
-    if line.startswith('## '):
-        add_heading(document, line[3:], level=1)
-    elif line.startswith('### '):
-        add_heading(document, line[4:], level=2)
-    elif line.startswith('- **'):
-        match = re.match(r'- \*\*(.*):\*\* (.*)', line)
-        if match:
-            add_paragraph(document, f'{match.group(1)}: {match.group(2)}')
-    elif line.strip() == '':
-        document.add_paragraph()  # Add an empty paragraph for empty lines, or you could just pass
-    else:
-        add_paragraph(document, line)
+    border = OxmlElement('w:pBdr')
+    bottom = OxmlElement('w:bottom')
+    for key, value in (('w:val', 'single'), ('w:sz', '6'), ('w:space', '1'), ('w:color', 'auto')):
+        bottom.set(qn(key), value)
+    border.append(bottom)
+    paragraph._p.get_or_add_pPr().append(border)
+
+
+class InlineRenderer:
+    """Adds the runs of an inline token's children to a paragraph."""
+
+    def __init__(self, base_dir, max_image_width):
+        self.base_dir = base_dir
+        self.max_image_width = max_image_width
+
+    def render(self, paragraph, children):
+        bold = italic = strike = False
+        hyperlink = None
+
+        def add_run(text, style=None):
+            run = paragraph.add_run(text, style or EMPHASIS_STYLES.get((bold, italic)))
+            if strike:
+                run.font.strike = True
+            if hyperlink is not None:
+                if style is None and not (bold or italic):
+                    run.style = "Hyperlink"
+                hyperlink.append(run._r)
+            return run
+
+        for token in children or []:
+            kind = token.type
+            if kind == "text":
+                add_run(token.content)
+            elif kind == "softbreak":
+                add_run(" ")
+            elif kind == "hardbreak":
+                add_run("").add_break()
+            elif kind == "code_inline":
+                add_run(token.content, "Inline Code")
+            elif kind == "strong_open":
+                bold = True
+            elif kind == "strong_close":
+                bold = False
+            elif kind == "em_open":
+                italic = True
+            elif kind == "em_close":
+                italic = False
+            elif kind == "s_open":
+                strike = True
+            elif kind == "s_close":
+                strike = False
+            elif kind == "link_open":
+                r_id = paragraph.part.relate_to(token.attrs.get("href", ""), RT.HYPERLINK, is_external=True)
+                hyperlink = OxmlElement('w:hyperlink')
+                hyperlink.set(qn('r:id'), r_id)
+                paragraph._p.append(hyperlink)
+            elif kind == "link_close":
+                hyperlink = None
+            elif kind == "image":
+                self.add_image(paragraph, token, add_run)
+
+    def add_image(self, paragraph, token, add_run):
+        src = token.attrs.get("src", "")
+        path = src if os.path.isabs(src) else os.path.join(self.base_dir, src)
+        alt = token.content or src
+        if "://" in src or not os.path.exists(path):
+            add_run(f"[image: {alt}]", "Emphasis")
+            return
+        try:
+            shape = paragraph.add_run().add_picture(path)
+        except Exception:
+            add_run(f"[image: {alt}]", "Emphasis")
+            return
+        if shape.width > self.max_image_width:
+            shape.height = int(shape.height * self.max_image_width / shape.width)
+            shape.width = self.max_image_width
+
+
+def render_tokens(document, tokens, base_dir="."):
+    """Add the block tokens of a parsed Markdown document to a Word document."""
+    section = document.sections[-1]
+    inline = InlineRenderer(base_dir, section.page_width - section.left_margin - section.right_margin)
+
+    lists = []             # stack of "bullet" / "ordered"
+    item_started = []      # per open list item: has its first paragraph been added?
+    quote_depth = 0
+    table_rows = None      # rows of (is_header, [inline tokens]) while inside a table
+    current_row = None
+
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        kind = token.type
+
+        if kind == "heading_open":
+            level = int(token.tag[1:])
+            paragraph = document.add_paragraph(style=f"Heading {level}")
+            inline.render(paragraph, tokens[i + 1].children)
+            i += 3
+            continue
+
+        if kind in ("bullet_list_open", "ordered_list_open"):
+            lists.append("bullet" if kind == "bullet_list_open" else "ordered")
+        elif kind in ("bullet_list_close", "ordered_list_close"):
+            lists.pop()
+        elif kind == "list_item_open":
+            item_started.append(False)
+        elif kind == "list_item_close":
+            item_started.pop()
+        elif kind == "blockquote_open":
+            quote_depth += 1
+        elif kind == "blockquote_close":
+            quote_depth -= 1
+
+        elif kind == "table_open":
+            table_rows = []
+        elif kind == "tr_open":
+            current_row = []
+        elif kind in ("th_open", "td_open"):
+            current_row.append((kind == "th_open", tokens[i + 1].children))
+        elif kind == "tr_close":
+            table_rows.append(current_row)
+        elif kind == "table_close":
+            add_table(document, table_rows, inline)
+            table_rows = None
+
+        elif kind == "paragraph_open" and table_rows is None:
+            if item_started and not item_started[-1]:
+                depth = min(len(lists), LIST_LEVELS)
+                base = "List Bullet" if lists[-1] == "bullet" else "List Number"
+                style = base if depth == 1 else f"{base} {depth}"
+                item_started[-1] = True
+            elif item_started:
+                style = "List Continue"
+            elif quote_depth:
+                style = "Quote"
+            else:
+                style = None
+            paragraph = document.add_paragraph(style=style)
+            inline.render(paragraph, tokens[i + 1].children)
+            i += 3
+            continue
+
+        elif kind in ("fence", "code_block"):
+            paragraph = document.add_paragraph(style="Code Block")
+            lines = token.content.rstrip("\n").split("\n")
+            run = paragraph.add_run(lines[0])
+            for line in lines[1:]:
+                run.add_break()
+                run = paragraph.add_run(line)
+        elif kind == "hr":
+            add_horizontal_rule(document)
+
+        i += 1
+
+
+def add_table(document, rows, inline):
+    """Add a Markdown table; header cells use the Strong character style."""
+    if not rows:
+        return
+    column_count = max(len(row) for row in rows)
+    table = document.add_table(rows=len(rows), cols=column_count)
+    try:
+        table.style = "Table Grid"
+    except KeyError:
+        pass
+
+    for row, cells in zip(table.rows, rows):
+        for cell, (is_header, children) in zip(row.cells, cells):
+            paragraph = cell.paragraphs[0]
+            inline.render(paragraph, children)
+            if is_header:
+                for run in paragraph.runs:
+                    if run.style is None or run.style.name == "Default Paragraph Font":
+                        run.style = "Strong"
+
 
 # Convert the Markdown file to a Word document.
-def markdown_to_word(file_path):
-    document = Document()
-    
+def markdown_to_word(file_path, output_path=None, template=None):
+    document = Document(template)
+    ensure_styles(document)
+
     with open(file_path, 'r', encoding='utf-8') as file:
-        for line in file:
-            parse_markdown_line(document, line)
-    
-    # You can modify the output file name or make it parameterized as well
-    output_file_name = file_path.replace('.md', '.docx')
+        tokens = create_parser().parse(file.read())
+
+    render_tokens(document, tokens, base_dir=os.path.dirname(os.path.abspath(file_path)))
+
+    # Defaults to the Markdown file name with a .docx extension
+    output_file_name = output_path or os.path.splitext(file_path)[0] + '.docx'
     document.save(output_file_name)
+    return output_file_name
+
+# Convert a whole directory tree, skipping files that have not changed.
+def batch_markdown_to_word(src_dir, out_dir, workers=None, force=False, template=None):
+    from batch_convert import convert_tree
+    # A partial of a module-level function pickles, so it can go to the worker processes
+    convert = partial(markdown_to_word, template=template)
+    return convert_tree(src_dir, out_dir, convert, ".md", ".docx", workers, force)
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a Markdown file (or a directory tree with --batch) to DOCX.")
+    parser.add_argument("file_path", help="Markdown file (or source directory)")
+    parser.add_argument("output_path", nargs="?", help="DOCX file (or output directory); defaults to file_path with .docx")
+    parser.add_argument("--template", help="DOCX whose styles to use "
+                                           "(with --batch, add --force after changing it)")
+    parser.add_argument("--batch", action="store_true", help="Convert a whole directory tree incrementally")
+    parser.add_argument("--workers", type=int, help="Processes for --batch (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="Reconvert unchanged files in --batch mode")
+    args = parser.parse_args(argv)
+
+    if args.batch:
+        summary = batch_markdown_to_word(args.file_path, args.output_path or args.file_path, args.workers, args.force,
+                                         args.template)
+        return 1 if summary["failed"] else 0
+
+    output_file_name = markdown_to_word(args.file_path, args.output_path, args.template)
     print(f'Document saved as {output_file_name}')
+    return 0
 
-# Example usage
-file_path = 'path/ to /file.md'  # Replace with the actual Markdown file path
-markdown_to_word(file_path)
+if __name__ == "__main__":
+    raise SystemExit(main())
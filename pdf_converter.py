@@ -2,17 +2,21 @@ import os
 from azure.core.credentials import AzureKeyCredential
 from azure.ai.documentintelligence import DocumentIntelligenceClient
 from azure.ai.documentintelligence.models import AnalyzeResult
-from dotenv import load_dotenv
 from pypdf import PdfWriter, PdfReader
 import fitz  # PyMuPDF
 import time
+import math
 import base64
-
-# Load environment variables
-load_dotenv()
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 def initialize_client():
     """Initialize the Document Intelligence client"""
+    from dotenv import load_dotenv
+
+    # Load environment variables
+    load_dotenv()
     endpoint = os.getenv("AZURE_ENDPOINT")
     key = os.getenv("AZURE_KEY")
     
@@ -21,103 +25,339 @@ def initialize_client():
         credential=AzureKeyCredential(key)
     )
 
-def analyze_document(client, file_path):
-    """Analyze the document using Azure Document Intelligence"""
-    # Check file size - Azure has a 500MB limit
-    file_size = os.path.getsize(file_path)
-    max_size = 500 * 1024 * 1024  # 500MB in bytes
-    
-    if file_size > max_size:
-        raise ValueError(f"File size ({file_size/1024/1024:.2f}MB) exceeds Azure's 500MB limit")
-    
-    # Get subscription tier to determine page limit
+# Service limits for a single analyze request
+MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB in bytes
+MAX_PAGES = 2000
+FREE_TIER_MAX_FILE_SIZE = 4 * 1024 * 1024  # 4MB in bytes
+FREE_TIER_MAX_PAGES = 2
+
+def get_request_limits(client):
+    """Return (max_bytes, max_pages) for one request on this subscription tier"""
     try:
         account_properties = client.get_resource_details()
         is_free_tier = account_properties.sku_name.lower() == 'f0'
-        
-        if is_free_tier:
-            print("Warning: Using free tier (F0) - only the first two pages will be processed")
-            pages = "1-2"
-        else:
-            pages = "1-"  # Process all pages in paid tier
-            
     except Exception:
         # If unable to determine tier, assume paid tier
-        pages = "1-"
         print("Warning: Unable to determine subscription tier")
-    
-    with open(file_path, "rb") as f:
-        document_bytes = f.read()
-        
+        is_free_tier = False
+
+    if is_free_tier:
+        print("Warning: Using free tier (F0) - documents are split into two-page requests")
+        return FREE_TIER_MAX_FILE_SIZE, FREE_TIER_MAX_PAGES
+    return MAX_FILE_SIZE, MAX_PAGES
+
+def analyze_bytes(client, document_bytes):
+    """Run prebuilt-read on one request's worth of document bytes
+
+    Span offsets are requested in Unicode code points, the unit of Python's len(),
+    so stitch_results can shift them by the length of the content before a part.
+    """
     poller = client.begin_analyze_document(
         model_id="prebuilt-read",
         body={
             "base64Source": base64.b64encode(document_bytes).decode()
         },
-        content_type="application/json",
-        pages=pages  # Specify pages based on tier
+        string_index_type="unicodeCodePoint",
+        content_type="application/json"
     )
-    
     return poller.result()
 
-def create_searchable_pdf(input_path, output_path, result):
-    """Create a searchable PDF with recognized text"""
+def split_pdf(file_path, output_dir, max_bytes, max_pages):
+    """Split a PDF into parts that are within the request limits.
+
+    Parts start as runs of max_pages pages; a part that is still over max_bytes is
+    halved until it fits. Returns a list of (first_page_index, part_path).
+    """
+    reader = PdfReader(file_path)
+    parts = []
+
+    def write_part(first, last):
+        writer = PdfWriter()
+        for index in range(first, last):
+            writer.add_page(reader.pages[index])
+        part_path = os.path.join(output_dir, f"part_{first:06d}.pdf")
+        with open(part_path, "wb") as f:
+            writer.write(f)
+
+        if os.path.getsize(part_path) > max_bytes:
+            if last - first == 1:
+                raise ValueError(f"Page {first + 1} alone exceeds the {max_bytes/1024/1024:.0f}MB request limit")
+            os.remove(part_path)
+            middle = (first + last) // 2
+            write_part(first, middle)
+            write_part(middle, last)
+        else:
+            parts.append((first, part_path))
+
+    page_count = len(reader.pages)
+    for first in range(0, page_count, max_pages):
+        write_part(first, min(first + max_pages, page_count))
+    return parts
+
+def stitch_results(part_results):
+    """Combine the results of consecutive parts into one AnalyzeResult.
+
+    part_results is a list of (first_page_index, AnalyzeResult) in page order. Page
+    numbers are shifted by each part's first page and span offsets by the length of
+    the content before it (counted in code points, the string_index_type that
+    analyze_bytes requests), so the result reads as one continuous document.
+    """
+    first_result = part_results[0][1]
+    contents, pages, paragraphs, styles, languages = [], [], [], [], []
+    content_offset = 0
+
+    def shift_spans(spans):
+        for span in spans or []:
+            span.offset += content_offset
+
+    for first_page, result in part_results:
+        for page in result.pages:
+            page.page_number += first_page
+            shift_spans(page.spans)
+            for line in page.lines or []:
+                shift_spans(line.spans)
+            for word in page.words or []:
+                word.span.offset += content_offset
+            pages.append(page)
+
+        for paragraph in result.paragraphs or []:
+            shift_spans(paragraph.spans)
+            for region in paragraph.bounding_regions or []:
+                region.page_number += first_page
+            paragraphs.append(paragraph)
+
+        for style in result.styles or []:
+            shift_spans(style.spans)
+            styles.append(style)
+
+        for language in result.languages or []:
+            shift_spans(language.spans)
+            languages.append(language)
+
+        contents.append(result.content or "")
+        # Parts are joined with a newline, like consecutive pages in one result
+        content_offset += len(result.content or "") + 1
+
+    return AnalyzeResult(
+        api_version=first_result.api_version,
+        model_id=first_result.model_id,
+        string_index_type=first_result.string_index_type,
+        content="\n".join(contents),
+        pages=pages,
+        paragraphs=paragraphs,
+        styles=styles,
+        languages=languages,
+    )
+
+def analyze_document(client, file_path, workers=4):
+    """Analyze the document using Azure Document Intelligence
+
+    PDFs over the request size or page limits are split into compliant parts with
+    pypdf, the parts are analyzed concurrently, and the results are stitched back
+    into one AnalyzeResult with continuous page numbers.
+    """
+    max_bytes, max_pages = get_request_limits(client)
+    file_size = os.path.getsize(file_path)
+    is_pdf = file_path.lower().endswith(".pdf")
+    page_count = len(PdfReader(file_path).pages) if is_pdf else 1
+
+    if file_size <= max_bytes and page_count <= max_pages:
+        with open(file_path, "rb") as f:
+            document_bytes = f.read()
+        return analyze_bytes(client, document_bytes)
+
+    if not is_pdf:
+        raise ValueError(f"File size ({file_size/1024/1024:.2f}MB) exceeds the {max_bytes/1024/1024:.0f}MB limit")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        parts = split_pdf(file_path, tmp_dir, max_bytes, max_pages)
+        print(f"Split {page_count} pages ({file_size/1024/1024:.2f}MB) into {len(parts)} parts")
+
+        def analyze_part(part_path):
+            with open(part_path, "rb") as f:
+                return analyze_bytes(client, f.read())
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(analyze_part, [part_path for _, part_path in parts]))
+
+    return stitch_results([(first, result) for (first, _), result in zip(parts, results)])
+
+def page_layout(analyzed_page):
+    """Return the OCR lines of an analyzed page as plain data.
+
+    Returns a dict with the page size in the units Document Intelligence reports
+    (inches for PDFs, pixels for images) and a list of (text, polygon) tuples.
+    """
+    return {
+        "width": analyzed_page.width,
+        "height": analyzed_page.height,
+        "lines": [(line.content, list(line.polygon or [])) for line in (analyzed_page.lines or [])],
+    }
+
+
+def place_lines(layout, page_width, page_height, font):
+    """Position and size the OCR lines of one page for its text layer.
+
+    Polygons are scaled from the analyzed page units to PDF points, and each line's
+    font size is chosen so the text spans the width of its bounding box (capped at
+    the box height).
+
+    Returns a list of (x, baseline, text, fontsize) tuples, plain data that can be
+    computed in a worker process.
+    """
+    scale_x = page_width / layout["width"]
+    scale_y = page_height / layout["height"]
+
+    placements = []
+    for text, polygon in layout["lines"]:
+        text = text.strip()
+        if not text or len(polygon) < 8:
+            continue
+
+        xs = polygon[0::2]
+        ys = polygon[1::2]
+        x0, x1 = min(xs) * scale_x, max(xs) * scale_x
+        y0, y1 = min(ys) * scale_y, max(ys) * scale_y
+        box_width, box_height = x1 - x0, y1 - y0
+        if box_width <= 0 or box_height <= 0:
+            continue
+
+        # Fit the line to its box width; the length at size 1 scales linearly
+        unit_length = font.text_length(text, fontsize=1)
+        fontsize = min(box_width / unit_length, box_height) if unit_length else box_height
+
+        # Baseline sits above the bottom of the box by the font's descender
+        placements.append((x0, y1 + font.descender * fontsize, text, fontsize))
+    return placements
+
+
+def write_placements(page, placements, font):
+    """Write placed lines as a single invisible text block.
+
+    All lines go through one TextWriter, so the page gets a single content stream
+    addition and one font resource. Returns the number of lines written.
+    """
+    writer = fitz.TextWriter(page.rect)
+    written = 0
+    for x, baseline, text, fontsize in placements:
+        try:
+            writer.append((x, baseline), text, font=font, fontsize=fontsize)
+            written += 1
+        except Exception as e:
+            print(f"Warning: Error processing line on page {page.number + 1}: {str(e)}")
+
+    if written:
+        # Render mode 3 = invisible text: searchable and selectable, not painted
+        writer.write_text(page, render_mode=3)
+    return written
+
+
+def write_text_layer(page, layout, font):
+    """Write all OCR lines of one page as a single invisible text block.
+
+    Returns the number of lines written.
+    """
+    return write_placements(page, place_lines(layout, page.rect.width, page.rect.height, font), font)
+
+
+def _place_lines_part(layouts, page_sizes):
+    """Worker: place the lines of a page range; None for pages without a layout."""
+    font = fitz.Font("helv")
+    return [
+        None if layout is None else place_lines(layout, width, height, font)
+        for layout, (width, height) in zip(layouts, page_sizes)
+    ]
+
+
+def create_searchable_pdf(input_path, output_path, result, workers=1, pages_per_part=None):
+    """Create a searchable PDF with recognized text
+
+    Args:
+        input_path (str): The scanned PDF
+        output_path (str): Where to save the searchable PDF
+        result (AnalyzeResult): Document Intelligence result for input_path
+        workers (int): Number of processes; with more than one, the lines of page
+            ranges are placed in parallel. The text is always written into a single
+            copy of the input, so links, forms, named destinations, page labels and
+            the outline are kept and the output matches the serial one
+        pages_per_part (int): Pages per worker task (default: spread evenly so each
+            worker gets about four tasks)
+    """
     try:
-        # Open the PDF with PyMuPDF
-        doc = fitz.open(input_path)
-        
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            print(f"Processing page {page_num + 1}")
-            
-            # Get the recognized text for this page
-            page_text = result.pages[page_num]
-            
-            # Add text annotations for each line
-            for line in page_text.lines:
-                try:
-                    points = line.polygon
-                    page_width = page.rect.width
-                    page_height = page.rect.height
-                    
-                    x0 = points[0] * page_width
-                    y0 = points[1] * page_height
-                    
-                    page.insert_text(
-                        (x0, y0),
-                        line.content,
-                        color=(0, 0, 0),
-                        opacity=0
-                    )
-                except Exception as e:
-                    print(f"Warning: Error processing line on page {page_num + 1}: {str(e)}")
+        # Analyzed pages are matched by page number, so partial results still line up
+        analyzed_pages = {page.page_number: page for page in result.pages}
+
+        with fitz.open(input_path) as doc:
+            page_count = len(doc)
+            page_sizes = [(page.rect.width, page.rect.height) for page in doc]
+            layouts = [
+                page_layout(analyzed_pages[page_num + 1]) if page_num + 1 in analyzed_pages else None
+                for page_num in range(page_count)
+            ]
+
+            if workers <= 1 or page_count < 2:
+                placements = _place_lines_part(layouts, page_sizes)
+            else:
+                if not pages_per_part:
+                    pages_per_part = max(1, math.ceil(page_count / (workers * 4)))
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [
+                        pool.submit(_place_lines_part, layouts[first_page:first_page + pages_per_part],
+                                    page_sizes[first_page:first_page + pages_per_part])
+                        for first_page in range(0, page_count, pages_per_part)
+                    ]
+                    placements = [page for future in futures for page in future.result()]
+
+            font = fitz.Font("helv")
+            for page_num, page_placements in enumerate(placements):
+                if page_placements is None:
                     continue
-        
-        doc.save(output_path)
-        doc.close()
+                if page_num % 100 == 0:
+                    print(f"Processing page {page_num + 1}")
+                write_placements(doc[page_num], page_placements, font)
+
+            # Drop unused objects and compress streams
+            doc.save(output_path, garbage=4, deflate=True)
+
         print(f"Successfully created searchable PDF: {output_path}")
-        
+
     except Exception as e:
         print(f"Error creating searchable PDF: {str(e)}")
         raise
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create a searchable PDF using Azure Document Intelligence.")
+    parser.add_argument("input", nargs="?", default="C:/repo/pythonScripts/data/d1.pdf", help="Scanned PDF")
+    parser.add_argument("output", nargs="?", default="C:/repo/pythonScripts/data/d1_searchable_output.pdf",
+                        help="Searchable PDF to write")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for laying out text layers, 0 for all cores (default: 1)")
+    parser.add_argument("--analyze-workers", type=int, default=4,
+                        help="Concurrent analyze requests for split documents (default: 4)")
+    parser.add_argument("--text", help="Also save the recognized text to this file")
+    args = parser.parse_args(argv)
+
     # Initialize the client
     client = initialize_client()
     
     # Input and output file paths
-    input_file = "C:/repo/pythonScripts/data/d1.pdf"
-    output_file = "C:/repo/pythonScripts/data/d1_searchable_output.pdf"
+    input_file = args.input
+    output_file = args.output
     
     print("Starting document analysis...")
     
     # Analyze the document
-    result = analyze_document(client, input_file)
+    result = analyze_document(client, input_file, workers=args.analyze_workers)
+
+    if args.text:
+        with open(args.text, "w", encoding="utf-8") as f:
+            f.write(result.content)
+        print(f"Recognized text saved: {args.text}")
     
     print("Creating searchable PDF...")
     
     # Create searchable PDF
-    create_searchable_pdf(input_file, output_file, result)
+    create_searchable_pdf(input_file, output_file, result, workers=args.workers or os.cpu_count())
     
     print(f"Searchable PDF created: {output_file}")
 
@@ -3,61 +3,268 @@
 import fitz  # PyMuPDF
 import os
 import re  # Regular expressions library
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
-def extract_content_from_pdf(pdf_path):
+# Runs of whitespace containing two or more line breaks; form feeds (page breaks)
+# are not whitespace here, so they are never collapsed away
+MULTIPLE_EMPTY_LINES = re.compile(r'\n[^\S\f]*\n')
+# Written between the texts of consecutive pages, so readers (fts_index.py) can split
+PAGE_SEPARATOR = "\f"
+
+
+def clean_text_chunk(carry, chunk):
+    """
+    Removes multiple consecutive empty lines from a piece of a longer text.
+
+    Trailing whitespace is held back and returned as the new carry, so a run of
+    empty lines split across two chunks is collapsed exactly as if the whole text
+    had been cleaned at once.
+
+    Args:
+    carry (str): Whitespace held back from the previous chunk.
+    chunk (str): The next piece of text.
+
+    Returns:
+    tuple: (cleaned text ready to write, whitespace to carry into the next chunk)
+    """
+    text = carry + chunk
+    head = text.rstrip()
+    return MULTIPLE_EMPTY_LINES.sub('\n\n', head), text[len(head):]
+
+
+def extract_page_range(pdf_path, first_page, last_page):
+    """
+    Extracts the text and image references of pages first_page..last_page-1.
+
+    Opens the document itself so it can run in a worker process. Images are only
+    listed here (one get_images call per page); they are extracted once per xref
+    by extract_images.
+
+    Returns:
+    tuple: (list of page texts each followed by a newline,
+            list per page of (xref, width, height) for the images it shows)
+    """
+    document = fitz.open(pdf_path)
+    pages_text = []
+    pages_images = []
+
+    for page_num in range(first_page, last_page):
+        # Get the page
+        page = document.load_page(page_num)
+
+        # Extract text
+        pages_text.append(page.get_text() + "\n")
+
+        # List images, once per xref even if the page shows it several times
+        images = {}
+        for img in page.get_images(full=True):
+            images.setdefault(img[0], (img[0], img[2], img[3]))
+        pages_images.append(list(images.values()))
+
+    document.close()
+    return pages_text, pages_images
+
+
+# MuPDF reports JPEG 2000 as "jpx"; use the usual file extension
+IMAGE_EXTENSIONS = {"jpx": "jp2"}
+
+
+def extract_images(pdf_path, img_dir, jobs, min_bytes=0):
+    """
+    Extracts each image xref once and saves it in its native format.
+
+    Opens the document itself so it can run in a worker process.
+
+    Args:
+    pdf_path (str): The PDF file.
+    img_dir (str): Directory to save the images in.
+    jobs (list): (xref, file name without extension) pairs.
+    min_bytes (int): Images with fewer encoded bytes are skipped.
+
+    Returns:
+    list: (xref, file name or None if skipped, encoded size in bytes) per job.
+    """
+    document = fitz.open(pdf_path)
+    saved = []
+
+    for xref, stem in jobs:
+        # Extract the image bytes
+        base_image = document.extract_image(xref)
+        if not base_image or len(base_image["image"]) < min_bytes:
+            saved.append((xref, None, len(base_image["image"]) if base_image else 0))
+            continue
+
+        ext = IMAGE_EXTENSIONS.get(base_image["ext"], base_image["ext"])
+        file_name = f"{stem}.{ext}"
+
+        # Save the image
+        with open(os.path.join(img_dir, file_name), 'wb') as img_file:
+            img_file.write(base_image["image"])
+        saved.append((xref, file_name, len(base_image["image"])))
+
+    document.close()
+    return saved
+
+
+def extract_content_from_pdf(pdf_path, workers=1, pages_per_chunk=32, images=True,
+                             min_size=0, min_bytes=0, manifest=False, images_per_task=64):
     """
     Extracts text and images from a PDF file, saving the text to a .txt file
     and images to a subfolder named after the PDF file.
     Removes multiple consecutive empty lines in text, leaving only one.
+    Pages are separated by a form feed.
+
+    Text is cleaned and written page by page, so memory use does not grow with
+    the document. With workers > 1, ranges of pages_per_chunk pages are extracted
+    in a process pool and written in page order as they complete.
+
+    Each distinct image (PDF xref) is extracted and written once, in its native
+    format (jpeg, png, jp2, ...), named after the page where it first appears.
+    Repeated logos and letterheads are therefore not decoded again for every page.
 
     Args:
     pdf_path (str): The file path of the PDF to be converted.
+    workers (int): Number of processes (1 extracts in this process).
+    pages_per_chunk (int): Pages handed to a worker at a time.
+    images (bool): Whether to extract images at all.
+    min_size (int): Skip images narrower or shorter than this many pixels.
+    min_bytes (int): Skip images with fewer encoded bytes than this.
+    manifest (bool): Write manifest.json in the image folder mapping pages to images.
+    images_per_task (int): Distinct images handed to a worker at a time.
     """
-    # Open the PDF file
-    document = fitz.open(pdf_path)
-
-    # Prepare to collect text
-    text = ''
+    with fitz.open(pdf_path) as document:
+        page_count = len(document)
 
     # Prepare directory for images
     base_name = os.path.splitext(os.path.basename(pdf_path))[0]
     img_dir = os.path.join(os.path.dirname(pdf_path), f"{base_name}_images")
-    os.makedirs(img_dir, exist_ok=True)
+    if images:
+        os.makedirs(img_dir, exist_ok=True)
 
-    # Iterate through each page in the PDF
-    for page_num in range(len(document)):
-        # Get the page
-        page = document.load_page(page_num)
+    ranges = [(first, min(first + pages_per_chunk, page_count))
+              for first in range(0, page_count, pages_per_chunk)]
 
-        # Extract text
-        text += page.get_text() + "\n"
+    # xref -> file name stem of every distinct image seen so far (None if filtered out)
+    image_names = {}
+    image_info = {}
+    page_refs = {}
+    image_jobs = []
+    image_futures = []
 
-        # Extract images
-        image_list = page.get_images(full=True)
-        for image_index, img in enumerate(page.get_images(full=True)):
-            # Extract the image bytes
-            base_image = document.extract_image(img[0])
-            image_bytes = base_image["image"]
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
 
-            # Construct image file path
-            image_path = os.path.join(img_dir, f"{base_name}_page_{page_num+1}_img_{image_index+1}.png")
+    def submit_images(jobs):
+        if pool is None:
+            image_futures.append(extract_images(pdf_path, img_dir, jobs, min_bytes))
+        else:
+            image_futures.append(pool.submit(extract_images, pdf_path, img_dir, jobs, min_bytes))
 
-            # Save the image
-            with open(image_path, 'wb') as img_file:
-                img_file.write(image_bytes)
+    text_file_path = os.path.splitext(pdf_path)[0] + '.txt'
+    try:
+        with open(text_file_path, 'w', encoding='utf-8') as text_file:
+            carry = ''
 
-    # Clean the text from multiple empty lines
-    text = re.sub(r'\n\s*\n', '\n\n', text)
+            def write_range(first_page, result):
+                nonlocal carry, image_jobs
+                pages_text, pages_images = result
+                for offset, page_text in enumerate(pages_text):
+                    page_num = first_page + offset
+                    if page_num:
+                        page_text = PAGE_SEPARATOR + page_text
+                    # Clean the text from multiple empty lines
+                    cleaned, carry = clean_text_chunk(carry, page_text)
+                    text_file.write(cleaned)
 
-    # Save the text to a file
-    text_file_path = os.path.splitext(pdf_path)[0] + '.txt'
-    with open(text_file_path, 'w', encoding='utf-8') as text_file:
-        text_file.write(text)
+                    if not images:
+                        continue
+                    for image_index, (xref, width, height) in enumerate(pages_images[offset]):
+                        if xref not in image_names:
+                            if width < min_size or height < min_size:
+                                image_names[xref] = None
+                            else:
+                                stem = f"{base_name}_page_{page_num+1}_img_{image_index+1}"
+                                image_names[xref] = stem
+                                image_info[xref] = {"xref": xref, "width": width, "height": height,
+                                                    "first_page": page_num + 1}
+                                image_jobs.append((xref, stem))
+                        if image_names[xref] is not None:
+                            page_refs.setdefault(page_num + 1, []).append(xref)
+
+                if len(image_jobs) >= images_per_task:
+                    submit_images(image_jobs)
+                    image_jobs = []
+
+            if pool is None:
+                for first, last in ranges:
+                    write_range(first, extract_page_range(pdf_path, first, last))
+            else:
+                # Keep a bounded number of ranges in flight and write them in order
+                pending = []
+                for first, last in ranges:
+                    pending.append((first, pool.submit(extract_page_range, pdf_path, first, last)))
+                    if len(pending) >= 2 * workers:
+                        first_page, future = pending.pop(0)
+                        write_range(first_page, future.result())
+                for first_page, future in pending:
+                    write_range(first_page, future.result())
+
+            text_file.write(MULTIPLE_EMPTY_LINES.sub('\n\n', carry))
+
+        if image_jobs:
+            submit_images(image_jobs)
+
+        # Collect the saved file names (with their native extensions)
+        saved_count = 0
+        for future in image_futures:
+            for xref, file_name, size in (future if pool is None else future.result()):
+                image_info[xref]["file"] = file_name
+                image_info[xref]["bytes"] = size
+                saved_count += file_name is not None
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
     print(f"Text extracted and saved to {text_file_path}")
-    print(f"Images extracted and saved to {img_dir}")
+    if images:
+        print(f"{saved_count} distinct images extracted and saved to {img_dir}")
+
+    if images and manifest:
+        manifest_path = os.path.join(img_dir, "manifest.json")
+        with open(manifest_path, 'w', encoding='utf-8') as manifest_file:
+            json.dump({
+                "pdf": os.path.basename(pdf_path),
+                "images": [info for info in image_info.values() if info.get("file")],
+                "pages": {
+                    str(page): [image_info[xref]["file"] for xref in xrefs if image_info[xref].get("file")]
+                    for page, xrefs in sorted(page_refs.items())
+                },
+            }, manifest_file, indent=2)
+        print(f"Image manifest saved to {manifest_path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract text and images from a PDF file.")
+    parser.add_argument("pdf_path", help="The PDF file to convert")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for page and image extraction, 0 for all cores (default: 1)")
+    parser.add_argument("--pages-per-chunk", type=int, default=32,
+                        help="Pages per worker task (default: 32)")
+    parser.add_argument("--no-images", action="store_true", help="Only extract text")
+    parser.add_argument("--min-size", type=int, default=0,
+                        help="Skip images smaller than this many pixels in width or height")
+    parser.add_argument("--min-bytes", type=int, default=0,
+                        help="Skip images smaller than this many encoded bytes")
+    parser.add_argument("--manifest", action="store_true",
+                        help="Write a page -> image manifest.json in the image folder")
+    args = parser.parse_args(argv)
+
+    extract_content_from_pdf(args.pdf_path, workers=args.workers or os.cpu_count(),
+                             pages_per_chunk=args.pages_per_chunk, images=not args.no_images,
+                             min_size=args.min_size, min_bytes=args.min_bytes,
+                             manifest=args.manifest)
 
-# Example usage
-pdf_path = 'C:/Users/xxx/yyy.pdf'  # Replace this with the path to your PDF file
-extract_content_from_pdf(pdf_path)
 
+if __name__ == "__main__":
+    main()
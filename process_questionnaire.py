@@ -21,7 +21,7 @@ Requirements:
   - AZURE_OPENAI_DEPLOYMENT_NAME: Your GPT-4V deployment name
 
 Usage:
-    python process_questionnaire.py
+    python process_questionnaire.py [data/d1.pdf] [--output-dir output] [--page-limit 2]
 
 Output Structure:
     output/
@@ -41,17 +41,24 @@ import base64
 from PIL import Image
 import io
 import json
+import argparse
 from datetime import datetime
+from functools import lru_cache
 
-# Load environment variables from .env file
-load_dotenv(override=True)
+@lru_cache(maxsize=None)
+def get_client() -> AzureOpenAI:
+    """
+    Create the Azure OpenAI client on first use.
 
-# Initialize Azure OpenAI client with environment variables
-client = AzureOpenAI(
-    api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-)
+    Environment variables are loaded from the .env file at that point rather than
+    on import, so importing this module has no side effects.
+    """
+    load_dotenv(override=True)
+    return AzureOpenAI(
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+    )
 
 def encode_image_to_base64(image: Image.Image) -> str:
     """
@@ -118,6 +125,7 @@ def analyze_image_with_gpt4(image: Image.Image) -> str:
     **Be as accurate as possible in reading the handwritten text.**"""
 
     # Make API call to Azure OpenAI
+    client = get_client()
     response = client.chat.completions.create(
         model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
         messages=[
@@ -261,6 +269,14 @@ def process_pdf(pdf_path: str, output_dir: str = "output", page_limit: int = 5)
         print(f"Error opening PDF: {str(e)}")
         return
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract handwritten questionnaire answers from a scanned PDF with GPT-4V.")
+    parser.add_argument("pdf_path", nargs="?", default="data/d1.pdf", help="Scanned questionnaire PDF")
+    parser.add_argument("--output-dir", default="output", help="Directory for the batch folders (default: output)")
+    parser.add_argument("--page-limit", type=int, default=2, help="Maximum number of pages to process (default: 2)")
+    args = parser.parse_args(argv)
+
+    process_pdf(args.pdf_path, args.output_dir, page_limit=args.page_limit)
+
 if __name__ == "__main__":
-    pdf_path = "data/d1.pdf"
-    process_pdf(pdf_path, page_limit=2) 
\ No newline at end of file
+    main()
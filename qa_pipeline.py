@@ -0,0 +1,705 @@
+"""
+Questionnaire Extraction Pipeline
+
+Single engine behind extract_text.py, process_qa.py and extract_qa.py. It runs the
+three steps of the questionnaire workflow as concurrent stages connected by bounded
+queues, so structuring starts while Document Intelligence is still reading the rest
+of the document:
+
+    OCR (Azure Document Intelligence) -> structure (Azure OpenAI) -> export (Markdown/Excel/JSON)
+
+Input:
+- A PDF file, a directory of PDF files, or a JSON file written by extract_text.py
+  (the OCR stage is skipped for JSON input)
+
+Outputs:
+- Markdown file with the structured responses (default: qa_extracted.md)
+- Excel file with one row per response (default: qa_responses.xlsx)
+- In --ocr-only mode, a JSON file per PDF in extract_text.py format
+  ({"total_pages": N, "pages": [...]})
+
+Features:
+- PDFs are split into shards of a few pages; shards are analyzed concurrently and
+  every page is handed to the LLM stage as soon as its shard finishes
+- Several LLM workers structure pages in parallel
+- Bounded queues apply back-pressure, so memory stays flat on large batches
+- Responses are written in document order regardless of completion order
+
+Usage:
+    python qa_pipeline.py data/d1.pdf
+    python qa_pipeline.py data/ --profile gcc --page-limit 5
+    python qa_pipeline.py data/d1.pdf --ocr-only --json data/extracted_text.json
+    python qa_pipeline.py data/extracted_text.json --profile gcc
+
+Requirements:
+- Python 3.8+
+- azure-ai-documentintelligence, PyMuPDF (OCR stage only)
+- openai, pandas, openpyxl
+- python-dotenv
+
+Environment Variables Required:
+- AZURE_ENDPOINT, AZURE_KEY: Azure Document Intelligence (OCR stage)
+- AZURE_OPENAI_API_KEY, AZURE_OPENAI_API_VERSION, AZURE_OPENAI_ENDPOINT,
+  AZURE_OPENAI_DEPLOYMENT_NAME: Azure OpenAI (structuring stage)
+"""
+
+import os
+import json
+import base64
+import queue
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from question_index import QuestionIndex
+
+
+# Marks the end of a stage's output on a queue
+_DONE = object()
+
+MARKDOWN_TITLE = "# GCC Breakout Questionnaire Responses\n\n"
+
+GENERIC_PROMPT = """Extract the following information from this questionnaire response and format it in a clear way:
+
+1. Name and Function/Role
+2. All questions and their corresponding answers
+
+Format the response as follows:
+
+## Respondent: [Name and Function/Role]
+
+### Question: Name & Function
+**Answer:** [Their name and function/role]
+
+### Question: [Question text]
+**Answer:** [Their response]
+
+[Continue with remaining questions and answers]
+
+Document Text:
+{text}
+"""
+
+GCC_PROMPT = """Extract information from this GCC Breakout Questionnaire response.
+The questionnaire typically contains:
+1. Name & Function field
+2. Questions about GCC opportunities and scaling
+3. Additional comments or notes
+
+Format the response EXACTLY as follows (keep these exact headings):
+
+## Respondent Information
+
+### Question: Name & Function
+**Answer:** [Extract the name and function/role]
+
+### Question: Please specify what opportunities do you see to establish GCC?
+**Answer:** [Their response about GCC opportunities]
+
+### Question: Please specify what opportunities do you see to scale &/or transform GCC?
+**Answer:** [Their response about scaling/transforming GCC]
+
+Document Text:
+{text}
+"""
+
+GCC_COLUMNS = ["Name & Function", "Opportunities to establish GCC", "Opportunities to scale/transform GCC"]
+
+
+# ---------------------------------------------------------------------------
+# Clients
+# ---------------------------------------------------------------------------
+
+def initialize_doc_client():
+    """Initialize the Document Intelligence client"""
+    from azure.core.credentials import AzureKeyCredential
+    from azure.ai.documentintelligence import DocumentIntelligenceClient
+
+    endpoint = os.getenv("AZURE_ENDPOINT")
+    key = os.getenv("AZURE_KEY")
+
+    return DocumentIntelligenceClient(
+        endpoint=endpoint,
+        credential=AzureKeyCredential(key)
+    )
+
+
+def initialize_openai_client():
+    """Initialize the Azure OpenAI client"""
+    from openai import AzureOpenAI
+
+    return AzureOpenAI(
+        api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+        azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+    )
+
+
+# ---------------------------------------------------------------------------
+# OCR stage
+# ---------------------------------------------------------------------------
+
+def iter_pdf_shards(pdf_path, shard_size=10, page_limit=None):
+    """Yield (first_page, page_count, pdf_bytes) for consecutive page ranges of a PDF.
+
+    Each shard is a standalone PDF, so only its own pages are uploaded for analysis.
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        total_pages = doc.page_count
+        if page_limit:
+            total_pages = min(page_limit, total_pages)
+
+        for start in range(0, total_pages, shard_size):
+            end = min(start + shard_size, total_pages)
+            shard = fitz.open()
+            shard.insert_pdf(doc, from_page=start, to_page=end - 1)
+            shard_bytes = shard.tobytes(garbage=3, deflate=True)
+            shard.close()
+            yield start + 1, end - start, shard_bytes
+
+
+def analyze_pdf_bytes(client, document_bytes):
+    """Run prebuilt-read on a PDF and return the text of each page."""
+    poller = client.begin_analyze_document(
+        model_id="prebuilt-read",
+        body={
+            "base64Source": base64.b64encode(document_bytes).decode()
+        },
+        content_type="application/json"
+    )
+
+    result = poller.result()
+
+    pages_text = []
+    for page in result.pages:
+        pages_text.append("".join(line.content + " " for line in (page.lines or [])))
+    return pages_text
+
+
+def extract_text_from_pdf(pdf_path, shard_size=10, workers=4):
+    """Extracts text from the given PDF file using Azure Document Intelligence and returns a list of page texts."""
+    if not os.path.exists(pdf_path):
+        raise FileNotFoundError(f"PDF file not found at path: {pdf_path}")
+
+    print(f"Analyzing PDF using Azure Document Intelligence...")
+    client = initialize_doc_client()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(analyze_pdf_bytes, client, shard_bytes)
+            for _, _, shard_bytes in iter_pdf_shards(pdf_path, shard_size)
+        ]
+        pages_text = [text for future in futures for text in future.result()]
+
+    for page_num, page_text in enumerate(pages_text, 1):
+        print(f"Page {page_num}: Extracted {len(page_text)} characters")
+
+    return pages_text
+
+
+def _emit_shard(future, shard, out_queue):
+    """Put the pages of a finished OCR shard on the queue, in page order."""
+    source, first_page, page_count, seq = shard
+    try:
+        pages_text = future.result()
+    except Exception as e:
+        print(f"Error analyzing pages {first_page}-{first_page + page_count - 1} of {source}: {str(e)}")
+        pages_text = [None] * page_count
+        error = f"Error processing response: {str(e)}"
+    else:
+        error = None
+
+    for offset, page_text in enumerate(pages_text):
+        if page_text is not None:
+            print(f"{os.path.basename(source)} page {first_page + offset}: Extracted {len(page_text)} characters")
+        out_queue.put({
+            "seq": seq + offset,
+            "source": source,
+            "page": first_page + offset,
+            "text": page_text,
+            "error": error,
+        })
+
+
+def ocr_stage(sources, out_queue, shard_size=10, workers=4, page_limit=None):
+    """Read every source and put one item per page on out_queue.
+
+    PDF shards are analyzed concurrently with at most 2 * workers shards in flight.
+    JSON sources (extract_text.py output) are read directly without OCR.
+    Returns the number of pages emitted.
+    """
+    seq = 0
+    client = None
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for source in sources:
+            if source.lower().endswith(".json"):
+                with open(source, 'r', encoding='utf-8') as f:
+                    pages_text = json.load(f)['pages']
+                if page_limit:
+                    pages_text = pages_text[:page_limit]
+                for page_num, page_text in enumerate(pages_text, 1):
+                    out_queue.put({"seq": seq, "source": source, "page": page_num, "text": page_text, "error": None})
+                    seq += 1
+                continue
+
+            if client is None:
+                client = initialize_doc_client()
+
+            print(f"Analyzing {source} using Azure Document Intelligence...")
+            try:
+                for first_page, page_count, shard_bytes in iter_pdf_shards(source, shard_size, page_limit):
+                    while len(pending) >= 2 * workers:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            _emit_shard(future, pending.pop(future), out_queue)
+
+                    future = pool.submit(analyze_pdf_bytes, client, shard_bytes)
+                    pending[future] = (source, first_page, page_count, seq)
+                    seq += page_count
+            except Exception as e:
+                print(f"Error reading {source}: {str(e)}")
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                _emit_shard(future, pending.pop(future), out_queue)
+
+    return seq
+
+
+# ---------------------------------------------------------------------------
+# Structuring stage
+# ---------------------------------------------------------------------------
+
+def process_single_response(text, profile="generic", client=None):
+    """Process a single questionnaire response and return structured data."""
+    if profile == "gcc":
+        prompt = GCC_PROMPT.format(text=text)
+        system = "You are a precise assistant that extracts questionnaire responses. Always maintain the exact question headings as provided in the prompt. If information is missing, indicate with '[No response provided]'."
+    else:
+        prompt = GENERIC_PROMPT.format(text=text)
+        system = "You are a helpful assistant that extracts and formats questionnaire responses."
+
+    try:
+        if client is None:
+            client = initialize_openai_client()
+
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ]
+
+        response = client.chat.completions.create(
+            model=os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME"),
+            messages=messages,
+            temperature=0.1,
+            max_tokens=1000
+        )
+
+        return response.choices[0].message.content
+    except Exception as e:
+        return f"Error processing response: {str(e)}"
+
+
+def structure_stage(in_queue, out_queue, profile="generic"):
+    """Structure pages from in_queue with the LLM until the end marker arrives."""
+    client = None
+    try:
+        client = initialize_openai_client()
+    except Exception as e:
+        print(f"Error initializing Azure OpenAI client: {str(e)}")
+
+    while True:
+        item = in_queue.get()
+        if item is _DONE:
+            break
+        if item["error"]:
+            item["response"] = item["error"]
+        else:
+            print(f"Processing {os.path.basename(item['source'])} page {item['page']}...")
+            item["response"] = process_single_response(item["text"], profile, client)
+        out_queue.put(item)
+
+
+# ---------------------------------------------------------------------------
+# Export stage
+# ---------------------------------------------------------------------------
+
+def extract_data_for_excel(markdown_text):
+    """Extract data from markdown text for Excel format."""
+    try:
+        # Extract name from the first line that contains "Answer:"
+        name_line = next(line for line in markdown_text.split('\n') if "Answer:" in line and "Name" in line)
+        name = name_line.split("Answer:")[1].strip()
+
+        # Extract other Q&A pairs
+        qa_pairs = {}
+        current_question = None
+
+        for line in markdown_text.split('\n'):
+            if line.startswith('### Question:'):
+                current_question = line.replace('### Question:', '').strip()
+            elif line.startswith('**Answer:**') and current_question:
+                answer = line.replace('**Answer:**', '').strip()
+                qa_pairs[current_question] = answer
+
+        return name, qa_pairs
+    except Exception as e:
+        print(f"Error extracting data: {str(e)}")
+        return None, None
+
+
+def extract_gcc_data_for_excel(markdown_text):
+    """Extract the fixed GCC questionnaire columns from markdown text for Excel format."""
+    try:
+        qa_pairs = {column: "[No response]" for column in GCC_COLUMNS}
+
+        current_question = None
+        for line in markdown_text.split('\n'):
+            if line.startswith('### Question:'):
+                current_question = line.replace('### Question:', '').strip()
+            elif line.startswith('**Answer:**') and current_question:
+                answer = line.replace('**Answer:**', '').strip()
+
+                if "Name & Function" in current_question:
+                    qa_pairs["Name & Function"] = answer
+                elif "opportunities do you see to establish GCC" in current_question:
+                    qa_pairs["Opportunities to establish GCC"] = answer
+                elif "opportunities do you see to scale" in current_question:
+                    qa_pairs["Opportunities to scale/transform GCC"] = answer
+
+        # Only return if we have at least a name
+        if qa_pairs["Name & Function"] != "[No response]":
+            return qa_pairs
+        return None
+
+    except Exception as e:
+        print(f"Error extracting data for Excel: {str(e)}")
+        return None
+
+
+def response_to_row(response_text, profile="generic", index=None):
+    """Turn one structured response into an Excel row, or None if it has no usable data.
+
+    For the generic profile, questions are mapped to canonical IDs through `index`
+    (a question_index.QuestionIndex); questions a frozen index does not know go to
+    the "Other" column.
+    """
+    if profile == "gcc":
+        return extract_gcc_data_for_excel(response_text)
+    name, qa_pairs = extract_data_for_excel(response_text)
+    if not (name and qa_pairs):
+        return None
+    if index is None:
+        return {"Name": name, **qa_pairs}
+
+    row = {"Name": name}
+    other = []
+    for question, answer in qa_pairs.items():
+        question_id = index.canonicalize(question)
+        if question_id is None:
+            other.append(f"{question}: {answer}")
+        elif question_id in row:
+            row[question_id] += "\n" + answer
+        else:
+            row[question_id] = answer
+    if other:
+        row["Other"] = "\n".join(other)
+    return row
+
+
+def write_excel(rows, excel_path, profile="generic", index=None, min_support=0.0):
+    """Write the collected rows to an Excel sheet, or to Parquet for a .parquet path.
+
+    With a question index the table has a fixed schema: Name, one column per canonical
+    question of a loaded schema and per new one answered by at least `min_support` of
+    the respondents, then Other. Rarer new questions are folded into Other. The canonical question texts are written
+    to a "Questions" sheet (Excel) or a *_questions.json schema file (Parquet).
+    """
+    import math
+    import pandas as pd
+
+    if profile == "gcc":
+        # Reorder columns to put Name first
+        df = pd.DataFrame(rows)[GCC_COLUMNS]
+    elif index is None:
+        df = pd.DataFrame(rows)
+    else:
+        columns = index.columns(min_count=math.ceil(min_support * len(rows)))
+        keep = set(columns)
+        labels = dict(zip(index.columns(), index.labels))
+        for row in rows:
+            folded = [f"{labels[key]}: {row.pop(key)}" for key in list(row)
+                      if key not in keep and key not in ("Name", "Other")]
+            if folded:
+                row["Other"] = "\n".join(([row["Other"]] if "Other" in row else []) + folded)
+        df = pd.DataFrame(rows, columns=["Name"] + columns + ["Other"])
+
+    if excel_path.lower().endswith(".parquet"):
+        df.to_parquet(excel_path, index=False)
+        if index is not None and profile != "gcc":
+            index.save(os.path.splitext(excel_path)[0] + "_questions.json")
+        return
+
+    with pd.ExcelWriter(excel_path) as writer:
+        df.to_excel(writer, index=False, sheet_name="Questionnaire Responses")
+        if index is not None and profile != "gcc":
+            pd.DataFrame(index.summary()).to_excel(writer, index=False, sheet_name="Questions")
+
+
+def iter_in_order(in_queue, sentinels):
+    """Yield items from in_queue ordered by their "seq" number.
+
+    Items arrive in completion order; they are buffered until every earlier item has
+    been yielded. Stops after `sentinels` end markers have been received.
+    """
+    buffered = {}
+    next_seq = 0
+    remaining = sentinels
+
+    while remaining:
+        item = in_queue.get()
+        if item is _DONE:
+            remaining -= 1
+            continue
+        buffered[item["seq"]] = item
+        while next_seq in buffered:
+            yield buffered.pop(next_seq)
+            next_seq += 1
+
+    # Anything left behind a gap is flushed in order at the end
+    for seq in sorted(buffered):
+        yield buffered[seq]
+
+
+def export_stage(in_queue, sentinels, markdown_path, excel_path, profile="generic", page_limit=None,
+                 index=None, min_support=0.0):
+    """Write structured responses to Markdown as they complete, then write the Excel file."""
+    rows = []
+    written = 0
+
+    with open(markdown_path, "w", encoding="utf-8") as f:
+        f.write(MARKDOWN_TITLE)
+        if page_limit:
+            f.write(f"This document contains the first {page_limit} responses from the GCC Breakout Questionnaire (TEST MODE).\n\n")
+        else:
+            f.write("This document contains organized responses from the GCC Breakout Questionnaire.\n\n")
+        f.write("---\n\n")
+
+        for item in iter_in_order(in_queue, sentinels):
+            if written:
+                f.write("\n---\n\n")
+            f.write(item["response"])
+            f.flush()
+            written += 1
+
+            row = response_to_row(item["response"], profile, index)
+            if row:
+                rows.append(row)
+            else:
+                print(f"Warning: Could not extract data for Excel from {os.path.basename(item['source'])} page {item['page']}")
+
+    if rows:
+        print("Creating Excel file...")
+        write_excel(rows, excel_path, profile, index, min_support)
+    else:
+        print("Warning: No data was extracted for Excel file")
+
+    return written, len(rows)
+
+
+def export_text_stage(in_queue, sources, json_path=None):
+    """Collect OCR output per source and write extract_text.py style JSON files."""
+    pages_by_source = {source: [] for source in sources}
+    for item in iter_in_order(in_queue, 1):
+        pages_by_source[item["source"]].append(item["text"] or "")
+
+    output_paths = []
+    for source, pages_text in pages_by_source.items():
+        if json_path and len(sources) == 1:
+            output_path = json_path
+        else:
+            output_path = os.path.splitext(source)[0] + "_extracted_text.json"
+
+        print(f"Saving extracted text to {output_path}...")
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'total_pages': len(pages_text),
+                'pages': pages_text
+            }, f, ensure_ascii=False, indent=2)
+        output_paths.append(output_path)
+
+    return output_paths
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+def collect_sources(path):
+    """Return the PDF/JSON files to process for a file or directory path."""
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(".pdf")
+        )
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Input not found at path: {path}")
+    return [path]
+
+
+def _run_stage(target, *args, **kwargs):
+    """Thread body that reports stage failures instead of dying silently."""
+    try:
+        target(*args, **kwargs)
+    except Exception as e:
+        print(f"Error in {target.__name__}: {str(e)}")
+
+
+def run_pipeline(sources, markdown_path="qa_extracted.md", excel_path="qa_responses.xlsx",
+                 json_path=None, profile="generic", page_limit=None, ocr_only=False,
+                 shard_size=10, ocr_workers=4, llm_workers=4, queue_size=32,
+                 question_index=None, min_support=0.0):
+    """Run OCR -> structure -> export over the given source files.
+
+    Args:
+        sources (list): PDF files and/or extract_text.py JSON files
+        markdown_path (str): Markdown output for structured responses
+        excel_path (str): Excel output for structured responses
+        json_path (str): JSON output for --ocr-only mode with a single source
+        profile (str): "generic" (free-form questions) or "gcc" (fixed GCC columns)
+        page_limit (int): Maximum number of pages per document, None for all
+        ocr_only (bool): Stop after OCR and write extract_text.py style JSON
+        shard_size (int): Pages per Document Intelligence request
+        ocr_workers (int): Concurrent Document Intelligence requests
+        llm_workers (int): Concurrent Azure OpenAI requests
+        queue_size (int): Capacity of each inter-stage queue
+        question_index (QuestionIndex): Canonicalises generic-profile questions into
+            fixed columns; a fresh index is used if None
+        min_support (float): Fraction of respondents a new canonical question needs to
+            get its own column; rarer ones are folded into "Other". Questions of a
+            loaded schema always keep theirs
+
+    Returns:
+        dict: Output paths and counts
+    """
+    if question_index is None and profile == "generic":
+        question_index = QuestionIndex()
+
+    pages_queue = queue.Queue(maxsize=queue_size)
+    structured_queue = queue.Queue(maxsize=queue_size)
+
+    if ocr_only:
+        def produce():
+            try:
+                ocr_stage(sources, pages_queue, shard_size, ocr_workers, page_limit)
+            finally:
+                pages_queue.put(_DONE)
+
+        producer = threading.Thread(target=_run_stage, args=(produce,), daemon=True)
+        producer.start()
+        output_paths = export_text_stage(pages_queue, sources, json_path)
+        producer.join()
+        return {"json": output_paths}
+
+    def produce():
+        try:
+            ocr_stage(sources, pages_queue, shard_size, ocr_workers, page_limit)
+        finally:
+            for _ in range(llm_workers):
+                pages_queue.put(_DONE)
+
+    def structure():
+        try:
+            structure_stage(pages_queue, structured_queue, profile)
+        finally:
+            structured_queue.put(_DONE)
+
+    threads = [threading.Thread(target=_run_stage, args=(produce,), daemon=True)]
+    threads += [threading.Thread(target=_run_stage, args=(structure,), daemon=True) for _ in range(llm_workers)]
+    for thread in threads:
+        thread.start()
+
+    written, row_count = export_stage(structured_queue, llm_workers, markdown_path, excel_path, profile, page_limit,
+                                      question_index, min_support)
+
+    for thread in threads:
+        thread.join()
+
+    outputs = {"markdown": markdown_path, "excel": excel_path if row_count else None,
+               "responses": written, "rows": row_count}
+    if question_index is not None:
+        outputs["questions"] = len(question_index)
+        outputs["index"] = question_index
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract, structure and export questionnaire responses.")
+    parser.add_argument("input", help="PDF file, directory of PDFs, or extract_text.py JSON file")
+    parser.add_argument("--profile", choices=["generic", "gcc"], default="generic",
+                        help="Prompt and Excel layout to use (default: generic)")
+    parser.add_argument("--markdown", default="qa_extracted.md", help="Markdown output path")
+    parser.add_argument("--excel", default="qa_responses.xlsx", help="Excel output path (.parquet for Parquet)")
+    parser.add_argument("--json", help="JSON output path for --ocr-only with a single PDF")
+    parser.add_argument("--ocr-only", action="store_true", help="Only extract text (extract_text.py output)")
+    parser.add_argument("--page-limit", type=int, help="Process only the first N pages of each document")
+    parser.add_argument("--schema", help="Question schema JSON (from --save-schema) that fixes the output columns")
+    parser.add_argument("--save-schema", help="Write the canonical questions of this run to a schema JSON")
+    parser.add_argument("--min-support", type=float, default=0.01,
+                        help="Fraction of respondents a question not in --schema needs for its own column "
+                             "(default: 0.01)")
+    parser.add_argument("--shard-size", type=int, default=10, help="Pages per OCR request (default: 10)")
+    parser.add_argument("--ocr-workers", type=int, default=4, help="Concurrent OCR requests (default: 4)")
+    parser.add_argument("--llm-workers", type=int, default=4, help="Concurrent LLM requests (default: 4)")
+    args = parser.parse_args(argv)
+
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    try:
+        sources = collect_sources(args.input)
+        if not sources:
+            print(f"No PDF files found in {args.input}")
+            return
+
+        question_index = QuestionIndex.load(args.schema) if args.schema else None
+
+        outputs = run_pipeline(
+            sources,
+            markdown_path=args.markdown,
+            excel_path=args.excel,
+            json_path=args.json,
+            profile=args.profile,
+            page_limit=args.page_limit,
+            ocr_only=args.ocr_only,
+            shard_size=args.shard_size,
+            ocr_workers=args.ocr_workers,
+            llm_workers=args.llm_workers,
+            question_index=question_index,
+            min_support=args.min_support,
+        )
+        run_index = outputs.pop("index", None)
+        if args.save_schema and run_index is not None:
+            run_index.save(args.save_schema)
+            outputs["schema"] = args.save_schema
+
+        print(f"\nFiles saved:")
+        for name, path in outputs.items():
+            if isinstance(path, list):
+                for p in path:
+                    print(f"- {name}: {p}")
+            elif isinstance(path, str):
+                print(f"- {name}: {path}")
+
+    except Exception as e:
+        print(f"Error: {str(e)}")
+
+
+if __name__ == "__main__":
+    main()
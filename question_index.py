@@ -0,0 +1,202 @@
+"""
+Question Canonicalisation Index
+
+Maps the question strings written by the LLM in qa_pipeline.py ("What opportunities do
+you see?", "what Opportunities do you see ?", "1. What opportunities do you see to ...")
+onto canonical question IDs, so the Excel/Parquet export has one dense column per
+question instead of one sparse column per wording.
+
+How it works:
+- Each question is normalised to a set of tokens (lowercase, punctuation and
+  numbering removed, stopwords dropped, light suffix stemming)
+- Identical normalised keys are resolved with a dictionary lookup
+- Otherwise candidates come from an inverted index over tokens (blocking), using
+  only the question's rarest tokens: a question with a Jaccard similarity above the
+  threshold must share at least one of them (prefix filtering), so common tokens
+  rarely widen the candidate set and no match is lost
+- Candidates are scored by the Jaccard similarity of their token sets; the best one
+  above the threshold wins, otherwise a new canonical question is created
+
+Lookups only compare against the candidates instead of every known question, and
+raw strings are memoised, so tens of thousands of respondents with repeated
+wordings resolve almost entirely from the cache.
+
+The index can be saved to JSON and loaded again (optionally frozen) to keep the
+export schema fixed across runs; loaded questions always keep their column.
+"""
+
+import re
+import json
+import math
+from collections import Counter, defaultdict
+
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "at", "by",
+    "from", "is", "are", "be", "was", "were", "do", "does", "did", "you", "your",
+    "we", "our", "it", "its", "this", "that", "these", "those", "what", "which",
+    "please", "any", "as", "if", "can", "could", "would", "should", "me", "i",
+}
+
+# Memo marker for questions that a frozen index could not match
+_UNKNOWN = -1
+
+_NUMBERING = re.compile(r"^\s*(?:q(?:uestion)?\s*)?\d+[\.\):]?\s*", re.IGNORECASE)
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def _stem(token):
+    """Very light suffix stripping so plural/verb forms share a token."""
+    for suffix in ("ing", "ies", "ed", "s"):
+        if len(token) > len(suffix) + 2 and token.endswith(suffix):
+            return token[:-len(suffix)] + ("y" if suffix == "ies" else "")
+    return token
+
+
+def normalize_question(text):
+    """Return the normalised token set of a question as a frozenset."""
+    text = text.replace("*", " ").replace("_", " ")
+    text = _NUMBERING.sub("", text.strip().lower())
+    tokens = (_stem(token) for token in _NON_WORD.split(text) if token)
+    normalized = frozenset(token for token in tokens if token not in STOPWORDS)
+    if not normalized:
+        # A question made only of stopwords still needs a key
+        normalized = frozenset(token for token in _NON_WORD.split(text) if token)
+    return normalized
+
+
+class QuestionIndex:
+    """Incremental index that assigns canonical IDs to question variants.
+
+    Args:
+        threshold (float): Minimum Jaccard similarity to merge with an existing question
+        frozen (bool): If True, unknown questions are not added and map to None
+    """
+
+    def __init__(self, threshold=0.6, frozen=False):
+        self.threshold = threshold
+        self.frozen = frozen
+        self.pinned = 0           # canonical questions loaded from a schema
+
+        self.labels = []          # id -> canonical question text
+        self.counts = []          # id -> number of occurrences seen
+        self.variants = []        # id -> Counter of raw wordings
+        self._tokens = []         # id -> frozenset of normalised tokens
+        self._by_key = {}         # normalised token set -> id
+        self._postings = defaultdict(list)  # token -> ids containing it
+        self._memo = {}           # raw question -> id
+
+    def __len__(self):
+        return len(self.labels)
+
+    @staticmethod
+    def question_id(index):
+        """Column key for a canonical question number."""
+        return f"Q{index + 1:03d}"
+
+    def _match(self, tokens):
+        """Return the best existing id for a token set, or None."""
+        exact = self._by_key.get(tokens)
+        if exact is not None:
+            return exact
+
+        # A candidate reaching the threshold shares at least ceil(threshold * size)
+        # tokens, so it shares one of any size - that + 1 tokens: block on the rarest
+        size = len(tokens)
+        prefix = size - math.ceil(self.threshold * size - 1e-9) + 1
+        rarest = sorted(tokens, key=lambda token: len(self._postings.get(token, ())))[:prefix]
+        candidates = set()
+        for token in rarest:
+            candidates.update(self._postings.get(token, ()))
+
+        best, best_score = None, self.threshold
+        for candidate in candidates:
+            candidate_tokens = self._tokens[candidate]
+            candidate_size = len(candidate_tokens)
+            # Length filter: Jaccard can't reach the threshold if sizes differ too much
+            if min(size, candidate_size) < self.threshold * max(size, candidate_size):
+                continue
+            shared = len(tokens & candidate_tokens)
+            score = shared / (size + candidate_size - shared)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def _add_canonical(self, question, tokens):
+        index = len(self.labels)
+        self.labels.append(question.strip())
+        self.counts.append(0)
+        self.variants.append(Counter())
+        self._tokens.append(tokens)
+        self._by_key[tokens] = index
+        for token in tokens:
+            self._postings[token].append(index)
+        return index
+
+    def lookup(self, question):
+        """Return the canonical index for a question, adding it if needed."""
+        index = self._memo.get(question)
+        if index is None:
+            tokens = normalize_question(question)
+            index = self._match(tokens)
+            if index is None:
+                index = _UNKNOWN if self.frozen else self._add_canonical(question, tokens)
+            self._memo[question] = index
+        if index == _UNKNOWN:
+            return None
+
+        self.counts[index] += 1
+        self.variants[index][question] += 1
+        return index
+
+    def canonicalize(self, question):
+        """Return the canonical column ID for a question, or None if frozen and unknown."""
+        index = self.lookup(question)
+        return None if index is None else self.question_id(index)
+
+    def columns(self, min_count=0):
+        """Canonical IDs in creation order, keeping those seen at least min_count times.
+
+        Questions loaded from a schema are always kept, so the columns stay fixed across runs.
+        """
+        return [self.question_id(i) for i, count in enumerate(self.counts)
+                if i < self.pinned or count >= min_count]
+
+    def summary(self):
+        """One record per canonical question for the export's question sheet."""
+        return [
+            {
+                "ID": self.question_id(i),
+                "Question": label,
+                "Responses": self.counts[i],
+                "Variants": len(self.variants[i]),
+                "Most common wording": self.variants[i].most_common(1)[0][0] if self.variants[i] else label,
+            }
+            for i, label in enumerate(self.labels)
+        ]
+
+    def save(self, path):
+        """Save the canonical questions (and known wordings) to a JSON schema file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "threshold": self.threshold,
+                "questions": [
+                    {"id": self.question_id(i), "question": label, "variants": sorted(self.variants[i])}
+                    for i, label in enumerate(self.labels)
+                ],
+            }, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path, frozen=True, **kwargs):
+        """Load a schema written by save(); IDs keep their saved order."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        kwargs.setdefault("threshold", data.get("threshold", 0.6))
+        index = cls(frozen=frozen, **kwargs)
+        for entry in data["questions"]:
+            position = index._add_canonical(entry["question"], normalize_question(entry["question"]))
+            for variant in entry.get("variants", []):
+                index._memo[variant] = position
+        index.pinned = len(index)
+        return index
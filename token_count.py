@@ -1,14 +1,164 @@
-# This script reads a file, tokenizes its content using the GPT-2 tokenizer (which is very similar to GPT-4's tokenizer for English text), and prints the total number of tokens.
-from transformers import GPT2Tokenizer
+"""
+Token Counter
+
+Counts the tokens of one or more text files, e.g. to size prompts for process_qa.py
+and process_questionnaire.py before sending them.
+
+Features:
+- Encodings: o200k_base (GPT-4o, default), cl100k_base (GPT-4 / GPT-3.5) and gpt2,
+  or a model name such as gpt-4o. Uses tiktoken; gpt2 falls back to the
+  transformers GPT-2 tokenizer when tiktoken is not installed
+- The encoder is loaded once per process and reused for every file and chunk
+- Files are read in chunks that are only cut where a token can never span the cut,
+  so the counts equal counting the whole file at once without holding it in memory
+- Files and glob patterns are counted in parallel, with per-file and total counts
+
+Usage:
+    python token_count.py FILE [FILE|GLOB ...] [--encoding cl100k_base] [--workers 4]
+    python token_count.py "output/**/*.md" --encoding o200k_base
+
+Requirements:
+- tiktoken (or transformers for --encoding gpt2)
+"""
+
+import os
+import re
+import sys
+import glob
+import argparse
+from functools import lru_cache
+
+DEFAULT_ENCODING = "o200k_base"
+ENCODINGS = ("o200k_base", "cl100k_base", "gpt2")
+CHUNK_SIZE = 1 << 20  # characters
+
+# Cut points that are always token boundaries for the gpt2, cl100k and o200k
+# pre-tokenizers: after a single newline (gpt2 splits runs of whitespace differently
+# at the end of the text) that is followed by neither whitespace nor "/" (which o200k
+# attaches to punctuation + newlines) ...
+LINE_CUT = re.compile(r"(?<=\S)\n(?=[^\s/])")
+# ... and, for very long lines, before a single space that joins two words
+WORD_CUT = re.compile(r"(?<=[A-Za-z0-9])(?= [A-Za-z])")
+
+
+@lru_cache(maxsize=None)
+def get_encoder(encoding=DEFAULT_ENCODING):
+    """Return a function text -> token count for an encoding or model name (cached)"""
+    try:
+        import tiktoken
+    except ImportError:
+        if encoding != "gpt2":
+            raise ImportError(f"tiktoken is required for the {encoding} encoding (pip install tiktoken)")
+        from transformers import GPT2TokenizerFast
+
+        tokenizer = GPT2TokenizerFast.from_pretrained("gpt2")
+        return lambda text: len(tokenizer.tokenize(text))
+
+    try:
+        enc = tiktoken.get_encoding(encoding)
+    except ValueError:
+        enc = tiktoken.encoding_for_model(encoding)
+    # encode_ordinary treats text like "<|endoftext|>" as plain text instead of raising
+    return lambda text: len(enc.encode_ordinary(text))
+
+
+def count_text_tokens(text, encoding=DEFAULT_ENCODING):
+    return get_encoder(encoding)(text)
+
+
+def iter_chunks(filename, chunk_size=CHUNK_SIZE):
+    """Yield the file's text in pieces of about chunk_size characters, cut only at token boundaries"""
+    with open(filename, 'r', encoding='utf-8', errors='replace', newline='') as file:
+        pending = ""
+        for block in iter(lambda: file.read(chunk_size), ""):
+            pending += block
+            if len(pending) < chunk_size:
+                continue
+            # Only look for a cut in the newest data; earlier text had no cut point
+            start = max(0, len(pending) - len(block) - 1)
+            cut = None
+            for pattern in (LINE_CUT, WORD_CUT):
+                for match in pattern.finditer(pending, start, len(pending) - 1):
+                    cut = match.end()
+                if cut or len(pending) < 4 * chunk_size:
+                    break
+            if cut:
+                yield pending[:cut]
+                pending = pending[cut:]
+        if pending:
+            yield pending
+
+
+def count_tokens(filename, encoding=DEFAULT_ENCODING, chunk_size=CHUNK_SIZE):
+    count = get_encoder(encoding)
+    return sum(count(chunk) for chunk in iter_chunks(filename, chunk_size))
+
+
+def _count_file(filename, encoding, chunk_size):
+    try:
+        return filename, count_tokens(filename, encoding, chunk_size), None
+    except Exception as e:
+        return filename, None, f"{type(e).__name__}: {str(e)}"
+
+
+def expand_paths(patterns):
+    """Files named by the arguments, expanding globs (** included) in argument order"""
+    files = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        if not matches:
+            print(f"No files match {pattern}", file=sys.stderr)
+        for path in matches:
+            if os.path.isdir(path) or path in seen:
+                continue
+            seen.add(path)
+            files.append(path)
+    return files
+
+
+def count_files(files, encoding=DEFAULT_ENCODING, workers=None, chunk_size=CHUNK_SIZE):
+    """Return [(file, tokens or None, error or None)] in the order of files"""
+    get_encoder(encoding)  # fail early on an unknown encoding or a missing package
+    if len(files) <= 1 or workers == 1:
+        return [_count_file(f, encoding, chunk_size) for f in files]
+    # Imported here: the process pool machinery is slow to import and not needed for one file
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_count_file, files, [encoding] * len(files), [chunk_size] * len(files)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count the tokens of text files.")
+    parser.add_argument("files", nargs="+", help="Files or glob patterns (quote ** patterns)")
+    parser.add_argument("--encoding", default=DEFAULT_ENCODING,
+                        help=f"{', '.join(ENCODINGS)} or a model name (default: {DEFAULT_ENCODING})")
+    parser.add_argument("--workers", type=int, help="Processes to use (default: all cores)")
+    args = parser.parse_args(argv)
+
+    files = expand_paths(args.files)
+    try:
+        results = count_files(files, args.encoding, args.workers)
+    except (ImportError, KeyError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    total = 0
+    failed = 0
+    for filename, tokens, error in results:
+        if error:
+            failed += 1
+            print(f"{'error':>12}  {filename}: {error}")
+        else:
+            total += tokens
+            print(f"{tokens:12,d}  {filename}")
+
+    if len(results) > 1:
+        print(f"{total:12,d}  total ({len(results) - failed} files, {args.encoding})")
+    else:
+        print(f"Total tokens: {total}")
+    return 1 if failed else 0
 
-def count_tokens(filename):
-    tokenizer = GPT2Tokenizer.from_pretrained("gpt2")  # GPT-2 and GPT-4 tokenization are similar
-    with open(filename, 'r', encoding='utf-8') as file:
-        content = file.read()
-    tokens = tokenizer.tokenize(content)
-    return len(tokens)
 
 if __name__ == "__main__":
-    import sys
-    filename = sys.argv[1]
-    print(f"Total tokens: {count_tokens(filename)}")
+    sys.exit(main())